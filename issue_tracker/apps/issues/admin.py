@@ -1,13 +1,131 @@
 import typing
 
 from django.contrib import admin
-from django.db.models import Avg, Max, Min
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.exceptions import FieldDoesNotExist
+from django.core.handlers.wsgi import WSGIRequest
+from django.db.models import Q, QuerySet
 from django.http.request import HttpRequest
 from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
 
 from issue_tracker.common.utils import duration
 
-from .models import Issue
+from . import search
+from .labels import user_labels
+from .models import Issue, IssueStats, ResolutionBucket
+from .pagination import EstimatedCountPaginator, KeysetPagination
+from .replica import reading_from, replica_for
+
+# Query parameter of keyset navigation, id of the issue the page starts after.
+AFTER_VAR = "after"
+
+
+class IssueChangeList(ChangeList):
+    """
+    Change list of issues with keyset navigation.
+
+    Besides numbered pages (fetched by OFFSET), the next page is linked by the last
+    issue of the page (`?after=<id>`). Such page is fetched by seeking to the issue
+    in the index of the ordering, so it costs the same as the first page no matter
+    how deep into the list it is. Keyset navigation is available when the list is
+    ordered by fields of issues.
+    """
+
+    def __init__(self, request: WSGIRequest, *args: typing.Any, **kwargs: typing.Any) -> None:
+        self.after = request.GET.get(AFTER_VAR)
+        self.keyset: tuple[str, ...] | None = None
+        self.seek: Q | None = None
+        super().__init__(request, *args, **kwargs)
+        # Links to other pages, orderings and filters start from the beginning.
+        self.params.pop(AFTER_VAR, None)
+
+    def get_filters_params(self, params: typing.Any = None) -> dict[str, str]:
+        lookup_params: dict[str, str] = super().get_filters_params(params)
+        lookup_params.pop(AFTER_VAR, None)
+        return lookup_params
+
+    def get_queryset(self, request: WSGIRequest) -> QuerySet[Issue]:
+        # Descriptions are not listed, they may be large.
+        queryset: QuerySet[Issue] = super().get_queryset(request).defer("description")
+        self.keyset = self.get_keyset(queryset)
+        if self.after is None:
+            return queryset
+
+        if self.keyset is None:
+            raise IncorrectLookupParameters("The ordering doesn't support keyset navigation.")
+
+        try:
+            names = [field.lstrip("-") for field in self.keyset]
+            position = self.root_queryset.filter(pk=self.after).values_list(*names).get()
+        except (ValueError, Issue.DoesNotExist) as err:
+            raise IncorrectLookupParameters(err) from err
+
+        self.seek = KeysetPagination(self.keyset).seek(position)
+        return queryset
+
+    def get_results(self, request: WSGIRequest) -> None:
+        if self.seek is None or self.show_all:
+            super().get_results(request)
+        else:
+            self.get_keyset_results(request)
+
+        # Assignees are displayed by their cached labels instead of being joined.
+        user_labels.get_many(issue.assignee_id for issue in self.result_list)
+
+    def get_keyset_results(self, request: WSGIRequest) -> None:
+        """
+        Sets the page starting after the issue of `?after=` and the attributes set by
+        `get_results()`, without fetching the numbered page. The count stays that of
+        the whole list.
+        """
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = None
+        if self.show_full_result_count:
+            self.full_result_count = self.root_queryset.count()
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.can_show_all = self.result_count <= self.list_max_show_all
+        self.multi_page = self.result_count > self.list_per_page
+        self.paginator = paginator
+        self.result_list = self.queryset.filter(self.seek)[: self.list_per_page]
+
+    @staticmethod
+    def get_keyset(queryset: QuerySet[Issue]) -> tuple[str, ...] | None:
+        """
+        Returns ordering of the queryset usable by keyset navigation, i.e. of fields
+        of issues ending by id, or None.
+        """
+        keyset = []
+        for field in queryset.query.order_by:
+            if not isinstance(field, str):
+                return None
+
+            descending, name = field.startswith("-"), field.lstrip("-")
+            name = "id" if name == "pk" else name
+            try:
+                if Issue._meta.get_field(name).is_relation:
+                    return None
+            except FieldDoesNotExist:
+                return None
+
+            keyset.append(f"-{name}" if descending else name)
+
+        return tuple(keyset) if keyset and keyset[-1].lstrip("-") == "id" else None
+
+    @cached_property
+    def next_page_url(self) -> str | None:
+        """Returns URL of the page after this one by keyset navigation, if there may be one."""
+        if self.keyset is None or self.show_all:
+            return None
+
+        issues = list(self.result_list)
+        if len(issues) < self.list_per_page:
+            return None
+
+        return str(self.get_query_string({AFTER_VAR: issues[-1].pk}, remove=[PAGE_VAR]))
 
 
 @admin.register(Issue)
@@ -19,9 +137,14 @@ class IssueAdmin(admin.ModelAdmin):  # type: ignore
     list_display = (
         "__str__",
         "state",
-        "assignee",
+        "assignee_label",
         "opened_at",
     )
+    # The list is never counted exactly, see `EstimatedCountPaginator`.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Searched by the full-text index, see `get_search_results()`.
+    search_fields = ("title", "description")
 
     def has_module_permission(self, request: HttpRequest) -> bool:
         """Assure staff can view issues module in the admin site."""
@@ -48,6 +171,23 @@ class IssueAdmin(admin.ModelAdmin):  # type: ignore
         user = request.user
         return getattr(user, "is_superuser", False)
 
+    @admin.display(description="assignee", ordering="assignee")
+    def assignee_label(self, obj: Issue) -> str:
+        """Returns username of the assignee from the label cache, see `user_labels`."""
+        return user_labels.get(obj.assignee_id) or str(obj.assignee)
+
+    def get_changelist(self, request: HttpRequest, **kwargs: typing.Any) -> type[ChangeList]:
+        return IssueChangeList
+
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet[Issue], search_term: str
+    ) -> tuple[QuerySet[Issue], bool]:
+        """Searches issues by the full-text index instead of scanning them by `icontains`."""
+        if not search_term.strip():
+            return queryset, False
+
+        return queryset.filter(id__in=search.matching_ids(search_term)), False
+
     def changelist_view(
         self, request: HttpRequest, extra_context: dict[str, typing.Any] | None = None
     ) -> TemplateResponse:
@@ -60,23 +200,33 @@ class IssueAdmin(admin.ModelAdmin):  # type: ignore
 
         extra_context = extra_context or {}
 
+        # Statistics are maintained along with changes of issues, see `IssueStats`, and
+        # read from the replica, if enabled and current with the user's changes.
+        with reading_from(replica_for(request)):
+            current = IssueStats.current()
+            resolution = ResolutionBucket.percentiles()
+
         stats: dict[str, typing.Any] = {
-            "open_issues": Issue.objects.filter(state=Issue.State.OPEN).count(),
-            "resolved_issues": Issue.objects.filter(state=Issue.State.CLOSED).count(),
+            "open_issues": current.open_count,
+            "resolved_issues": current.closed_count,
+            "fastest_resolution": duration(current.resolution_min),
+            "longest_resolution": duration(current.resolution_max),
+            "average_resolution": duration(current.resolution_avg),
         }
 
-        query = (
-            Issue.objects.filter(state=Issue.State.CLOSED)
-            .aggregate(
-                fastest_resolution=Min("resolution_duration"),
-                longest_resolution=Max("resolution_duration"),
-                average_resolution=Avg("resolution_duration"),
-            )
-            .items()
-        )
-
-        for aggregation, total_seconds in query:
-            stats[aggregation] = duration(total_seconds)
+        # Percentiles are estimated by histograms, see `ResolutionBucket`.
+        stats["resolution_percentiles"] = {
+            label: duration(value) for label, value in resolution["percentiles"].items()
+        }
+        stats["category_resolution"] = {
+            name: {
+                "count": summary["count"],
+                "percentiles": {
+                    label: duration(value) for label, value in summary["percentiles"].items()
+                },
+            }
+            for name, summary in resolution["categories"].items()
+        }
 
         extra_context.update(
             title="Tracked Issues",
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class IssuesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "issue_tracker.apps.issues"
+
+    def ready(self) -> None:
+        # Connect signal handlers and register system checks.
+        from . import (  # noqa: F401 pylint: disable=import-outside-toplevel,unused-import
+            checks,
+            signals,
+        )
@@ -0,0 +1,164 @@
+"""
+Asynchronous variants of the issues API views.
+
+The views use the asynchronous ORM and are meant to be served by an ASGI server
+(see `issue_tracker.asgi`), where a request waiting for the database or for a slow
+client doesn't occupy a thread. They return the same representation as their
+synchronous counterparts in `views` and also support long polling (`?wait=`).
+"""
+
+import typing
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http.response import HttpResponseBase
+from rest_framework.exceptions import APIException, NotAcceptable, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import changes, views
+from .cache import issue_cache
+from .conditional import (
+    Validators,
+    aconditional,
+    aissue_validators,
+    aissues_validators,
+    wait_time,
+)
+from .filters import IssueFilter
+from .models import Issue
+from .pagination import KeysetPagination
+from .readmodel import open_issues
+from .renderers import NDJSONRenderer
+from .serializers import IssueListSerializer, IssueSerializer
+
+
+def render(data: typing.Any) -> HttpResponse:
+    """Returns response with data rendered the same way as by the DRF views."""
+    return HttpResponse(JSONRenderer().render(data), content_type=JSONRenderer.media_type)
+
+
+def api_error(err: APIException) -> HttpResponse:
+    """Returns response reporting an API error the same way as the DRF views."""
+    data = err.detail if isinstance(err.detail, (list, dict)) else {"detail": err.detail}
+    return JsonResponse(data=data, status=err.status_code, safe=False)
+
+
+async def sync_list_response(request: HttpRequest) -> HttpResponseBase | None:
+    """
+    Returns response of the list of issues in modes not served asynchronously, None if
+    the page is to be read by the asynchronous ORM.
+
+    Issues fetched by `?ids=` and pages of open issues served from memory (see
+    `readmodel`) are answered by the synchronous view in a thread. Streaming
+    (`?stream=1`) isn't supported, the streamed response would be iterated
+    synchronously by the ASGI handler (of Django 4.1), so it is rejected by raising
+    `ValidationError` (`400 Bad Request`), and NDJSON by raising `NotAcceptable`.
+    """
+    query_params = Request(request).query_params
+    if "ids" in query_params:
+        return await sync_to_async(views.issues_list)(request)
+    if query_params.get("stream") in ("1", "true"):
+        raise ValidationError({"stream": ["Streaming is served by /issues/ only."]})
+    if NDJSONRenderer.media_type in request.headers.get("Accept", ""):
+        raise NotAcceptable("NDJSON is served by /issues/ only.")
+
+    issue_filter = IssueFilter.from_query_params(query_params)
+    lookups = IssueListSerializer.lookups(IssueListSerializer.get_fieldset(query_params))
+    if open_issues.serves(issue_filter, lookups):
+        return await sync_to_async(views.issues_list)(request)
+
+    return None
+
+
+@aconditional(aissues_validators)
+async def issues_list(request: HttpRequest) -> HttpResponseBase:
+    """
+    List issues one page at a time. See `views.issues_list`.
+
+    Pages read from the database are fetched by the asynchronous ORM and cached the
+    same way as by the synchronous view. Other modes are served by the synchronous
+    view or rejected, see `sync_list_response()`. Use `views.issues_list` for
+    streaming.
+    """
+    drf_request = Request(request)
+    try:
+        delegated = await sync_list_response(request)
+        if delegated is not None:
+            return delegated
+
+        issue_filter = IssueFilter.from_query_params(drf_request.query_params)
+        fieldset = IssueListSerializer.get_fieldset(drf_request.query_params)
+        paginator = KeysetPagination(issue_filter.ordering_fields)
+        queryset = paginator.get_page_queryset(
+            IssueListSerializer.values_queryset(
+                issue_filter.filter_queryset(Issue.objects.all()),
+                fieldset,
+                extra=paginator.field_names(),
+            ),
+            drf_request,
+        )
+
+    except APIException as err:
+        return api_error(err)
+
+    async def get_page() -> dict[str, typing.Any]:
+        rows = paginator.set_page([row async for row in queryset])
+        labels = await IssueListSerializer.aget_labels(rows, fieldset)
+        return paginator.get_paginated_data(
+            IssueListSerializer.serialize_values(rows, fieldset, labels)
+        )
+
+    validators: Validators | None = getattr(request, "validators", None)
+    if validators is None or issue_cache.backend is None:
+        return render(await get_page())
+
+    payload, hit = await issue_cache.aget_or_set(
+        issue_cache.issues_key(request.build_absolute_uri()), validators.revision, get_page
+    )
+    response = render(payload)
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+@aconditional(aissue_validators)
+async def issue_detail(request: HttpRequest, iid: int) -> HttpResponse:
+    """
+    Show details of an issue. See `views.issue_detail`.
+    """
+    try:
+        fieldset = IssueSerializer.get_fieldset(request.GET)
+    except APIException as err:
+        return api_error(err)
+
+    row = await IssueSerializer.values_queryset(Issue.objects.filter(id=iid), fieldset).afirst()
+    if row is None:
+        return JsonResponse(data={"error": "Not found."}, status=404)
+
+    labels = await IssueSerializer.aget_labels([row], fieldset)
+    return render(IssueSerializer.serialize_values([row], fieldset, labels)[0])
+
+
+async def issues_changes(request: HttpRequest) -> HttpResponse:
+    """
+    Changes of issues after a sequence of the change log. See `views.issues_changes`.
+
+    With `?wait=<seconds>` (at most 60), a request finding no changes is answered as
+    soon as some are made, or with no changes when the time runs out.
+    """
+    drf_request = Request(request)
+    try:
+        since = changes.since_param(drf_request.query_params)
+        fieldset = IssueListSerializer.get_fieldset(drf_request.query_params)
+        batch = await changes.wait_for_changes(
+            since,
+            KeysetPagination().get_page_size(drf_request),
+            fieldset,
+            wait_time(request),
+        )
+    except APIException as err:
+        return api_error(err)
+    except changes.ChangesExpired as err:
+        return JsonResponse(data=err.data, status=err.status_code)
+
+    return render(batch)
@@ -0,0 +1,128 @@
+"""
+Cache of serialized issues.
+
+Payloads of the issues API are cached in the Django cache selected by the
+`ISSUES_CACHE` setting (an alias of `CACHES`, None disables caching). Any Django
+cache backend can be used, e.g. the in-process LRU (`LocMemCache`) or the file
+based cache shared by all workers of a host (`FileBasedCache`).
+
+Every entry is stored along with the revision of the data it was computed from
+(see `IssueRevision`) and is used only while the revision is current. Entries of
+issues are also deleted once a change of the issue is committed, so that they
+don't occupy the cache any longer than needed.
+"""
+
+import functools
+import hashlib
+import threading
+import typing
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+
+class IssueCache:
+    """
+    Cache of serialized issues with hit/miss counters (of the current process).
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> BaseCache | None:
+        """Returns the configured cache backend or None if caching is disabled."""
+        alias = getattr(settings, "ISSUES_CACHE", None)
+        return caches[alias] if alias else None
+
+    def get_or_set(
+        self, key: str, revision: int, compute: typing.Callable[[], typing.Any]
+    ) -> tuple[typing.Any, bool]:
+        """
+        Returns payload cached under key if it was computed from the given revision.
+        Otherwise, computes the payload, caches it and returns it.
+
+        Returns the payload and True if it was found in the cache.
+        """
+        backend = self.backend
+        if backend is None:
+            return compute(), False
+
+        cached = backend.get(key)
+        if cached is not None and cached[0] == revision:
+            self._count(hit=True)
+            return cached[1], True
+
+        self._count(hit=False)
+        payload = compute()
+        backend.set(key, (revision, payload))
+        return payload, False
+
+    async def aget_or_set(
+        self,
+        key: str,
+        revision: int,
+        compute: typing.Callable[[], typing.Awaitable[typing.Any]],
+    ) -> tuple[typing.Any, bool]:
+        """Asynchronous variant of `get_or_set()`."""
+        backend = self.backend
+        if backend is None:
+            return await compute(), False
+
+        cached = await backend.aget(key)
+        if cached is not None and cached[0] == revision:
+            self._count(hit=True)
+            return cached[1], True
+
+        self._count(hit=False)
+        payload = await compute()
+        await backend.aset(key, (revision, payload))
+        return payload, False
+
+    def invalidate_issues(self, ids: typing.Iterable[int]) -> None:
+        """Deletes cached issues once the current transaction is committed."""
+        backend = self.backend
+        if backend is None:
+            return
+
+        keys = [self.issue_key(iid) for iid in ids]
+        if keys:
+            transaction.on_commit(functools.partial(backend.delete_many, keys))
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit/miss counters of the current process."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self) -> None:
+        """Resets hit/miss counters."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    @staticmethod
+    def issue_key(iid: int, variant: str = "") -> str:
+        """
+        Returns key of a serialized issue, or of its variant (e.g. a subset of fields).
+
+        Only the default representations are deleted by `invalidate_issues()`, other
+        variants are recomputed once the revision of the issue changes.
+        """
+        return f"issue:{iid}:{variant}" if variant else f"issue:{iid}"
+
+    @staticmethod
+    def issues_key(uri: str) -> str:
+        """Returns key of a serialized page of issues requested by URI."""
+        return f"issues:{hashlib.sha1(uri.encode()).hexdigest()}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+issue_cache = IssueCache()
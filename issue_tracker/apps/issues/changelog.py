@@ -0,0 +1,118 @@
+"""
+Change log of issues, the source of the change feed (see `changes`) and of
+incremental exports (see `exports`). Re-exported by `models`.
+"""
+
+import typing
+from datetime import datetime
+
+from django.apps import apps
+from django.db import connection, models, transaction
+from django.db.models import Max, OuterRef, Subquery
+
+
+class IssueChange(models.Model):
+    """
+    An entry of the change log of issues: the issue was changed (or deleted) by the
+    change of issues with the revision.
+
+    Every change of issues appends entries for the issues it wrote, in the transaction
+    of the change (see `record()`). Entries are numbered by `sequence`, which only
+    grows (AUTOINCREMENT never reuses numbers) and, as SQLite has a single writer,
+    follows the order of commits, so a client which has read the log up to a sequence
+    finds all later changes after it (see `changes`).
+
+    The log is compacted by dropping entries superseded by a later entry of the same
+    issue (`compact()`), and entries older than the retention period are dropped
+    (`expire()`), recorded by `IssueChangeHorizon`.
+    """
+
+    sequence = models.BigAutoField(primary_key=True)
+    # Not a foreign key, deletions of issues are logged as well.
+    issue_id = models.BigIntegerField()
+    revision = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Entries of an issue, the latest one last (see `compact()`).
+            models.Index(fields=["issue_id", "sequence"], name="issue_change_issue_idx"),
+        ]
+
+    @classmethod
+    def record(cls, revision: int, now: datetime) -> None:
+        """
+        Appends entries of all issues written by the change with the revision, found by
+        `issue_revision_idx`. Should be called inside the transaction of the change.
+        """
+        # Looked up by name, the issues model depends on this module.
+        issue_table = apps.get_model("issues", "Issue")._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {cls._meta.db_table} (issue_id, revision, deleted, changed_at) "
+                f"SELECT id, revision, FALSE, %s FROM {issue_table} "
+                "WHERE revision = %s ORDER BY id",
+                [connection.ops.adapt_datetimefield_value(now), revision],
+            )
+
+    @classmethod
+    def record_deleted(cls, ids: typing.Iterable[int], revision: int, now: datetime) -> None:
+        """Appends entries of deleted issues, inside the transaction of the deletion."""
+        cls.objects.bulk_create(
+            [cls(issue_id=iid, revision=revision, deleted=True, changed_at=now) for iid in ids]
+        )
+
+    @classmethod
+    def compact(cls) -> int:
+        """
+        Drops entries superseded by a later entry of the same issue, returns their
+        number. Readers of the log still find the latest change of every issue changed
+        after any sequence.
+        """
+        latest = cls.objects.filter(issue_id=OuterRef("issue_id")).order_by("-sequence")
+        count, _ = cls.objects.filter(sequence__lt=Subquery(latest.values("sequence")[:1])).delete()
+        return count
+
+    @classmethod
+    def expire(cls, before: datetime) -> int:
+        """
+        Drops entries of changes made before the time, returns their number. The
+        horizon (`IssueChangeHorizon`) moves to the last dropped entry, readers of the
+        log behind it have to read all issues again.
+        """
+        with transaction.atomic():
+            expired = cls.objects.filter(changed_at__lt=before)
+            last = expired.aggregate(last=Max("sequence"))["last"]
+            if last is None:
+                return 0
+
+            count, _ = cls.objects.filter(sequence__lte=last).delete()
+            IssueChangeHorizon.objects.update_or_create(pk=1, defaults={"sequence": last})
+
+        return count
+
+    @classmethod
+    def latest(cls) -> int:
+        """Returns sequence of the last entry of the log (0 if there is none)."""
+        last = cls.objects.aggregate(last=Max("sequence"))["last"]
+        return max(last or 0, IssueChangeHorizon.current())
+
+
+class IssueChangeHorizon(models.Model):
+    """
+    Sequence of the last entry of the change log dropped by `IssueChange.expire()`
+    (single row). The log is complete only after the horizon.
+    """
+
+    sequence = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls) -> int:
+        """Returns the horizon, 0 if no entry has been dropped yet."""
+        return cls.objects.filter(pk=1).values_list("sequence", flat=True).first() or 0
+
+    @classmethod
+    async def acurrent(cls) -> int:
+        """Asynchronous variant of `current()`."""
+        return await cls.objects.filter(pk=1).values_list("sequence", flat=True).afirst() or 0
@@ -0,0 +1,357 @@
+"""
+Change feed of issues, read from the change log (`IssueChange`).
+
+A client keeps the sequence of the last change it has read and asks for changes after
+it (`/issues/changes/?since=<sequence>`). A batch lists the changed issues in the
+order of their changes, each by its current representation, and deleted issues by
+tombstones (`"deleted": true`), along with the sequence to continue from (`next`).
+An issue changed several times since the sequence is listed only once, by its latest
+change. Reading the feed costs queries proportional to the number of changes, not to
+the number of issues.
+
+The log is compacted and old entries expire (see `IssueChange`). A client behind the
+horizon of the log gets `410 Gone` with the current sequence (`latest`): it reads
+all issues again and continues from that sequence.
+
+Changes can also be waited for: by long polling (`/async/issues/changes/?wait=`), or
+as a stream of server-sent events (`ChangeStream`, served by `issue_tracker.asgi`).
+Waiting clients don't query the log themselves: the latest sequence of the log is
+polled once for all of them by `change_watermark`, and a client reads its batch only
+once the log has moved past its sequence.
+"""
+
+import asyncio
+import typing
+
+from asgiref.sync import sync_to_async
+from django.http import QueryDict
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from . import conditional
+from .labels import refresh_labels
+from .models import Issue, IssueChange, IssueChangeHorizon
+from .pagination import KeysetPagination
+from .serializers import Fieldset, IssueListSerializer, Labels
+
+# Seconds between comments keeping an idle stream of server-sent events open.
+KEEP_ALIVE_INTERVAL = 15.0
+
+# Entry of the change log: sequence, id of the issue and whether it was deleted.
+Entry = tuple[int, int, bool]
+
+
+class ChangesExpired(Exception):
+    """The changes after the requested sequence are no longer in the log."""
+
+    status_code = 410
+
+    def __init__(self, latest: int) -> None:
+        super().__init__("Changes after the sequence have expired, read all issues again.")
+        self.latest = latest
+
+    @property
+    def data(self) -> dict[str, typing.Any]:
+        """Returns payload of the response reporting the expiration."""
+        return {"detail": str(self), "latest": self.latest}
+
+
+def since_param(query_params: typing.Mapping[str, typing.Any]) -> int:
+    """Returns sequence of `?since=` (0 by default), `ValidationError` if invalid."""
+    try:
+        since = int(query_params.get("since") or 0)
+    except ValueError:
+        since = -1
+    if since < 0:
+        raise ValidationError({"since": ["Enter a sequence of the change log."]})
+
+    return since
+
+
+def read_changes(since: int, limit: int, fieldset: Fieldset) -> dict[str, typing.Any]:
+    """
+    Returns batch of at most `limit` changes after the sequence, issues represented by
+    the fieldset. Raises `ChangesExpired` if the sequence is behind the horizon.
+    """
+    if since < IssueChangeHorizon.current():
+        raise ChangesExpired(IssueChange.latest())
+
+    refresh_labels()
+    entries = list(_entries_queryset(since, limit))
+    rows = list(
+        IssueListSerializer.values_queryset(
+            Issue.objects.filter(id__in=_changed_ids(entries)), fieldset, extra=["id"]
+        )
+    )
+    labels = IssueListSerializer.get_labels(rows, fieldset)
+    return _batch(since, limit, entries, _represent(rows, fieldset, labels))
+
+
+async def aread_changes(since: int, limit: int, fieldset: Fieldset) -> dict[str, typing.Any]:
+    """Asynchronous variant of `read_changes()`."""
+    if since < await IssueChangeHorizon.acurrent():
+        raise ChangesExpired(await sync_to_async(IssueChange.latest)())
+
+    await sync_to_async(refresh_labels)()
+    entries = [entry async for entry in _entries_queryset(since, limit)]
+    queryset = IssueListSerializer.values_queryset(
+        Issue.objects.filter(id__in=_changed_ids(entries)), fieldset, extra=["id"]
+    )
+    rows = [row async for row in queryset]
+    labels = await IssueListSerializer.aget_labels(rows, fieldset)
+    return _batch(since, limit, entries, _represent(rows, fieldset, labels))
+
+
+def _entries_queryset(since: int, limit: int) -> typing.Any:
+    """Returns query of entries after the sequence, one more than the limit."""
+    return (
+        IssueChange.objects.filter(sequence__gt=since)
+        .order_by("sequence")
+        .values_list("sequence", "issue_id", "deleted")[: limit + 1]
+    )
+
+
+def _changed_ids(entries: list[Entry]) -> set[int]:
+    """Returns ids of the issues changed (and not deleted) by the entries."""
+    return {iid for _, iid, deleted in entries if not deleted}
+
+
+def _represent(
+    rows: list[dict[str, typing.Any]], fieldset: Fieldset, labels: Labels
+) -> dict[int, typing.Any]:
+    """Returns representations of issues fetched by `values_queryset()` by their ids."""
+    serialized = IssueListSerializer.serialize_values(rows, fieldset, labels)
+    return {row["id"]: issue for row, issue in zip(rows, serialized)}
+
+
+def _batch(
+    since: int, limit: int, entries: list[Entry], issues: dict[int, typing.Any]
+) -> dict[str, typing.Any]:
+    """Returns batch of changes of the entries (up to the limit) of the issues."""
+    more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Only the latest change of every issue is listed.
+    latest: dict[int, Entry] = {}
+    for entry in entries:
+        latest.pop(entry[1], None)
+        latest[entry[1]] = entry
+
+    changes = []
+    for sequence, iid, _ in latest.values():
+        change: dict[str, typing.Any] = {"sequence": sequence, "id": iid}
+        # An issue deleted meanwhile is listed by a tombstone, its deletion follows.
+        if iid in issues:
+            change.update(deleted=False, issue=issues[iid])
+        else:
+            change.update(deleted=True)
+        changes.append(change)
+
+    return {
+        "changes": changes,
+        "next": entries[-1][0] if entries else since,
+        "more": more,
+    }
+
+
+class ChangeWatermark:  # pylint: disable=too-few-public-methods
+    """
+    The latest sequence of the change log, shared by all clients of the process waiting
+    for changes. While anyone waits, a single task polls the sequence every
+    `LONG_POLL_INTERVAL` seconds (a lookup of the maximal primary key) and wakes up the
+    clients waiting for changes after a smaller sequence.
+    """
+
+    def __init__(self) -> None:
+        self.sequence: int | None = None
+        self._changed = asyncio.Event()
+        self._waiters = 0
+        self._poller: "asyncio.Task[None] | None" = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def wait(self, since: int, timeout: float) -> bool:
+        """
+        Waits up to `timeout` seconds for changes after the sequence. Returns True if
+        there are any, False if the time ran out.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks and events belong to a loop, e.g. a new one of `async_to_sync()`.
+            self._loop, self._changed, self._waiters, self._poller = loop, asyncio.Event(), 0, None
+            self.sequence = None
+
+        deadline = loop.time() + timeout
+        self._waiters += 1
+        if self._poller is None:
+            self._poller = loop.create_task(self._poll())
+        try:
+            while self.sequence is None or self.sequence <= since:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), deadline - loop.time())
+                except asyncio.TimeoutError:
+                    return False
+        finally:
+            self._waiters -= 1
+
+        return True
+
+    async def _poll(self) -> None:
+        """Polls the latest sequence of the log while anyone waits for changes."""
+        try:
+            while self._waiters:
+                sequence = await sync_to_async(IssueChange.latest)()
+                if sequence != self.sequence:
+                    self.sequence = sequence
+                    self._changed.set()
+                    self._changed = asyncio.Event()
+                await asyncio.sleep(conditional.LONG_POLL_INTERVAL)
+        finally:
+            self._poller = None
+
+
+# Latest sequence of the change log, polled for all waiting clients of the process.
+change_watermark = ChangeWatermark()
+
+
+async def wait_for_changes(
+    since: int, limit: int, fieldset: Fieldset, wait: float
+) -> dict[str, typing.Any]:
+    """
+    Returns batch of changes after the sequence, waiting up to `wait` seconds for some
+    if there are none yet (see `change_watermark`).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    batch = await aread_changes(since, limit, fieldset)
+    while not batch["changes"] and await change_watermark.wait(
+        batch["next"], deadline - loop.time()
+    ):
+        batch = await aread_changes(batch["next"], limit, fieldset)
+
+    return batch
+
+
+class ChangeStream:  # pylint: disable=too-few-public-methods
+    """
+    ASGI application streaming changes of issues as server-sent events, wrapping the
+    Django application (see `issue_tracker.asgi`).
+
+    Serves `GET` requests of `path` accepting `text/event-stream` (e.g. by
+    `EventSource`), anything else is passed to the wrapped application. Changes are
+    sent by `change` events carrying the changes of `read_changes()`, with the
+    sequence as the event id, so a reconnecting client continues after the last
+    received change (`Last-Event-ID`), otherwise after `?since=`. Fields of issues can
+    be selected by `?fields=`.
+
+    Streaming doesn't go through the Django request handling: Django 4.1 iterates
+    streamed responses synchronously, which would block the event loop.
+    """
+
+    def __init__(self, application: typing.Any, path: str) -> None:
+        self.application = application
+        self.path = path
+
+    async def __call__(self, scope: typing.Any, receive: typing.Any, send: typing.Any) -> None:
+        headers = dict(scope.get("headers", ())) if scope["type"] == "http" else {}
+        if (
+            scope["type"] != "http"
+            or scope["path"] != self.path
+            or scope["method"] != "GET"
+            or b"text/event-stream" not in headers.get(b"accept", b"")
+        ):
+            await self.application(scope, receive, send)
+            return
+
+        query = QueryDict(scope["query_string"])
+        try:
+            since = since_param({"since": headers.get(b"last-event-id", b"").decode()})
+            since = since or since_param(query)
+            fieldset = IssueListSerializer.get_fieldset(query)
+            batch = await aread_changes(since, KeysetPagination.page_size, fieldset)
+        except APIException as err:
+            data = err.detail if isinstance(err.detail, (list, dict)) else {"detail": err.detail}
+            await _send_json(send, err.status_code, data)
+            return
+        except ChangesExpired as err:
+            await _send_json(send, err.status_code, err.data)
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                ],
+            }
+        )
+        disconnected = asyncio.ensure_future(_disconnect(receive))
+        try:
+            await self._stream(send, batch, fieldset, disconnected)
+        finally:
+            disconnected.cancel()
+
+    async def _stream(
+        self,
+        send: typing.Any,
+        batch: dict[str, typing.Any],
+        fieldset: Fieldset,
+        disconnected: "asyncio.Future[None]",
+    ) -> None:
+        """
+        Sends batches of changes as events until the client disconnects. The next
+        batch is read once there are changes after the sent ones (see
+        `change_watermark`), idle streams are kept open by comments.
+        """
+        loop = asyncio.get_running_loop()
+        idle_since = loop.time()
+        while not disconnected.done():
+            if batch["changes"]:
+                await send(
+                    {"type": "http.response.body", "body": _events(batch), "more_body": True}
+                )
+                idle_since = loop.time()
+
+            while not batch["more"]:
+                timeout = max(0.0, idle_since + KEEP_ALIVE_INTERVAL - loop.time())
+                changed = asyncio.ensure_future(change_watermark.wait(batch["next"], timeout))
+                waiting: set["asyncio.Future[typing.Any]"] = {disconnected, changed}
+                await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    changed.cancel()
+                    return
+                if changed.result():
+                    break
+
+                await send({"type": "http.response.body", "body": b":\n\n", "more_body": True})
+                idle_since = loop.time()
+
+            batch = await aread_changes(batch["next"], KeysetPagination.page_size, fieldset)
+
+
+def _events(batch: dict[str, typing.Any]) -> bytes:
+    """Returns changes of a batch rendered as server-sent events."""
+    renderer = JSONRenderer()
+    return b"".join(
+        b"id: %d\nevent: change\ndata: %s\n\n" % (change["sequence"], renderer.render(change))
+        for change in batch["changes"]
+    )
+
+
+async def _disconnect(receive: typing.Any) -> None:
+    """Returns once the client disconnects."""
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _send_json(send: typing.Any, status: int, data: typing.Any) -> None:
+    """Sends response with data rendered the same way as by the DRF views."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", JSONRenderer.media_type.encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": JSONRenderer().render(data)})
@@ -0,0 +1,49 @@
+"""
+System checks of the issues app. Registered in `IssuesConfig.ready()`.
+"""
+
+# pylint: disable=unused-argument
+
+import typing
+
+from django.apps import AppConfig
+from django.core import checks
+from django.db import connections
+
+from . import sqlite
+
+
+@checks.register(checks.Tags.database)
+def sqlite_pragmas(
+    app_configs: typing.Sequence[AppConfig] | None,
+    databases: typing.Sequence[str] | None = None,
+    **kwargs: typing.Any,
+) -> list[checks.CheckMessage]:
+    """
+    Reports the pragmas in effect on SQLite databases (`ISSUES_SQLITE_PRAGMAS`), warns
+    about the configured ones not in effect. Database checks run by `migrate` (e.g.
+    on start of the Docker image) and by `check --database`.
+    """
+    messages: list[checks.CheckMessage] = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if connection.vendor != "sqlite":
+            continue
+
+        messages.append(
+            checks.Info(
+                f"SQLite database '{alias}': {sqlite.describe(connection)}.", id="issues.I001"
+            )
+        )
+        for name, (value, effective) in sqlite.differences(connection).items():
+            messages.append(
+                checks.Warning(
+                    f"SQLite pragma {name} of database '{alias}' is {effective}, "
+                    f"not {value} as configured by ISSUES_SQLITE_PRAGMAS.",
+                    hint="In-memory databases don't support WAL, and the SQLite build "
+                    "may limit e.g. mmap_size.",
+                    id="issues.W001",
+                )
+            )
+
+    return messages
@@ -0,0 +1,267 @@
+"""
+Conditional GET support (ETag / Last-Modified) of the issues API.
+"""
+
+import asyncio
+import functools
+import typing
+from datetime import datetime, time
+from urllib.parse import quote
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db.models import Subquery
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .filters import DailyStatsFilter
+from .labels import observe_labels
+from .models import Issue, IssueRevision
+
+# Seconds between checks for a change of a long polled resource.
+LONG_POLL_INTERVAL = 1.0
+# Maximal number of seconds a long polling client can wait for a change.
+MAX_LONG_POLL_WAIT = 60.0
+
+
+class Validators(typing.NamedTuple):
+    """Validators of the current representation of a resource."""
+
+    etag: str
+    last_modified: datetime | None
+    # Revision of issues the representation is computed from (see `IssueRevision`).
+    revision: int
+
+
+def conditional(
+    get_validators: typing.Callable[..., Validators | None]
+) -> typing.Callable[
+    [typing.Callable[..., HttpResponseBase]], typing.Callable[..., HttpResponseBase]
+]:
+    """
+    Decorator answering conditional GET requests with `304 Not Modified`.
+
+    Works like `django.views.decorators.http.condition`, but the ETag and the
+    modification time are obtained by a single call of `get_validators`, which is
+    passed the same arguments as the view. The view itself is called only when
+    the resource has changed. The validators are available to the view as
+    `request.validators` (e.g., to be used as a cache key).
+
+    Representations of DRF views differ by the renderer negotiated for the request
+    (e.g. JSON and NDJSON of the same URL), so the ETag includes its format.
+    """
+
+    def decorator(
+        view: typing.Callable[..., HttpResponseBase]
+    ) -> typing.Callable[..., HttpResponseBase]:
+        @functools.wraps(view)
+        def inner(
+            request: WSGIRequest, *args: typing.Any, **kwargs: typing.Any
+        ) -> HttpResponseBase:
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+
+            validators = get_validators(request, *args, **kwargs)
+            if validators is None:
+                return view(request, *args, **kwargs)
+
+            validators = _negotiated(request, view, validators)
+            response = _conditional_response(request, validators)
+            if response is None:
+                response = view(request, *args, **kwargs)
+
+            return _set_validators(response, validators)
+
+        return inner
+
+    return decorator
+
+
+def aconditional(
+    get_validators: typing.Callable[..., typing.Awaitable[Validators | None]]
+) -> typing.Callable[
+    [typing.Callable[..., typing.Coroutine[typing.Any, typing.Any, HttpResponseBase]]],
+    typing.Callable[..., typing.Coroutine[typing.Any, typing.Any, HttpResponseBase]],
+]:
+    """
+    Asynchronous variant of `conditional()` with support of long polling.
+
+    When the request carries `?wait=<seconds>` and the resource hasn't changed, the
+    response is postponed until the resource changes or the time runs out (then
+    `304 Not Modified` is returned). Changes are checked every `LONG_POLL_INTERVAL`
+    seconds. Waiting requests don't occupy any thread when served by an ASGI server.
+    """
+
+    def decorator(
+        view: typing.Callable[..., typing.Coroutine[typing.Any, typing.Any, HttpResponseBase]]
+    ) -> typing.Callable[..., typing.Coroutine[typing.Any, typing.Any, HttpResponseBase]]:
+        @functools.wraps(view)
+        async def inner(
+            request: WSGIRequest, *args: typing.Any, **kwargs: typing.Any
+        ) -> HttpResponseBase:
+            if request.method not in ("GET", "HEAD"):
+                return await view(request, *args, **kwargs)
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + wait_time(request)
+
+            while True:
+                validators = await get_validators(request, *args, **kwargs)
+                if validators is None:
+                    return await view(request, *args, **kwargs)
+
+                # Asynchronous views render JSON only, see `_negotiated()`.
+                validators = validators._replace(etag=f"{validators.etag}-{JSONRenderer.format}")
+                response = _conditional_response(request, validators)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    break
+
+                if loop.time() + LONG_POLL_INTERVAL > deadline:
+                    break
+
+                await asyncio.sleep(LONG_POLL_INTERVAL)
+
+            return _set_validators(response, validators)
+
+        return inner
+
+    return decorator
+
+
+def wait_time(request: HttpRequest) -> float:
+    """Returns number of seconds the client is willing to wait for a change."""
+    try:
+        wait = float(request.GET.get("wait", 0))
+    except ValueError:
+        return 0
+
+    return max(0, min(wait, MAX_LONG_POLL_WAIT))
+
+
+def _negotiated(
+    request: WSGIRequest, view: typing.Callable[..., HttpResponseBase], validators: Validators
+) -> Validators:
+    """
+    Returns validators with format of the renderer the DRF view negotiates for the
+    request added to the ETag. Validators of other views are returned as they are.
+    """
+    view_class = getattr(view, "cls", None)
+    if view_class is None:
+        return validators
+
+    api_view = view_class()
+    renderers = [renderer() for renderer in api_view.renderer_classes]
+    try:
+        renderer, _ = api_view.get_content_negotiator().select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        # Answered by `406 Not Acceptable` by the view.
+        return validators
+
+    return validators._replace(etag=f"{validators.etag}-{renderer.format}")
+
+
+def _conditional_response(request: WSGIRequest, validators: Validators) -> HttpResponseBase | None:
+    """Returns `304 Not Modified` (or `412`) response if the request is conditional."""
+    request.validators = validators  # type: ignore[attr-defined]
+    last_modified = validators.last_modified
+    response: HttpResponseBase | None = get_conditional_response(
+        request,
+        etag=quote_etag(validators.etag),
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    return response
+
+
+def _set_validators(response: HttpResponseBase, validators: Validators) -> HttpResponseBase:
+    """Sets ETag and Last-Modified headers of a response."""
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        if not response.has_header("ETag"):
+            response["ETag"] = quote_etag(validators.etag)
+        if validators.last_modified and not response.has_header("Last-Modified"):
+            response["Last-Modified"] = http_date(int(validators.last_modified.timestamp()))
+
+    # The same URL is represented differently based on the Accept header.
+    patch_vary_headers(response, ("Accept",))
+    return response
+
+
+def issues_validators(request: WSGIRequest) -> Validators:
+    """
+    Validators of the list of issues, based on the global revision counter. Cached
+    labels older than the last change of labels are dropped (see `observe_labels()`),
+    so that the representation of the revision is serialized with current labels.
+    """
+    revision, updated_at, labels_revision = _revision_queryset().first() or (0, None, 0)
+    observe_labels(labels_revision)
+    return Validators(f"issues-{revision}", updated_at, revision)
+
+
+def stats_validators(request: WSGIRequest) -> Validators | None:
+    """
+    Validators of daily statistics, based on the global revision counter and the
+    resolved range of days and category (the default range moves every day). Invalid
+    parameters are left to the view to report.
+    """
+    stats_filter = DailyStatsFilter(data=request.GET)
+    if not stats_filter.is_valid():
+        return None
+
+    params = stats_filter.validated_data
+    since, until, category = params["since"], params["until"], params.get("category") or ""
+    revision, updated_at = IssueRevision.current()
+    if "until" not in request.GET:
+        # The representation changes at midnight, when the range moves.
+        midnight = timezone.make_aware(datetime.combine(until, time()))
+        updated_at = max(updated_at, midnight) if updated_at else midnight
+
+    etag = f"stats-{since}-{until}-{quote(category, safe='')}-{revision}"
+    return Validators(etag, updated_at, revision)
+
+
+def issue_validators(request: WSGIRequest, iid: int) -> Validators | None:
+    """Validators of a single issue, based on its revision (see `issues_validators()`)."""
+    issue = _issue_queryset(iid).first()
+    if issue is None:
+        return None
+
+    revision, updated_at, labels_revision = issue
+    observe_labels(labels_revision or 0)
+    return Validators(f"issue-{iid}-{revision}", updated_at, revision)
+
+
+async def aissues_validators(request: WSGIRequest) -> Validators:
+    """Asynchronous variant of `issues_validators()`."""
+    revision, updated_at, labels_revision = await _revision_queryset().afirst() or (0, None, 0)
+    observe_labels(labels_revision)
+    return Validators(f"issues-{revision}", updated_at, revision)
+
+
+async def aissue_validators(request: WSGIRequest, iid: int) -> Validators | None:
+    """Asynchronous variant of `issue_validators()`."""
+    issue = await _issue_queryset(iid).afirst()
+    if issue is None:
+        return None
+
+    revision, updated_at, labels_revision = issue
+    observe_labels(labels_revision or 0)
+    return Validators(f"issue-{iid}-{revision}", updated_at, revision)
+
+
+def _revision_queryset() -> typing.Any:
+    """Returns query of the revision counter and the last change of labels."""
+    return IssueRevision.objects.filter(pk=1).values_list("value", "updated_at", "labels_revision")
+
+
+def _issue_queryset(iid: int) -> typing.Any:
+    """Returns query of revision, modification time and the last change of labels."""
+    return (
+        Issue.objects.filter(id=iid)
+        .annotate(labels_revision=Subquery(_revision_queryset().values("labels_revision")))
+        .values_list("revision", "updated_at", "labels_revision")
+    )
@@ -0,0 +1,305 @@
+"""
+Bulk export of issues, e.g. for a data warehouse (see the `export_issues` management
+command).
+
+Issues are read by a single query in primary key order, streamed by chunks
+(`QuerySet.iterator()`), and written as gzipped NDJSON or CSV files of about
+`max_file_size` bytes each, so memory used depends neither on the number of issues
+nor on the size of the files. Records have the fields of `FIELDS`, the same ones
+`imports` reads, so exported files can be imported by `import_issues`.
+
+The revision of issues the export is complete up to (and the sequence of the change
+log) is read in the same transaction as the issues, i.e. from the same snapshot, so
+issues changed meanwhile are exported by the next incremental export.
+
+An export is described by a `Checkpoint` saved in the output directory after every
+written file. An interrupted export resumes after the last written file, and an
+incremental export writes only issues changed since the previous (complete) export,
+by revisions of issues (`Issue.revision`), followed by tombstones of issues deleted
+meanwhile, read from the change log (`IssueChange`), in a file of their own
+(`DELETED_FIELDS`). If the change log has expired since the previous export, all
+issues are exported instead.
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import typing
+from pathlib import Path
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .labels import category_labels, refresh_labels, user_labels
+from .models import Issue, IssueChange, IssueChangeHorizon, IssueRevision
+from .renderers import NDJSONRenderer, chunked
+
+# Supported formats of the output.
+FORMATS = ("ndjson", "csv")
+
+# Fields of exported records.
+FIELDS = (
+    "id",
+    "title",
+    "description",
+    "state",
+    "submitter",
+    "assignee",
+    "category",
+    "opened_at",
+    "closed_at",
+    "updated_at",
+    "revision",
+)
+
+# Fields of tombstones of deleted issues, written by incremental exports.
+DELETED_FIELDS = ("id", "revision", "deleted")
+
+# Columns of issues read by the export, ids of the related objects.
+_COLUMNS = tuple(
+    f"{field}_id" if field in ("submitter", "assignee", "category") else field for field in FIELDS
+)
+
+# Name of the file holding the checkpoint, in the output directory.
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+class Checkpoint(typing.NamedTuple):
+    """
+    State of an export of issues changed after the `since` revision up to the
+    `until` one (all issues if `since` is 0): files written so far and the last
+    issue written to them. Deletions are exported from the entries of the change log
+    after the `changes_since` sequence up to the `changes_until` one.
+    """
+
+    format: str
+    since: int
+    until: int
+    last_id: int = 0
+    exported: int = 0
+    files: tuple[str, ...] = ()
+    complete: bool = False
+    changes_since: int = 0
+    changes_until: int = 0
+    deleted: int = 0
+
+
+def load_checkpoint(directory: Path) -> Checkpoint | None:
+    """Returns checkpoint saved in the directory, None if there is none."""
+    try:
+        data = json.loads((directory / CHECKPOINT_NAME).read_text())
+    except FileNotFoundError:
+        return None
+
+    data["files"] = tuple(data["files"])
+    return Checkpoint(**data)
+
+
+def save_checkpoint(directory: Path, checkpoint: Checkpoint) -> None:
+    """Saves checkpoint to the directory, replacing the previous one at once."""
+    temporary = directory / f"{CHECKPOINT_NAME}.tmp"
+    temporary.write_text(json.dumps(checkpoint._asdict(), indent=2))
+    os.replace(temporary, directory / CHECKPOINT_NAME)
+
+
+class IssueExporter:
+    """
+    Exports issues to files of the directory, fetching `chunk_size` issues from the
+    database at once. Files are closed once they reach `max_file_size` bytes
+    (compressed), give or take the size of a chunk.
+    """
+
+    def __init__(
+        self, directory: Path, *, max_file_size: int = 256 << 20, chunk_size: int = 2000
+    ) -> None:
+        self.directory = directory
+        self.max_file_size = max_file_size
+        self.chunk_size = chunk_size
+        self._labels = {str(state.value): str(state.label) for state in Issue.State}
+
+    def start(self, fmt: str, incremental: bool = False) -> Checkpoint:
+        """
+        Returns checkpoint of the export to run: the interrupted one, if any, otherwise
+        a new export of issues changed up to now, since the previous export if
+        `incremental` (all issues if there was none, or if the change log expired
+        since, see `IssueChangeHorizon`). The revision the export is complete up to is
+        read once the export is run.
+        """
+        previous = load_checkpoint(self.directory)
+        if previous is not None and not previous.complete:
+            return previous
+
+        until, _ = IssueRevision.current()
+        if (
+            incremental
+            and previous is not None
+            and previous.changes_until >= IssueChangeHorizon.current()
+        ):
+            return Checkpoint(
+                format=fmt,
+                since=previous.until,
+                until=until,
+                changes_since=previous.changes_until,
+            )
+
+        return Checkpoint(format=fmt, since=0, until=until)
+
+    def run(
+        self,
+        checkpoint: Checkpoint,
+        progress: typing.Callable[[Checkpoint], None] | None = None,
+    ) -> Checkpoint:
+        """
+        Writes files of the export from its checkpoint on, saving the checkpoint and
+        calling `progress` with it after every file. Returns the final checkpoint.
+
+        Issues (and deletions) are read in a single transaction, i.e. from a single
+        snapshot of the database. Unless the export is resumed, the revision and the
+        sequence of the change log it is complete up to are read from the snapshot.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with transaction.atomic():
+            if not checkpoint.files:
+                until, _ = IssueRevision.current()
+                checkpoint = checkpoint._replace(until=until, changes_until=IssueChange.latest())
+
+            refresh_labels()
+            chunks = self._chunks(checkpoint)
+            for first in chunks:
+                name = self._file_name(checkpoint, len(checkpoint.files) + 1)
+                with open(self.directory / name, "wb") as output:
+                    last_id, count = self._write(output, checkpoint.format, first, chunks)
+
+                checkpoint = checkpoint._replace(
+                    last_id=last_id,
+                    exported=checkpoint.exported + count,
+                    files=(*checkpoint.files, name),
+                )
+                save_checkpoint(self.directory, checkpoint)
+                if progress is not None:
+                    progress(checkpoint)
+
+            if checkpoint.since:
+                checkpoint = self._write_deleted(checkpoint)
+
+        checkpoint = checkpoint._replace(complete=True)
+        save_checkpoint(self.directory, checkpoint)
+        return checkpoint
+
+    def _write(
+        self,
+        output: typing.BinaryIO,
+        fmt: str,
+        first: list[dict[str, typing.Any]],
+        chunks: typing.Iterator[list[dict[str, typing.Any]]],
+    ) -> tuple[int, int]:
+        """
+        Writes chunks of records to a gzipped file until it is full (or there are no
+        more), returns id of the last written issue and the number of written issues.
+        """
+        with gzip.GzipFile(fileobj=output, mode="wb", compresslevel=6) as compressed:
+            compressed.write(self._encode(fmt, first, header=True))
+            count, last_id = len(first), first[-1]["id"]
+            if output.tell() < self.max_file_size:
+                for chunk in chunks:
+                    compressed.write(self._encode(fmt, chunk))
+                    count, last_id = count + len(chunk), chunk[-1]["id"]
+                    if output.tell() >= self.max_file_size:
+                        break
+
+        return last_id, count
+
+    def _write_deleted(self, checkpoint: Checkpoint) -> Checkpoint:
+        """
+        Writes tombstones of issues deleted since the previous export to a file of
+        their own, if there are any, returns the checkpoint with the file.
+        """
+        entries = (
+            IssueChange.objects.filter(
+                sequence__gt=checkpoint.changes_since, revision__gt=checkpoint.since, deleted=True
+            )
+            # An issue created again with the id is exported as changed.
+            .exclude(Exists(Issue.objects.filter(id=OuterRef("issue_id"))))
+            .order_by("sequence")
+            .values_list("issue_id", "revision")
+        )
+        records = [{"id": iid, "revision": revision, "deleted": True} for iid, revision in entries]
+        if not records:
+            return checkpoint
+
+        name = f"deleted-{checkpoint.since}-{checkpoint.until}.{checkpoint.format}.gz"
+        with gzip.open(self.directory / name, "wb", compresslevel=6) as compressed:
+            compressed.write(self._encode(checkpoint.format, records, True, DELETED_FIELDS))
+
+        return checkpoint._replace(deleted=len(records), files=(*checkpoint.files, name))
+
+    @staticmethod
+    def _encode(
+        fmt: str,
+        records: list[dict[str, typing.Any]],
+        header: bool = False,
+        fields: tuple[str, ...] = FIELDS,
+    ) -> bytes:
+        """Returns records rendered in the format, CSV with the header if requested."""
+        if fmt == "ndjson":
+            return NDJSONRenderer().render_rows(records)
+
+        text = io.StringIO()
+        writer = csv.DictWriter(text, fields)
+        if header:
+            writer.writeheader()
+        writer.writerows(records)
+        return text.getvalue().encode()
+
+    def _chunks(self, checkpoint: Checkpoint) -> typing.Iterator[list[dict[str, typing.Any]]]:
+        """
+        Yields chunks of records of the issues of the export after its last written
+        issue, in primary key order. The issues are read by a single query.
+        """
+        queryset = Issue.objects.filter(id__gt=checkpoint.last_id)
+        if checkpoint.since:
+            queryset = queryset.filter(revision__gt=checkpoint.since)
+        rows = queryset.order_by("id").values_list(*_COLUMNS).iterator(self.chunk_size)
+
+        for chunk in chunked(rows, self.chunk_size):
+            users = user_labels.get_many({row[4] for row in chunk} | {row[5] for row in chunk})
+            categories = category_labels.get_many({row[6] for row in chunk})
+            yield [self._record(row, users, categories) for row in chunk]
+
+    def _record(
+        self, row: tuple[typing.Any, ...], users: dict[int, str], categories: dict[int, str]
+    ) -> dict[str, typing.Any]:
+        """Returns record of an issue from values of `_COLUMNS`."""
+        (
+            iid,
+            title,
+            description,
+            state,
+            submitter_id,
+            assignee_id,
+            category_id,
+            opened_at,
+            closed_at,
+            updated_at,
+            revision,
+        ) = row
+        return {
+            "id": iid,
+            "title": title,
+            "description": description,
+            "state": self._labels[state],
+            "submitter": users.get(submitter_id),
+            "assignee": users.get(assignee_id),
+            "category": categories.get(category_id),
+            "opened_at": opened_at.isoformat(),
+            "closed_at": closed_at.isoformat() if closed_at is not None else None,
+            "updated_at": updated_at.isoformat(),
+            "revision": revision,
+        }
+
+    @staticmethod
+    def _file_name(checkpoint: Checkpoint, number: int) -> str:
+        """Returns name of a file of the export, e.g. `issues-0-120-00001.ndjson.gz`."""
+        return f"issues-{checkpoint.since}-{checkpoint.until}-{number:05d}.{checkpoint.format}.gz"
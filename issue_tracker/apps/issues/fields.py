@@ -0,0 +1,123 @@
+"""
+Model fields of the issues app.
+"""
+
+import typing
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+if typing.TYPE_CHECKING:
+    from django.db import DefaultConnectionProxy
+
+# Name of the SQL function returning text of a `CompressedTextField` column (SQLite),
+# registered on every connection, e.g. `SELECT uncompressed(description) ...`.
+UNCOMPRESSED_SQL_FUNCTION = "uncompressed"
+
+
+def compress(text: str, min_size: int | None) -> str | bytes:
+    """
+    Returns value stored for text: the text itself, or zlib compressed text if it has
+    at least `min_size` bytes (None never compresses) and compression makes it smaller.
+    """
+    if min_size is None:
+        return text
+
+    encoded = text.encode()
+    if len(encoded) < min_size:
+        return text
+
+    compressed = zlib.compress(encoded)
+    return compressed if len(compressed) < len(encoded) else text
+
+
+def decompress(value: str | bytes | None) -> str | None:
+    """Returns text of a stored value (see `compress()`)."""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode()
+
+    return value
+
+
+class CompressedTextField(models.TextField):  # type: ignore[type-arg]
+    """
+    Text field storing large texts compressed.
+
+    Texts of at least `ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE` bytes (setting, None
+    disables compression) are stored zlib compressed as BLOBs, which SQLite keeps in
+    TEXT columns as they are. Smaller texts are stored as plain text. Both are read
+    as text, so that compression is transparent to Python code, but SQL expressions
+    comparing the column (e.g. `LIKE`) see compressed values of large texts as BLOBs.
+    SQL can read the text by the `uncompressed()` function.
+
+    Changing the setting affects texts written since. Stored texts are rewritten
+    by `manage.py compress_descriptions`.
+    """
+
+    @property
+    def min_size(self) -> int | None:
+        """Returns the minimal size (bytes) of compressed texts, None if disabled."""
+        return getattr(settings, "ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE", None)
+
+    def from_db_value(
+        self, value: str | bytes | None, _expression: typing.Any, _connection: BaseDatabaseWrapper
+    ) -> str | None:
+        """Returns text of a stored value."""
+        return decompress(value)
+
+    def to_python(self, value: typing.Any) -> typing.Any:
+        return super().to_python(decompress(value) if isinstance(value, bytes) else value)
+
+    def get_db_prep_save(self, value: typing.Any, connection: BaseDatabaseWrapper) -> typing.Any:
+        value = super().get_db_prep_save(value, connection)
+        if isinstance(value, str):
+            return compress(value, self.min_size)
+
+        return value
+
+
+def recompress(
+    connection: "BaseDatabaseWrapper | DefaultConnectionProxy",
+    table: str,
+    column: str,
+    min_size: int | None,
+    batch_size: int = 500,
+) -> int:
+    """
+    Rewrites stored texts of a column to be compressed according to `min_size` (see
+    `compress()`), reading the table by batches of rows in the order of ids. Texts are
+    not changed, so neither are other columns. Returns the number of rewritten rows.
+    """
+    table, column = connection.ops.quote_name(table), connection.ops.quote_name(column)
+    rewritten, last = 0, None
+    with connection.cursor() as cursor:
+        while True:
+            after = "" if last is None else "WHERE id > %s"
+            cursor.execute(
+                f"SELECT id, {column} FROM {table} {after} ORDER BY id LIMIT %s",
+                [batch_size] if last is None else [last, batch_size],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return rewritten
+
+            changes = []
+            for iid, stored in rows:
+                value = None if stored is None else compress(decompress(stored) or "", min_size)
+                if value != stored:
+                    changes.append((value, iid))
+            if changes:
+                cursor.executemany(f"UPDATE {table} SET {column} = %s WHERE id = %s", changes)
+
+            rewritten += len(changes)
+            last = rows[-1][0]
+
+
+def register_functions(connection: BaseDatabaseWrapper) -> None:
+    """Registers SQL functions of the fields on a new SQLite connection."""
+    if connection.vendor == "sqlite":
+        connection.connection.create_function(
+            UNCOMPRESSED_SQL_FUNCTION, 1, decompress, deterministic=True
+        )
@@ -0,0 +1,117 @@
+"""
+Filtering and ordering of the issues list (and of statistics) by query parameters.
+"""
+
+import typing
+from datetime import timedelta
+
+from django.db.models import QuerySet
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Issue
+from .serializers import USERNAME_FIELD, StateField
+
+
+class IssueFilter(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Validates query parameters filtering and ordering the issues list.
+
+    Every filter (and their combinations with state) is served by an index of
+    `Issue`, which also provides the default ordering of the filtered issues:
+
+    * `?state=` - `Open`/`Closed` (case insensitive) or the stored value.
+    * `?assignee=` - username of the assignee.
+    * `?category=` - name of the category.
+    * `?opened_after=`/`?opened_before=` - range of `opened_at` (ISO 8601).
+    * `?ordering=` - one of the `orderings` (default `opened_at`).
+    """
+
+    # Whitelisted orderings, always ending by a unique field to be usable by keyset
+    # pagination. Each has an index of `Issue` providing it.
+    orderings: dict[str, tuple[str, ...]] = {
+        "opened_at": ("opened_at", "id"),
+        "-opened_at": ("-opened_at", "-id"),
+        "updated_at": ("updated_at", "id"),
+        "-updated_at": ("-updated_at", "-id"),
+    }
+
+    state = StateField(required=False)
+    assignee = serializers.CharField(required=False)
+    category = serializers.CharField(required=False)
+    opened_after = serializers.DateTimeField(required=False)
+    opened_before = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(choices=list(orderings), default="opened_at")
+
+    # Lookup used by each filter.
+    lookups = {
+        "state": "state",
+        "assignee": f"assignee__{USERNAME_FIELD}",
+        "category": "category__name",
+        "opened_after": "opened_at__gte",
+        "opened_before": "opened_at__lt",
+    }
+
+    @classmethod
+    def from_query_params(cls, query_params: typing.Mapping[str, typing.Any]) -> "IssueFilter":
+        """
+        Returns filter of validated query parameters. Invalid parameters are reported
+        by raising `ValidationError` (`400 Bad Request`).
+        """
+        issue_filter = cls(data=query_params)
+        issue_filter.is_valid(raise_exception=True)
+        return issue_filter
+
+    @property
+    def ordering_fields(self) -> tuple[str, ...]:
+        """Returns fields the filtered issues are ordered by."""
+        return self.orderings[self.validated_data["ordering"]]
+
+    def filter_queryset(self, queryset: QuerySet[Issue]) -> QuerySet[Issue]:
+        """Returns queryset filtered and ordered by the query parameters."""
+        conditions = {
+            self.lookups[name]: value
+            for name, value in self.validated_data.items()
+            if name in self.lookups
+        }
+        return queryset.filter(**conditions).order_by(*self.ordering_fields)
+
+
+class DailyStatsFilter(serializers.Serializer):  # pylint: disable=abstract-method
+    """
+    Validates query parameters selecting daily rollups of issues (`DailyStats`):
+
+    * `?since=`/`?until=` - range of days (inclusive, ISO 8601 dates), the last
+      `default_days` days by default, at most `max_days` days.
+    * `?category=` - name of the category, all categories by default.
+    """
+
+    default_days = 30
+    max_days = 366
+
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    category = serializers.CharField(required=False)
+
+    @classmethod
+    def from_query_params(cls, query_params: typing.Mapping[str, typing.Any]) -> "DailyStatsFilter":
+        """
+        Returns filter of validated query parameters. Invalid parameters are reported
+        by raising `ValidationError` (`400 Bad Request`).
+        """
+        stats_filter = cls(data=query_params)
+        stats_filter.is_valid(raise_exception=True)
+        return stats_filter
+
+    def validate(self, attrs: dict[str, typing.Any]) -> dict[str, typing.Any]:
+        until = attrs.get("until") or timezone.localdate()
+        since = attrs.get("since") or until - timedelta(days=self.default_days - 1)
+        if since > until:
+            raise serializers.ValidationError({"since": ["Must not be after until."]})
+
+        if (until - since).days >= self.max_days:
+            raise serializers.ValidationError(
+                {"since": [f"Ensure the range has no more than {self.max_days} days."]}
+            )
+
+        return {**attrs, "since": since, "until": until}
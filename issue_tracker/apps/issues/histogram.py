@@ -0,0 +1,69 @@
+"""
+Log-bucketed histograms of durations with approximate percentiles.
+
+Durations (non-negative seconds) are counted in buckets whose bounds grow
+geometrically by `GAMMA`. Any percentile estimated from such histogram is within
+`RELATIVE_ACCURACY` of the true value (relative error), no matter how the durations
+are distributed, while the number of buckets grows only logarithmically with the
+longest duration (about 900 buckets per century).
+
+Zero has a bucket of its own (bucket 0). Bucket `i > 0` holds durations in
+`(GAMMA ** (i - 2), GAMMA ** (i - 1)]`.
+"""
+
+import math
+import typing
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(GAMMA)
+
+# Percentiles shown by default.
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def bucket_of(value: float) -> int:
+    """Returns bucket of a duration."""
+    if value <= 0:
+        return 0
+
+    return 1 + math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def bucket_value(bucket: int) -> float:
+    """
+    Returns value representing durations of a bucket, which is within
+    `RELATIVE_ACCURACY` of any of them.
+    """
+    if bucket <= 0:
+        return 0.0
+
+    return 2 * GAMMA ** (bucket - 1) / (GAMMA + 1)
+
+
+def percentiles(
+    buckets: typing.Iterable[tuple[int, int]], quantiles: typing.Iterable[float] = QUANTILES
+) -> dict[float, float | None]:
+    """
+    Returns estimated percentiles of durations counted by `(bucket, count)` pairs
+    (ordered by bucket). Percentiles of no durations are None.
+    """
+    buckets = [(bucket, count) for bucket, count in buckets if count > 0]
+    total = sum(count for _, count in buckets)
+    result: dict[float, float | None] = {}
+
+    for quantile in sorted(quantiles):
+        if not total:
+            result[quantile] = None
+            continue
+
+        # Rank of the percentile among the sorted durations (counted from zero).
+        rank = quantile * (total - 1)
+        seen = 0
+        for bucket, count in buckets:
+            seen += count
+            if seen > rank:
+                result[quantile] = bucket_value(bucket)
+                break
+
+    return result
@@ -0,0 +1,344 @@
+"""
+Bulk import of issues, e.g. when migrating from another tracker (see the
+`import_issues` management command).
+
+Records of issues are read from NDJSON or CSV (optionally gzipped) as a stream (see
+`read_records()`) and written by `IssueImporter` in batches of rows inserted by
+single statements, many batches per transaction. Nothing is done per issue but
+converting the record into a row: users and categories are resolved by in-memory
+lookups, and the columns derived from the others (`previous_state`,
+`resolution_duration`), statistics, the change log and the search index are updated
+by a few set-based statements per transaction.
+
+A record has the fields `title`, `description`, `submitter`, `assignee` (usernames),
+`category` (name), `state` (label or stored value, open by default), `opened_at`
+and `closed_at` (ISO 8601, the time of the import and the opening time by default).
+"""
+
+import csv
+import gzip
+import io
+import itertools
+import json
+import sys
+import typing
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, Case, F, Max, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search
+from .fields import compress
+from .models import (
+    Category,
+    Issue,
+    IssueChange,
+    IssueRevision,
+    StatsEntry,
+    record_stats,
+)
+from .renderers import chunked
+from .serializers import USERNAME_FIELD
+
+# Supported formats of the input.
+FORMATS = ("ndjson", "csv")
+
+# A record of an issue with its number (line of the input).
+Record = tuple[int, dict[str, typing.Any]]
+
+# Stored values of states by their labels and values, lowercase.
+_STATES = {
+    **{str(state.value).lower(): str(state.value) for state in Issue.State},
+    **{str(state.label).lower(): str(state.value) for state in Issue.State},
+}
+
+# Columns written by the import. The columns derived from the others are written by
+# the defaults first and computed once the rows are inserted.
+_COLUMNS = (
+    "title",
+    "description",
+    "submitter_id",
+    "assignee_id",
+    "category_id",
+    "state",
+    "opened_at",
+    "closed_at",
+    "updated_at",
+    "revision",
+    "previous_state",
+    "resolution_duration",
+)
+
+
+class InvalidRecord(ValueError):
+    """A record of the input which can't be imported."""
+
+    def __init__(self, number: int, message: str) -> None:
+        super().__init__(f"Record {number}: {message}")
+
+
+def detect_format(path: str) -> str | None:
+    """Returns format of a file by its name (e.g. `issues.csv.gz`), None if unknown."""
+    name = path.lower().removesuffix(".gz")
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+
+    return None
+
+
+def open_input(path: str) -> typing.TextIO:
+    """
+    Opens text of a file (`-` for the standard input), decompressed if gzipped (told
+    by its content).
+    """
+    # pylint: disable-next=consider-using-with
+    stream: typing.BinaryIO = sys.stdin.buffer if path == "-" else open(path, "rb")
+    if isinstance(stream, io.BufferedReader) and stream.peek(2)[:2] == b"\x1f\x8b":
+        stream = typing.cast(typing.BinaryIO, gzip.GzipFile(fileobj=stream))
+
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+def read_records(stream: typing.TextIO, fmt: str) -> typing.Iterator[Record]:
+    """Yields records of issues read from a stream of the format, with their numbers."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as err:
+            raise InvalidRecord(number, f"Invalid JSON: {err}") from err
+        if not isinstance(record, dict):
+            raise InvalidRecord(number, "Expected a JSON object.")
+        yield number, record
+
+
+class IssueImporter:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    Imports issues from records, `batch_size` rows inserted by a statement and about
+    `transaction_size` rows per transaction. Every transaction counts as a single
+    change of issues (one `IssueRevision`), so that clients see the imported issues
+    by whole transactions, and keeps statistics of issues and the search index up to
+    date.
+
+    Unknown users and categories are either created (`create_missing`), or reported
+    by raising `InvalidRecord`, like any other invalid record. Transactions committed
+    before an invalid record stay imported.
+
+    With `defer_indexes`, indexes of the issues table are dropped during the import and
+    created once all issues are written, along with the search index, which makes
+    imports into large tables much faster, but the table is not indexed meanwhile.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = 5000,
+        transaction_size: int = 100000,
+        create_missing: bool = False,
+        submitter: str | None = None,
+        defer_indexes: bool = False,
+    ) -> None:
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.create_missing = create_missing
+        self.submitter = submitter
+        self.defer_indexes = defer_indexes
+        self._users: dict[str, int] = dict(
+            get_user_model().objects.values_list(USERNAME_FIELD, "pk").iterator(10000)
+        )
+        self._categories: dict[str, int] = dict(Category.objects.values_list("name", "pk"))
+        # Descriptions are written compressed the same way as by `CompressedTextField`.
+        self._min_size: int | None = getattr(Issue._meta.get_field("description"), "min_size")
+        self._adapt_datetime = connection.ops.adapt_datetimefield_value
+
+    def run(
+        self, records: typing.Iterable[Record], progress: typing.Callable[[int], None] | None = None
+    ) -> int:
+        """
+        Imports issues of the records, calling `progress` with the number of imported
+        issues after every transaction. Returns the number of imported issues.
+        """
+        table = Issue._meta.db_table
+        indexes = drop_indexes(table) if self.defer_indexes else []
+        first_last_id = Issue.objects.aggregate(last=Max("id"))["last"] or 0
+        imported = 0
+        try:
+            batches = chunked(records, self.batch_size)
+            for first in batches:
+                with transaction.atomic():
+                    count = self._import(itertools.chain([first], batches))
+                imported += count
+                if progress is not None:
+                    progress(imported)
+        finally:
+            if self.defer_indexes:
+                create_indexes(indexes)
+                # Issues of the committed transactions, even if a later one failed.
+                search.index_issues_after(first_last_id)
+
+        return imported
+
+    def _import(self, batches: typing.Iterator[list[Record]]) -> int:
+        """
+        Writes batches of records until the transaction is full (or there are no
+        more), returns the number of written issues.
+        """
+        now = timezone.now()
+        revision = IssueRevision.bump(now)
+        last_id = Issue.objects.aggregate(last=Max("id"))["last"] or 0
+        constants = (self._adapt_datetime(now), revision, Issue.State.OPEN.value, 0)
+
+        insert = (
+            f"INSERT INTO {Issue._meta.db_table} ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join(['%s'] * len(_COLUMNS))})"
+        )
+        count = 0
+        with connection.cursor() as cursor:
+            for batch in batches:
+                self._resolve(batch)
+                cursor.executemany(insert, [self._row(record, constants) for record in batch])
+                count += len(batch)
+                if count >= self.transaction_size:
+                    break
+
+        imported = Issue.objects.filter(id__gt=last_id)
+        # Seconds closed issues were open, truncated the same way as by `Issue.save()`.
+        open_for = Cast(F("closed_at") - F("opened_at"), BigIntegerField()) / 1_000_000
+        imported.update(
+            previous_state=F("state"),
+            resolution_duration=Case(
+                When(state=Issue.State.CLOSED, then=open_for), default=Value(0)
+            ),
+        )
+
+        entries = imported.order_by().values_list(*StatsEntry._fields).iterator(10000)
+        record_stats(added=[StatsEntry(*entry) for entry in entries])
+        IssueChange.record(revision, now)
+        if not self.defer_indexes:
+            search.index_issues_after(last_id)
+
+        return count
+
+    def _resolve(self, batch: list[Record]) -> None:
+        """
+        Finds users and categories referenced by records of the batch, creating the
+        missing ones if allowed.
+        """
+        users = {self.submitter} if self.submitter else set()
+        categories = set()
+        for _, record in batch:
+            users.update((record.get("submitter") or "", record.get("assignee") or ""))
+            categories.add(record.get("category") or "")
+        users.discard("")
+        categories.discard("")
+
+        missing_users = users - self._users.keys()
+        missing_categories = categories - self._categories.keys()
+        if not self.create_missing or not (missing_users or missing_categories):
+            return
+
+        user_model = get_user_model()
+        new_users: list[typing.Any] = [
+            user_model(**{USERNAME_FIELD: name}) for name in sorted(missing_users)
+        ]
+        for user in new_users:
+            user.set_unusable_password()
+        for user in user_model.objects.bulk_create(new_users):
+            self._users[getattr(user, USERNAME_FIELD)] = user.pk
+
+        new_categories = [Category(name=name) for name in sorted(missing_categories)]
+        for category in Category.objects.bulk_create(new_categories):
+            self._categories[category.name] = category.pk
+
+    def _row(self, record: Record, constants: tuple[typing.Any, ...]) -> tuple[typing.Any, ...]:
+        """Returns values of `_COLUMNS` of a record."""
+        number, values = record
+        title = values.get("title") or ""
+        if not title or len(title) > 80:
+            raise InvalidRecord(number, "Title must have 1 to 80 characters.")
+
+        state = _STATES.get(str(values.get("state") or "open").lower())
+        if state is None:
+            raise InvalidRecord(number, f"Unknown state {values.get('state')!r}.")
+
+        opened_at = self._datetime(number, values.get("opened_at")) or timezone.now()
+        closed_at = None
+        if state == Issue.State.CLOSED:
+            closed_at = self._datetime(number, values.get("closed_at")) or opened_at
+            if closed_at < opened_at:
+                raise InvalidRecord(number, "Issue cannot be closed before it was opened.")
+
+        return (
+            title,
+            compress(values.get("description") or "", self._min_size),
+            self._lookup(number, self._users, values.get("submitter") or self.submitter),
+            self._lookup(number, self._users, values.get("assignee")),
+            self._lookup(number, self._categories, values.get("category")),
+            state,
+            self._adapt_datetime(opened_at),
+            self._adapt_datetime(closed_at),
+            *constants,
+        )
+
+    @staticmethod
+    def _lookup(number: int, ids: dict[str, int], name: str | None) -> int:
+        """Returns id of an object (user, category) by its name."""
+        if not name:
+            raise InvalidRecord(number, "Missing submitter, assignee or category.")
+        try:
+            return ids[name]
+        except KeyError:
+            raise InvalidRecord(number, f"Unknown user or category {name!r}.") from None
+
+    @staticmethod
+    def _datetime(number: int, value: str | None) -> datetime | None:
+        """Returns aware datetime of an ISO 8601 value, None if empty."""
+        if not value:
+            return None
+        try:
+            # Unlike `datetime.fromisoformat()` of Python 3.10, accepts the "Z" suffix.
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise InvalidRecord(number, f"Invalid datetime {value!r}.")
+
+        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def drop_indexes(table: str) -> list[str]:
+    """
+    Drops the indexes of an SQLite table created by SQL statements (i.e. not the
+    automatic ones, e.g. of primary keys), returns the statements.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master "
+            "WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL",
+            [table],
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    return [sql for _, sql in indexes]
+
+
+def create_indexes(statements: list[str]) -> None:
+    """Creates indexes dropped by `drop_indexes()`."""
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
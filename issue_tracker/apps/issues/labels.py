@@ -0,0 +1,157 @@
+"""
+In-process cache of labels of objects referenced by issues.
+
+Issues are represented with the name of their category and the usernames of their
+assignee and submitter. The labels are looked up by primary key in caches private
+to the process (`category_labels`, `user_labels`), so serializing issues needs
+neither joins nor queries once the labels are cached.
+
+Labels are dropped by signal handlers whenever their object is changed in this
+process. Changes made by other processes are recorded as the revision of the last
+change of labels (`IssueRevision.labels_revision`), which is read by validators of
+the API along with the revision of issues and passed to `observe_labels()`: cached
+labels are dropped as soon as a newer change of labels is observed, before the
+payload of the new revision is serialized (and cached). As a last resort, cached
+labels older than `ISSUES_LABELS_TIMEOUT` seconds (setting, default 60, None never
+expires) are reloaded as well. The number of cached labels of each model can be
+bounded by `ISSUES_LABELS_MAX_SIZE` (setting, default None), evicting the least
+recently used.
+"""
+
+import collections
+import threading
+import time
+import typing
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from .models import Category, IssueRevision
+
+
+class LabelCache:
+    """
+    Labels of objects of a model by primary key, loaded by batches on cache miss.
+    """
+
+    def __init__(self, load: typing.Callable[[set[int]], dict[int, str]]) -> None:
+        self._load = load
+        # Label and time of loading by primary key, least recently used first.
+        self._labels: collections.OrderedDict[int, tuple[str, float]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # Revision of the last change of labels observed, see `observe()`.
+        self._revision = 0
+
+    @property
+    def max_size(self) -> int | None:
+        """Returns the maximal number of cached labels, None if unbounded."""
+        return getattr(settings, "ISSUES_LABELS_MAX_SIZE", None)
+
+    @property
+    def timeout(self) -> float | None:
+        """Returns seconds after which cached labels are reloaded, None if never."""
+        return getattr(settings, "ISSUES_LABELS_TIMEOUT", 60)
+
+    def get(self, pk: int) -> str | None:
+        """Returns label of an object, or None if there is no such object."""
+        return self.get_many([pk]).get(pk)
+
+    def get_many(self, pks: typing.Iterable[int]) -> dict[int, str]:
+        """Returns labels of objects by primary key, loading the missing ones by a query."""
+        labels, missing, revision = self._cached(pks)
+        if missing:
+            labels.update(self._store(self._load(missing), revision))
+        return labels
+
+    async def aget_many(self, pks: typing.Iterable[int]) -> dict[int, str]:
+        """Asynchronous variant of `get_many()`."""
+        labels, missing, revision = self._cached(pks)
+        if missing:
+            labels.update(self._store(await sync_to_async(self._load)(missing), revision))
+        return labels
+
+    def invalidate(self, pk: int | None = None) -> None:
+        """Drops cached label of an object, or all cached labels (and changes observed)."""
+        with self._lock:
+            if pk is None:
+                self._labels.clear()
+                self._revision = 0
+            else:
+                self._labels.pop(pk, None)
+
+    def observe(self, revision: int) -> None:
+        """Drops all cached labels if the last change of labels is newer than seen so far."""
+        with self._lock:
+            if revision > self._revision:
+                self._labels.clear()
+                self._revision = revision
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def _cached(self, pks: typing.Iterable[int]) -> tuple[dict[int, str], set[int], int]:
+        """
+        Returns cached labels, primary keys of objects whose label is missing and the
+        last change of labels observed.
+        """
+        timeout, now = self.timeout, time.monotonic()
+        labels: dict[int, str] = {}
+        missing: set[int] = set()
+        with self._lock:
+            for pk in pks:
+                cached = self._labels.get(pk)
+                if cached is None or (timeout is not None and now - cached[1] > timeout):
+                    missing.add(pk)
+                else:
+                    labels[pk] = cached[0]
+                    self._labels.move_to_end(pk)
+
+            return labels, missing, self._revision
+
+    def _store(self, labels: dict[int, str], revision: int) -> dict[int, str]:
+        """
+        Caches loaded labels, evicting the least recently used over `max_size`. Labels
+        loaded before a newer change of labels was observed are not cached.
+        """
+        max_size, now = self.max_size, time.monotonic()
+        with self._lock:
+            if revision != self._revision:
+                return labels
+
+            for pk, label in labels.items():
+                self._labels[pk] = (label, now)
+                self._labels.move_to_end(pk)
+
+            while max_size is not None and len(self._labels) > max_size:
+                self._labels.popitem(last=False)
+
+        return labels
+
+
+def _load_categories(_: set[int]) -> dict[int, str]:
+    # There are only a few categories, all of them are loaded at once.
+    return dict(Category.objects.values_list("id", "name"))
+
+
+def _load_users(pks: set[int]) -> dict[int, str]:
+    return {user.pk: str(user) for user in get_user_model().objects.filter(pk__in=pks)}
+
+
+category_labels = LabelCache(_load_categories)
+user_labels = LabelCache(_load_users)
+
+
+def observe_labels(revision: int) -> None:
+    """
+    Drops labels cached before the last change of labels (`IssueRevision.labels_revision`)
+    with the revision, e.g. a category renamed by another process.
+    """
+    category_labels.observe(revision)
+    user_labels.observe(revision)
+
+
+def refresh_labels() -> None:
+    """Observes the last change of labels by a query, see `observe_labels()`."""
+    revisions = IssueRevision.objects.filter(pk=1).values_list("labels_revision", flat=True)
+    observe_labels(revisions.first() or 0)
@@ -0,0 +1,39 @@
+"""
+Rebuilds daily rollups of issues.
+"""
+
+import typing
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from ...models import DailyStats
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds daily rollups of issues (`DailyStats`) from the issues table, by a single
+    streaming pass over the issues opened or closed in the range.
+
+    The rollups are maintained by changes of issues. Rebuild them after changing
+    issues by other means (e.g. raw SQL or loading a database dump).
+    """
+
+    help = "Rebuilds daily rollups of issues (of all days, or of the last days)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        range_group = parser.add_mutually_exclusive_group()
+        range_group.add_argument(
+            "--since", type=date.fromisoformat, help="First day to rebuild (YYYY-MM-DD)."
+        )
+        range_group.add_argument("--days", type=int, help="Number of the last days to rebuild.")
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        since: date | None = options["since"]
+        if options["days"] is not None:
+            since = timezone.localdate() - timedelta(days=options["days"] - 1)
+
+        count = DailyStats.rebuild(since)
+        days = f"since {since}" if since is not None else "of all days"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily rollups {days}."))
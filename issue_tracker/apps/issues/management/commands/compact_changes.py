@@ -0,0 +1,56 @@
+"""
+Compacts the change log of issues and drops its expired entries.
+"""
+
+import time
+import typing
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from ...models import IssueChange
+
+
+class Command(BaseCommand):
+    """
+    Applies the retention policy of the change log of issues (`IssueChange`): drops
+    entries older than the retention period (`--retention-days`, by default the
+    `ISSUES_CHANGES_RETENTION_DAYS` setting, 30 days), then entries superseded by a
+    later entry of the same issue. The log is left with at most one entry per issue
+    changed or deleted within the retention period.
+
+    Clients which haven't read the feed of changes for longer than the retention
+    period have to read all issues again.
+
+    With `--interval`, keeps compacting every that many seconds.
+    """
+
+    help = "Compacts the change log of issues and drops its expired entries."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--retention-days",
+            type=float,
+            default=getattr(settings, "ISSUES_CHANGES_RETENTION_DAYS", 30),
+            help="Days entries of the log are kept for.",
+        )
+        parser.add_argument(
+            "--interval", type=float, help="Seconds between compactions, compacts once if not set."
+        )
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        retention = timedelta(days=options["retention_days"])
+        interval: float | None = options["interval"]
+        while True:
+            expired = IssueChange.expire(timezone.now() - retention)
+            compacted = IssueChange.compact()
+            self.stdout.write(
+                f"Dropped {expired} expired and {compacted} superseded entries of the change log."
+            )
+
+            if interval is None:
+                return
+
+            time.sleep(interval)
@@ -0,0 +1,32 @@
+"""
+Rewrites stored descriptions of issues according to the compression setting.
+"""
+
+import typing
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from ...fields import recompress
+from ...models import Issue
+
+
+class Command(BaseCommand):
+    """
+    Compresses descriptions of issues of at least `ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE`
+    bytes and stores the others as plain text (see `CompressedTextField`).
+
+    New descriptions are stored according to the setting, run the command after
+    changing it to rewrite the existing ones. Descriptions (and other fields) of
+    issues stay the same.
+    """
+
+    help = "Rewrites descriptions of issues compressed according to the settings."
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        field = Issue._meta.get_field("description")
+        min_size = getattr(field, "min_size")
+        with transaction.atomic():
+            count = recompress(connection, Issue._meta.db_table, field.column, min_size)
+
+        self.stdout.write(self.style.SUCCESS(f"Rewrote {count} descriptions."))
@@ -0,0 +1,79 @@
+"""
+Exports issues to gzipped NDJSON or CSV files.
+"""
+
+import time
+import typing
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...exports import FORMATS, Checkpoint, IssueExporter
+
+
+class Command(BaseCommand):
+    """
+    Exports issues to gzipped NDJSON or CSV files of a directory, in primary key
+    order, see `exports`. Files are split by `--max-file-size`, and the export is
+    checkpointed after every file: an interrupted export is resumed by running the
+    command again.
+
+    With `--incremental`, only issues changed since the previous export to the
+    directory are exported, followed by tombstones of the issues deleted since.
+    """
+
+    help = "Exports issues to gzipped NDJSON or CSV files (all, or changed since last time)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("directory", type=Path, help="Directory of the exported files.")
+        parser.add_argument(
+            "--format", choices=FORMATS, help="Format of the files (default ndjson)."
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Export only issues changed since the previous export.",
+        )
+        parser.add_argument(
+            "--max-file-size",
+            type=int,
+            default=256,
+            help="Size of a file (compressed) in MiB, after which the next one is started.",
+        )
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        exporter = IssueExporter(options["directory"], max_file_size=options["max_file_size"] << 20)
+        checkpoint = exporter.start(options["format"] or "ndjson", options["incremental"])
+        if checkpoint.files:
+            if options["format"] not in (None, checkpoint.format):
+                raise CommandError(
+                    f"An interrupted {checkpoint.format} export can't be resumed as "
+                    f"{options['format']}, remove {options['directory']} to start over."
+                )
+            self.stdout.write(
+                f"Resuming the export after issue {checkpoint.last_id} "
+                f"({len(checkpoint.files)} files written)."
+            )
+
+        start = time.monotonic()
+        resumed = checkpoint.exported
+
+        def progress(current: Checkpoint) -> None:
+            rate = (current.exported - resumed) / max(time.monotonic() - start, 1e-6)
+            self.stdout.write(
+                f"Wrote {current.files[-1]}, {current.exported} issues ({rate:.0f} issues/s)."
+            )
+
+        try:
+            checkpoint = exporter.run(checkpoint, progress)
+        except OSError as err:
+            raise CommandError(str(err)) from err
+
+        changed = f"changed since revision {checkpoint.since} " if checkpoint.since else ""
+        deleted = f" ({checkpoint.deleted} deleted)" if checkpoint.since else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {checkpoint.exported} issues {changed}up to revision "
+                f"{checkpoint.until}{deleted} in {time.monotonic() - start:.1f} s."
+            )
+        )
@@ -0,0 +1,86 @@
+"""
+Imports issues from NDJSON or CSV files in bulk.
+"""
+
+import time
+import typing
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...imports import (
+    FORMATS,
+    InvalidRecord,
+    IssueImporter,
+    detect_format,
+    open_input,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    """
+    Imports issues from a NDJSON or CSV file, optionally gzipped, see `imports` for
+    the fields of records. Issues are written by batched inserts in large
+    transactions (`IssueImporter`), the progress is reported in issues per second
+    after every transaction.
+
+    Use `--defer-indexes` for large imports: indexes of issues (and the search index)
+    are built once all issues are written.
+    """
+
+    help = "Imports issues from a NDJSON or CSV file (optionally gzipped)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("path", help="File to import, '-' for the standard input.")
+        parser.add_argument(
+            "--format", choices=FORMATS, help="Format of the file, told by its name by default."
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=5000, help="Issues inserted by a statement."
+        )
+        parser.add_argument(
+            "--transaction-size", type=int, default=100000, help="Issues per transaction."
+        )
+        parser.add_argument(
+            "--create-missing",
+            action="store_true",
+            help="Create unknown users (without password) and categories.",
+        )
+        parser.add_argument("--submitter", help="Username of submitter of records without one.")
+        parser.add_argument(
+            "--defer-indexes",
+            action="store_true",
+            help="Build indexes of issues once all issues are written.",
+        )
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        fmt = options["format"] or detect_format(options["path"])
+        if fmt is None:
+            raise CommandError("Unknown format of the file, use --format.")
+
+        importer = IssueImporter(
+            batch_size=options["batch_size"],
+            transaction_size=options["transaction_size"],
+            create_missing=options["create_missing"],
+            submitter=options["submitter"],
+            defer_indexes=options["defer_indexes"],
+        )
+        start = time.monotonic()
+
+        def progress(count: int) -> None:
+            rate = count / max(time.monotonic() - start, 1e-6)
+            self.stdout.write(f"Imported {count} issues ({rate:.0f} issues/s).")
+
+        try:
+            with open_input(options["path"]) as stream:
+                count = importer.run(read_records(stream, fmt), progress)
+        except (InvalidRecord, OSError, UnicodeDecodeError) as err:
+            raise CommandError(str(err)) from err
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {count} issues in {elapsed:.1f} s "
+                f"({count / max(elapsed, 1e-6):.0f} issues/s)."
+            )
+        )
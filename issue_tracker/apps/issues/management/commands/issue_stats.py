@@ -0,0 +1,52 @@
+"""
+Rebuilds or verifies statistics of issues.
+"""
+
+import typing
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...models import IssueStats, ResolutionBucket
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds statistics of issues (`IssueStats`) and histograms of resolution
+    durations (`ResolutionBucket`) from the issues table, or verifies the maintained
+    statistics against it.
+
+    The statistics are maintained by changes of issues. Rebuild them after changing
+    issues by other means (e.g. raw SQL or loading a database dump).
+    """
+
+    help = "Rebuilds or verifies statistics of issues."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("action", choices=["rebuild", "verify"])
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        if options["action"] == "rebuild":
+            stats = IssueStats.rebuild()
+            ResolutionBucket.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Rebuilt statistics of {stats.open_count + stats.closed_count} issues."
+                )
+            )
+            return
+
+        differences = IssueStats.current().differences(IssueStats.compute())
+        stored_buckets, actual_buckets = ResolutionBucket.counts(), ResolutionBucket.compute()
+        for category_id, bucket in sorted(stored_buckets.keys() | actual_buckets.keys()):
+            stored = stored_buckets.get((category_id, bucket), 0)
+            actual = actual_buckets.get((category_id, bucket), 0)
+            if stored != actual:
+                differences[f"bucket {bucket} of category {category_id}"] = (stored, actual)
+
+        for name, (stored, actual) in differences.items():
+            self.stderr.write(f"{name}: stored {stored}, actual {actual}")
+
+        if differences:
+            raise CommandError("Statistics differ from issues, rebuild them.")
+
+        self.stdout.write(self.style.SUCCESS("Statistics match issues."))
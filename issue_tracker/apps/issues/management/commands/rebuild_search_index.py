@@ -0,0 +1,24 @@
+"""
+Rebuilds the full-text search index of issues.
+"""
+
+import typing
+
+from django.core.management.base import BaseCommand
+
+from ...search import rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the full-text search index of issues from scratch.
+
+    The index is kept in sync by saving and deleting issues. Rebuild it after
+    changing issues by other means (e.g. raw SQL or loading a database dump).
+    """
+
+    help = "Rebuilds the full-text search index of issues."
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} issues."))
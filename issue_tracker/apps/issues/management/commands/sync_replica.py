@@ -0,0 +1,53 @@
+"""
+Copies the primary database to the local read replica.
+"""
+
+import time
+import typing
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from ...replica import copy_database, data_version, replica_alias
+
+
+class Command(BaseCommand):
+    """
+    Copies the primary SQLite database to the read replica (`ISSUES_READ_REPLICA`) by
+    the SQLite backup API, see `replica.copy_database()`.
+
+    With `--interval`, keeps copying every that many seconds, skipping the copy when
+    nothing has been written to the primary since the last one, so that the replica
+    lags behind the primary by about the interval (plus the time of a copy).
+    """
+
+    help = "Copies the primary database to the read replica (once, or periodically)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--interval", type=float, help="Seconds between copies, copies once if not set."
+        )
+
+    def handle(self, *args: typing.Any, **options: typing.Any) -> None:
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("No read replica is configured by ISSUES_READ_REPLICA.")
+
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if primary.vendor != "sqlite" or replica.vendor != "sqlite":
+            raise CommandError("Only SQLite databases can be copied to the replica.")
+
+        interval: float | None = options["interval"]
+        copied: int | None = None
+        while True:
+            version = data_version(primary)
+            if version != copied:
+                start = time.monotonic()
+                copy_database(primary, replica)
+                copied = version
+                self.stdout.write(f"Copied the database in {time.monotonic() - start:.2f} s.")
+
+            if interval is None:
+                return
+
+            time.sleep(interval)
@@ -0,0 +1,448 @@
+"""
+Metrics of requests, exposed in the Prometheus text format by `/metrics`.
+
+For every request (of any view, including the admin), `metrics_middleware` records
+its duration, the number of SQL queries it made and their total duration, the time
+spent serializing issues (see `serializing()`) and the size of the response, each
+by a histogram labelled by the view and the method (the duration also by the status).
+
+Values of every process are kept in a memory mapped file of its own in the directory
+of the `ISSUES_METRICS_DIR` setting (see `MappedValues`), so that `/metrics` served by
+any worker reports the sum over all workers, including exited ones (values never go
+back). Recording a value writes to the mapped memory without any system call. Without
+the setting, values are kept in anonymous memory of the process and `/metrics`
+reports the process only (e.g. the development server).
+
+`/metrics` is served to staff users and to scrapers presenting the token of the
+`ISSUES_METRICS_TOKEN` setting (`Authorization: Bearer <token>`), see
+`permissions.can_read_metrics()`.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import mmap
+import os
+import struct
+import threading
+import time
+import typing
+from pathlib import Path
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.decorators import sync_and_async_middleware
+
+# Media type of the Prometheus text format.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Methods of requests recorded by their names, others are recorded as "other".
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+# Number of bytes used by the entries of a mapped file, at its start.
+_HEADER = struct.Struct("q")
+# Length of the key of an entry, followed by the key and the value (8-byte aligned).
+_LENGTH = struct.Struct("i")
+_VALUE = struct.Struct("d")
+
+
+def _aligned(offset: int) -> int:
+    """Returns the offset rounded up to a multiple of 8 bytes."""
+    return offset + -offset % 8
+
+
+def _entries(data: typing.Any) -> typing.Iterator[tuple[str, int]]:
+    """Yields keys of the entries of mapped values, with the offsets of the values."""
+    (used,) = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    while offset < used:
+        (length,) = _LENGTH.unpack_from(data, offset)
+        start = offset + _LENGTH.size
+        end = start + length
+        key = bytes(data[start:end]).decode()
+        offset = _aligned(end)
+        yield key, offset
+        offset += _VALUE.size
+
+
+class MappedValues:
+    """
+    Numbers by their keys, kept in memory mapped to a file (or anonymous memory).
+
+    Entries are appended to the mapping (the mapping grows as needed) and the number
+    of bytes they use, at the start of the mapping, is written last, so that other
+    processes read complete entries only. A file of a process which has exited (or a
+    process reusing its id) keeps the values.
+    """
+
+    def __init__(self, path: Path | None, size: int = 1 << 16) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        if path is None:
+            self._memory = mmap.mmap(-1, size)
+        else:
+            with open(path, "a+b") as file:
+                if os.fstat(file.fileno()).st_size < size:
+                    file.truncate(size)
+                self._memory = mmap.mmap(file.fileno(), 0)
+
+        if _HEADER.unpack_from(self._memory)[0] == 0:
+            _HEADER.pack_into(self._memory, 0, _HEADER.size)
+        self._offsets = dict(_entries(self._memory))
+
+    def add(self, amounts: typing.Iterable[tuple[str, float]]) -> None:
+        """Adds the amounts to the values of their keys."""
+        with self._lock:
+            for key, amount in amounts:
+                offset = self._offsets.get(key)
+                if offset is None:
+                    offset = self._append(key)
+                (value,) = _VALUE.unpack_from(self._memory, offset)
+                _VALUE.pack_into(self._memory, offset, value + amount)
+
+    def items(self) -> dict[str, float]:
+        """Returns the values by their keys."""
+        with self._lock:
+            return {
+                key: _VALUE.unpack_from(self._memory, offset)[0]
+                for key, offset in self._offsets.items()
+            }
+
+    def _grow(self, size: int) -> None:
+        """Grows the mapping (and its file) to the size."""
+        if self.path is not None:
+            self._memory.resize(size)
+            return
+
+        # Anonymous shared memory can't be remapped to a larger size.
+        memory = mmap.mmap(-1, size)
+        memory[: len(self._memory)] = self._memory
+        self._memory.close()
+        self._memory = memory
+
+    def _append(self, key: str) -> int:
+        """Appends entry of the key with zero value, returns offset of the value."""
+        encoded = key.encode()
+        (used,) = _HEADER.unpack_from(self._memory)
+        offset = _aligned(used + _LENGTH.size + len(encoded))
+        size = len(self._memory)
+        while size < offset + _VALUE.size:
+            size *= 2
+        if size > len(self._memory):
+            self._grow(size)
+
+        _LENGTH.pack_into(self._memory, used, len(encoded))
+        start = used + _LENGTH.size
+        end = start + len(encoded)
+        self._memory[start:end] = encoded
+        _VALUE.pack_into(self._memory, offset, 0.0)
+        _HEADER.pack_into(self._memory, 0, offset + _VALUE.size)
+        self._offsets[key] = offset
+        return offset
+
+
+def read_values(path: Path) -> dict[str, float]:
+    """Returns values of a file of `MappedValues` (possibly of another process)."""
+    data = path.read_bytes()
+    if len(data) < _HEADER.size:
+        return {}
+
+    return {key: _VALUE.unpack_from(data, offset)[0] for key, offset in _entries(data)}
+
+
+class Histogram(typing.NamedTuple):
+    """Histogram of observed values, counted in buckets by their upper bounds."""
+
+    name: str
+    documentation: str
+    buckets: tuple[float, ...]
+
+    def keys(self, labels: str) -> list[str]:
+        """Returns keys of values of the buckets (and +Inf) of the labels, and of the sum."""
+        bounds = [repr(float(bound)) for bound in self.buckets] + ["+Inf"]
+        return [f"{self.name}\t{labels}\t{bound}" for bound in bounds] + [
+            f"{self.name}\t{labels}\tsum"
+        ]
+
+
+_SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DURATION = Histogram("issue_tracker_request_duration_seconds", "Duration of requests.", _SECONDS)
+QUERIES = Histogram(
+    "issue_tracker_request_queries",
+    "Number of SQL queries made by requests.",
+    (0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+SQL_DURATION = Histogram(
+    "issue_tracker_request_sql_duration_seconds",
+    "Total duration of SQL queries made by requests.",
+    _SECONDS,
+)
+SERIALIZATION_DURATION = Histogram(
+    "issue_tracker_request_serialization_duration_seconds",
+    "Time requests spent serializing issues.",
+    _SECONDS,
+)
+RESPONSE_SIZE = Histogram(
+    "issue_tracker_response_size_bytes",
+    "Size of response bodies (streamed responses once sent).",
+    tuple(float(256 * 4**i) for i in range(10)),
+)
+HISTOGRAMS = (DURATION, QUERIES, SQL_DURATION, SERIALIZATION_DURATION, RESPONSE_SIZE)
+
+
+class RequestMetrics:  # pylint: disable=too-few-public-methods
+    """Measurements of a request."""
+
+    __slots__ = ("queries", "sql_duration", "serialization_duration")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.sql_duration = 0.0
+        self.serialization_duration = 0.0
+
+
+# Measurements of the current request, None outside of requests.
+_current: contextvars.ContextVar[RequestMetrics | None] = contextvars.ContextVar(
+    "issues_request_metrics", default=None
+)
+
+
+class Metrics:
+    """
+    Histograms of requests, kept in `MappedValues` of the current process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: MappedValues | None = None
+        self._directory: typing.Any = None
+        # Keys of values of the histograms of series of requests, by their labels.
+        self._series: dict[tuple[str, str, int], list[list[str]]] = {}
+        os.register_at_fork(after_in_child=self._forget)
+
+    @property
+    def directory(self) -> Path | None:
+        """Returns directory of files of the processes (`ISSUES_METRICS_DIR`), if set."""
+        directory = getattr(settings, "ISSUES_METRICS_DIR", None)
+        return Path(directory) if directory else None
+
+    def values(self) -> MappedValues:
+        """Returns values of the current process, mapping them on first use."""
+        directory = getattr(settings, "ISSUES_METRICS_DIR", None)
+        if self._values is None or self._directory != directory:
+            with self._lock:
+                if self._values is None or self._directory != directory:
+                    path = None
+                    if directory:
+                        Path(directory).mkdir(parents=True, exist_ok=True)
+                        path = Path(directory) / f"{os.getpid()}.db"
+                    self._values = MappedValues(path)
+                    self._directory = directory
+
+        return self._values
+
+    def _forget(self) -> None:
+        """Drops values of the parent process in a forked process."""
+        self._values = None
+
+    def record(
+        self,
+        request: HttpRequest,
+        response: HttpResponseBase,
+        duration: float,
+        measured: RequestMetrics,
+    ) -> None:
+        """Records measurements of a finished request."""
+        match = request.resolver_match
+        # Methods are sent by clients, any other than the standard ones count as one.
+        method = request.method if request.method in METHODS else "other"
+        series = (match.view_name if match else "", method, response.status_code)
+        keys = self._series.get(series)
+        if keys is None:
+            keys = self._series.setdefault(series, _series_keys(*series))
+
+        amounts = [
+            *_observation(DURATION, keys[0], duration),
+            *_observation(QUERIES, keys[1], measured.queries),
+            *_observation(SQL_DURATION, keys[2], measured.sql_duration),
+            *_observation(SERIALIZATION_DURATION, keys[3], measured.serialization_duration),
+        ]
+        values, size_keys = self.values(), keys[4]
+        if isinstance(response, StreamingHttpResponse):
+            response.streaming_content = _counted(
+                response.streaming_content,
+                lambda size: values.add(_observation(RESPONSE_SIZE, size_keys, size)),
+            )
+        else:
+            amounts += _observation(
+                RESPONSE_SIZE, size_keys, len(getattr(response, "content", b""))
+            )
+
+        values.add(amounts)
+
+    def collect(self) -> dict[str, float]:
+        """Returns values of all the processes (or of the current one), summed."""
+        directory = self.directory
+        if directory is None:
+            return self.values().items()
+
+        self.values()
+        collected: dict[str, float] = {}
+        for path in sorted(directory.glob("*.db")):
+            for key, value in read_values(path).items():
+                collected[key] = collected.get(key, 0.0) + value
+
+        return collected
+
+    def render(self) -> str:
+        """Returns the histograms in the Prometheus text format."""
+        series: dict[tuple[str, str], dict[str, float]] = {}
+        for key, value in self.collect().items():
+            name, labels, part = key.split("\t")
+            series.setdefault((name, labels), {})[part] = value
+
+        lines = []
+        for histogram in HISTOGRAMS:
+            lines += [
+                f"# HELP {histogram.name} {histogram.documentation}",
+                f"# TYPE {histogram.name} histogram",
+            ]
+            for (name, labels), parts in sorted(series.items()):
+                if name != histogram.name:
+                    continue
+
+                count = 0.0
+                for key in histogram.keys(labels)[:-1]:
+                    bound = key.rsplit("\t", 1)[1]
+                    count += parts.get(bound, 0.0)
+                    lines.append(f"{name}_bucket{{{_labels(labels, le=bound)}}} {count!r}")
+                lines += [
+                    f"{name}_sum{{{labels}}} {parts.get('sum', 0.0)!r}",
+                    f"{name}_count{{{labels}}} {count!r}",
+                ]
+
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = Metrics()
+
+
+def _series_keys(view: str, method: str, status: int) -> list[list[str]]:
+    """Returns keys of values of the histograms (`HISTOGRAMS`) of a series of requests."""
+    labels = _labels(view=view, method=method)
+    return [
+        histogram.keys(_labels(labels, status=str(status)) if histogram is DURATION else labels)
+        for histogram in HISTOGRAMS
+    ]
+
+
+def _observation(histogram: Histogram, keys: list[str], value: float) -> list[tuple[str, float]]:
+    """Returns amounts added to values of the keys of a histogram by observing a value."""
+    return [(keys[bisect.bisect_left(histogram.buckets, value)], 1.0), (keys[-1], value)]
+
+
+def _labels(labels: str = "", **values: str) -> str:
+    """Returns labels extended by the values, in the Prometheus text format."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in values.items()]
+    return ",".join([labels, *pairs] if labels else pairs)
+
+
+def _escape(value: str) -> str:
+    """Returns value of a label escaped for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _counted(
+    content: typing.Iterable[bytes], observe: typing.Callable[[int], None]
+) -> typing.Iterator[bytes]:
+    """Yields streamed content, observing its size once it is sent (or abandoned)."""
+    size = 0
+    try:
+        for chunk in content:
+            size += len(chunk)
+            yield chunk
+    finally:
+        observe(size)
+
+
+@contextlib.contextmanager
+def serializing() -> typing.Iterator[None]:
+    """Counts the time spent inside to serialization of the current request."""
+    measured = _current.get()
+    if measured is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        measured.serialization_duration += time.perf_counter() - start
+
+
+def _execute(
+    execute: typing.Callable[..., typing.Any],
+    sql: str,
+    params: typing.Any,
+    many: bool,
+    context: dict[str, typing.Any],
+) -> typing.Any:
+    """Counts an SQL query and its duration to the current request (if any)."""
+    measured = _current.get()
+    if measured is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        measured.queries += 1
+        measured.sql_duration += time.perf_counter() - start
+
+
+def instrument(connection: BaseDatabaseWrapper) -> None:
+    """Counts SQL queries of a new connection to the requests making them."""
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+@sync_and_async_middleware
+def metrics_middleware(
+    get_response: typing.Callable[[HttpRequest], typing.Any]
+) -> typing.Callable[[HttpRequest], typing.Any]:
+    """
+    Records duration, SQL queries, serialization time and response size of every
+    request, see `Metrics.record()`. The duration of streamed responses ends once
+    they start to be sent.
+    """
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def amiddleware(request: HttpRequest) -> HttpResponseBase:
+            measured = RequestMetrics()
+            token = _current.set(measured)
+            start = time.perf_counter()
+            try:
+                response: HttpResponseBase = await get_response(request)
+            finally:
+                _current.reset(token)
+            request_metrics.record(request, response, time.perf_counter() - start, measured)
+            return response
+
+        return amiddleware
+
+    def middleware(request: HttpRequest) -> HttpResponseBase:
+        measured = RequestMetrics()
+        token = _current.set(measured)
+        start = time.perf_counter()
+        try:
+            response: HttpResponseBase = get_response(request)
+        finally:
+            _current.reset(token)
+        request_metrics.record(request, response, time.perf_counter() - start, measured)
+        return response
+
+    return middleware
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.13 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0002_auto_20221117_1045"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="issue",
+            options={"ordering": ["opened_at", "id"]},
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["opened_at", "id"], name="issue_opened_at_idx"),
+        ),
+    ]
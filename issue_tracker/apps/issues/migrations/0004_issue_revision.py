@@ -0,0 +1,65 @@
+# Generated by Django 4.1.13 on 2026-10-18 18:07
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def initialize_revisions(apps, _):
+    """
+    Creates the global revision counter and uses opening time of existing issues
+    as the time of their last change.
+    """
+    apps.get_model("issues", "IssueRevision").objects.create(pk=1, value=0)
+    apps.get_model("issues", "Issue").objects.update(updated_at=F("opened_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0003_issue_opened_at_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueRevision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="revision",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Value of the global revision counter at the last change of the issue.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="updated_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                help_text="A datetime of the last change of the issue.",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="opened_at",
+            field=models.DateTimeField(
+                editable=False,
+                help_text="A datetime of opening issue. Updated when the issue is moved to open state.",
+            ),
+        ),
+        migrations.RunPython(initialize_revisions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.1.13 on 2026-10-18 18:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("issues", "0004_issue_revision"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="issue",
+            name="assignee",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="Assign a user to resolve this issue.",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="%(class)s_assigned",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="category",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The category best suited for the issue.",
+                on_delete=django.db.models.deletion.CASCADE,
+                to="issues.category",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["updated_at", "id"], name="issue_updated_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["state", "opened_at", "id"], name="issue_state_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["assignee", "opened_at", "id"], name="issue_assignee_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["category", "opened_at", "id"], name="issue_category_idx"),
+        ),
+    ]
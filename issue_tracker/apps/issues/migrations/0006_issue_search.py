@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0005_issue_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE issues_issue_search USING fts5("
+                "title, description, tokenize = 'porter unicode61 remove_diacritics 2')",
+                "INSERT INTO issues_issue_search (rowid, title, description) "
+                "SELECT id, title, description FROM issues_issue",
+            ],
+            reverse_sql=["DROP TABLE issues_issue_search"],
+        ),
+    ]
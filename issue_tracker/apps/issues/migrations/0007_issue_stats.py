@@ -0,0 +1,61 @@
+# Generated by Django 4.1.13 on 2026-10-18 18:29
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def initialize_stats(apps, _):
+    """
+    Creates statistics of the existing issues.
+    """
+    issue_model = apps.get_model("issues", "Issue")
+    counts = dict(issue_model.objects.order_by().values_list("state").annotate(Count("id")))
+    resolutions = issue_model.objects.filter(state="CLS").aggregate(
+        total=Sum("resolution_duration"),
+        low=Min("resolution_duration"),
+        high=Max("resolution_duration"),
+    )
+    apps.get_model("issues", "IssueStats").objects.create(
+        pk=1,
+        open_count=counts.get("OPN", 0),
+        closed_count=counts.get("CLS", 0),
+        resolution_sum=resolutions["total"] or 0,
+        resolution_min=resolutions["low"],
+        resolution_max=resolutions["high"],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0006_issue_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("open_count", models.BigIntegerField(default=0)),
+                ("closed_count", models.BigIntegerField(default=0)),
+                ("resolution_sum", models.BigIntegerField(default=0)),
+                ("resolution_min", models.IntegerField(null=True)),
+                ("resolution_max", models.IntegerField(null=True)),
+            ],
+            options={
+                "verbose_name_plural": "issue stats",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["state", "resolution_duration"], name="issue_resolution_idx"
+            ),
+        ),
+        migrations.RunPython(initialize_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.1.13 on 2026-10-18 18:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+from issue_tracker.apps.issues import histogram
+
+
+def initialize_buckets(apps, _):
+    """
+    Creates histograms of resolution durations of the existing closed issues.
+    """
+    counts: dict[tuple[int, int], int] = {}
+    durations = (
+        apps.get_model("issues", "Issue")
+        .objects.filter(state="CLS")
+        .order_by()
+        .values_list("category_id", "resolution_duration")
+        .annotate(Count("id"))
+    )
+    for category_id, resolution_duration, count in durations.iterator():
+        key = (category_id, histogram.bucket_of(resolution_duration))
+        counts[key] = counts.get(key, 0) + count
+
+    bucket_model = apps.get_model("issues", "ResolutionBucket")
+    bucket_model.objects.bulk_create(
+        [
+            bucket_model(category_id=category_id, bucket=bucket, count=count)
+            for (category_id, bucket), count in counts.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0007_issue_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResolutionBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("bucket", models.SmallIntegerField()),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resolution_buckets",
+                        to="issues.category",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="resolutionbucket",
+            constraint=models.UniqueConstraint(
+                fields=("category", "bucket"), name="resolution_bucket_unique"
+            ),
+        ),
+        migrations.RunPython(initialize_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 4.1.13 on 2026-10-18 18:39
+
+from datetime import date, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+from issue_tracker.apps.issues import histogram
+
+
+def initialize_closed_at(apps, _):
+    """
+    Sets closing time of the existing closed issues to the end of the time spent open,
+    counted from the last opening, which is exact for issues closed once (the time of
+    the last change isn't known, it was initialized to the opening time). Issues are
+    updated by a single query, without loading them.
+    """
+    resolution_duration = models.ExpressionWrapper(
+        models.F("resolution_duration") * timedelta(seconds=1),
+        output_field=models.DurationField(),
+    )
+    apps.get_model("issues", "Issue").objects.filter(state="CLS").update(
+        closed_at=models.F("opened_at") + resolution_duration
+    )
+
+
+def initialize_daily_stats(apps, _):
+    """
+    Creates daily rollups of the existing issues.
+    """
+    stats: dict[tuple[date, int], list[int]] = {}
+    buckets: dict[tuple[date, int, int], int] = {}
+    rows = (
+        apps.get_model("issues", "Issue")
+        .objects.order_by()
+        .values_list("state", "resolution_duration", "category_id", "opened_at", "closed_at")
+    )
+    for state, resolution_duration, category_id, opened_at, closed_at in rows.iterator():
+        stats.setdefault((timezone.localdate(opened_at), category_id), [0, 0, 0])[0] += 1
+        if state == "CLS":
+            key = (timezone.localdate(closed_at), category_id)
+            counters = stats.setdefault(key, [0, 0, 0])
+            counters[1] += 1
+            counters[2] += resolution_duration
+            bucket = (*key, histogram.bucket_of(resolution_duration))
+            buckets[bucket] = buckets.get(bucket, 0) + 1
+
+    stats_model = apps.get_model("issues", "DailyStats")
+    stats_model.objects.bulk_create(
+        [
+            stats_model(
+                day=day, category_id=category_id, opened=opened, closed=closed, resolution_sum=total
+            )
+            for (day, category_id), (opened, closed, total) in stats.items()
+        ],
+        batch_size=500,
+    )
+    bucket_model = apps.get_model("issues", "DailyResolutionBucket")
+    bucket_model.objects.bulk_create(
+        [
+            bucket_model(day=day, category_id=category_id, bucket=bucket, count=count)
+            for (day, category_id, bucket), count in buckets.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0008_resolution_buckets"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="closed_at",
+            field=models.DateTimeField(
+                editable=False,
+                help_text="A datetime of closing issue. Cleared when the issue is moved to open state.",
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="DailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("opened", models.BigIntegerField(default=0)),
+                ("closed", models.BigIntegerField(default=0)),
+                ("resolution_sum", models.BigIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="issues.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "daily stats",
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyResolutionBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("bucket", models.SmallIntegerField()),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_resolution_buckets",
+                        to="issues.category",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="dailystats",
+            constraint=models.UniqueConstraint(
+                fields=("day", "category"), name="daily_stats_unique"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyresolutionbucket",
+            constraint=models.UniqueConstraint(
+                fields=("day", "category", "bucket"), name="daily_resolution_bucket_unique"
+            ),
+        ),
+        migrations.RunPython(initialize_closed_at, migrations.RunPython.noop),
+        migrations.RunPython(initialize_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.13 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0009_daily_stats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["revision"], name="issue_revision_idx"),
+        ),
+    ]
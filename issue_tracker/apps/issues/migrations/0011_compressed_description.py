@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations
+
+from issue_tracker.apps.issues import fields
+
+
+def compress_descriptions(apps, schema_editor):
+    """
+    Compresses large descriptions of the existing issues, if enabled by settings.
+    """
+    min_size = getattr(settings, "ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE", None)
+    if min_size is not None:
+        fields.recompress(schema_editor.connection, "issues_issue", "description", min_size)
+
+
+def decompress_descriptions(apps, schema_editor):
+    """
+    Stores all descriptions as plain text again.
+    """
+    fields.recompress(schema_editor.connection, "issues_issue", "description", None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0010_issue_revision_idx"),
+    ]
+
+    operations = [
+        # The column stays the same, only values of large descriptions change.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="issue",
+                    name="description",
+                    field=fields.CompressedTextField(
+                        help_text="A detailed description of the issue."
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(compress_descriptions, decompress_descriptions),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+def log_existing_issues(apps, schema_editor):
+    """
+    Logs every existing issue as changed by its last change, so that readers of the
+    log from its start find all issues.
+    """
+    schema_editor.execute(
+        "INSERT INTO issues_issuechange (issue_id, revision, deleted, changed_at) "
+        "SELECT id, revision, FALSE, updated_at FROM issues_issue ORDER BY revision, id"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0011_compressed_description"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueChange",
+            fields=[
+                ("sequence", models.BigAutoField(primary_key=True, serialize=False)),
+                ("issue_id", models.BigIntegerField()),
+                ("revision", models.BigIntegerField()),
+                ("deleted", models.BooleanField(default=False)),
+                ("changed_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="IssueChangeHorizon",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("sequence", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="issuechange",
+            index=models.Index(fields=["issue_id", "sequence"], name="issue_change_issue_idx"),
+        ),
+        migrations.RunPython(log_existing_issues, migrations.RunPython.noop),
+    ]
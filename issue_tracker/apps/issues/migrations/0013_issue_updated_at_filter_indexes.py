@@ -0,0 +1,31 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0012_issue_changes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["state", "updated_at", "id"], name="issue_state_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["assignee", "updated_at", "id"], name="issue_assignee_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["category", "updated_at", "id"], name="issue_category_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0013_issue_updated_at_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issuerevision",
+            name="labels_revision",
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -2,10 +2,27 @@
 Models for the issues app.
 """
 
+import typing
+from datetime import date, datetime, time
+
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Max, Min, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, Least
+from django.dispatch import Signal
 from django.utils import timezone
 
+from . import histogram
+# The change log models are re-exported. pylint: disable-next=unused-import
+from .changelog import IssueChange, IssueChangeHorizon  # noqa: F401
+from .fields import CompressedTextField
+
+# Sent after issues are created in bulk (`IssueQuerySet.create_many()`), with `issues`.
+bulk_created = Signal()
+# Sent after issues are changed in bulk (`IssueQuerySet.set_state()`), with `ids` of the
+# changed issues and names of the changed `fields`.
+bulk_updated = Signal()
+
 
 class Category(models.Model):
     """
@@ -22,11 +39,658 @@ class Category(models.Model):
         return str(self.name)
 
 
+class IssueRevision(models.Model):
+    """
+    A global counter of changes of issues (single row).
+
+    The counter is increased by every change of issues, so it can be used to tell
+    whether anything has changed since a previous request without querying issues
+    themselves. Every issue remembers the value of the counter of its last change in
+    `Issue.revision`.
+
+    Changes of labels of issues (names of categories, usernames) are remembered by
+    `labels_revision`, so that processes can tell their cached labels are stale.
+    """
+
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True)
+    # Value of the counter at the last change of labels (see `labels.observe_labels()`).
+    labels_revision = models.BigIntegerField(default=0)
+
+    @classmethod
+    def bump(cls, now: datetime, labels: bool = False) -> int:
+        """
+        Increases the counter and returns its new value, recorded as the revision of
+        the last change of labels if `labels`.
+
+        Should be called inside the transaction of the change, so that the new value
+        is assigned only to that change.
+        """
+        changes: dict[str, typing.Any] = {"value": F("value") + 1, "updated_at": now}
+        if labels:
+            changes["labels_revision"] = F("value") + 1
+        if not cls.objects.filter(pk=1).update(**changes):
+            cls.objects.create(pk=1, value=1, updated_at=now, labels_revision=int(labels))
+
+        return int(cls.objects.values_list("value", flat=True).get(pk=1))
+
+    @classmethod
+    def current(cls) -> tuple[int, datetime | None]:
+        """Returns value of the counter and time of its last change."""
+        current = cls.objects.filter(pk=1).values_list("value", "updated_at").first()
+        return current or (0, None)
+
+    @classmethod
+    async def acurrent(cls) -> tuple[int, datetime | None]:
+        """Asynchronous variant of `current()`."""
+        current = await cls.objects.filter(pk=1).values_list("value", "updated_at").afirst()
+        return current or (0, None)
+
+
+class StatsEntry(typing.NamedTuple):
+    """Fields of an issue counted by statistics of issues (see `record_stats()`)."""
+
+    state: str
+    resolution_duration: int
+    category_id: int
+    opened_at: datetime
+    closed_at: datetime | None
+
+
+def record_stats(
+    removed: typing.Iterable[StatsEntry] = (), added: typing.Iterable[StatsEntry] = ()
+) -> None:
+    """
+    Updates all statistics of issues (`IssueStats`, `ResolutionBucket`, `DailyStats`)
+    by issues that left them and issues that entered them. A change of an issue is its
+    stored version removed and the new one added.
+
+    Must be called inside the transaction of the change, after the change is written
+    to the issues table.
+    """
+    removed, added = list(removed), list(added)
+    IssueStats.record(removed, added)
+    ResolutionBucket.record(removed, added)
+    DailyStats.record(removed, added)
+
+
+def _add_counts(
+    model: type[models.Model],
+    keys: tuple[str, ...],
+    columns: tuple[str, ...],
+    deltas: dict[tuple[typing.Any, ...], list[int]],
+) -> None:
+    """
+    Adds deltas to counters (`columns`) of rows identified by unique `keys`, creating
+    missing rows by a single upsert statement.
+
+    Rows whose counters are only decreased are never created, as their category
+    might be being deleted (the rows are deleted by cascade before its issues).
+    """
+    fields = [model._meta.get_field(name) for name in keys]
+    increments, decrements = [], []
+    for key, values in deltas.items():
+        row = [
+            field.get_db_prep_value(value, connection, prepared=False)
+            for field, value in zip(fields, key)
+        ]
+        if any(value > 0 for value in values):
+            increments.append([*row, *values])
+        elif any(values):
+            decrements.append([*values, *row])
+
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if decrements:
+            cursor.executemany(
+                f"UPDATE {table} SET "
+                + ", ".join(f"{column} = {column} + %s" for column in columns)
+                + " WHERE "
+                + " AND ".join(f"{key} = %s" for key in keys),
+                decrements,
+            )
+        if increments:
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(keys + columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(keys + columns))}) "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+                + ", ".join(f"{column} = {column} + excluded.{column}" for column in columns),
+                increments,
+            )
+
+
+class IssueStats(models.Model):
+    """
+    Statistics of issues (single row), maintained along with every change of issues.
+
+    Counts of open and closed issues and the sum, minimum and maximum of resolution
+    durations of closed issues (the count of closed issues is the count of the
+    resolutions). Reading the statistics costs a single lookup instead of
+    aggregating the whole table.
+
+    Changes of issues are applied as deltas by `record_stats()` in the transaction of
+    the change. The minimum and maximum can't be decreased by deltas, so when a closed
+    issue leaves the statistics, they are looked up by `issue_resolution_idx`.
+    """
+
+    open_count = models.BigIntegerField(default=0)
+    closed_count = models.BigIntegerField(default=0)
+    resolution_sum = models.BigIntegerField(default=0)
+    resolution_min = models.IntegerField(null=True)
+    resolution_max = models.IntegerField(null=True)
+
+    class Meta:
+        verbose_name_plural = "issue stats"
+
+    @property
+    def resolution_avg(self) -> float | None:
+        """Returns average resolution duration of closed issues."""
+        return self.resolution_sum / self.closed_count if self.closed_count else None
+
+    @classmethod
+    def record(cls, removed: list[StatsEntry], added: list[StatsEntry]) -> None:
+        """Updates the statistics by deltas, see `record_stats()`."""
+        removed_resolutions = [
+            entry.resolution_duration for entry in removed if entry.state == Issue.State.CLOSED
+        ]
+        added_resolutions = [
+            entry.resolution_duration for entry in added if entry.state == Issue.State.CLOSED
+        ]
+
+        changes: dict[str, typing.Any] = {
+            "open_count": F("open_count")
+            + (len(added) - len(added_resolutions))
+            - (len(removed) - len(removed_resolutions)),
+            "closed_count": F("closed_count") + len(added_resolutions) - len(removed_resolutions),
+            "resolution_sum": F("resolution_sum")
+            + sum(added_resolutions)
+            - sum(removed_resolutions),
+        }
+
+        if removed_resolutions:
+            closed = Issue.objects.filter(state=Issue.State.CLOSED).values("resolution_duration")
+            changes["resolution_min"] = Subquery(closed.order_by("resolution_duration")[:1])
+            changes["resolution_max"] = Subquery(closed.order_by("-resolution_duration")[:1])
+
+        elif added_resolutions:
+            low, high = min(added_resolutions), max(added_resolutions)
+            changes["resolution_min"] = Least(Coalesce(F("resolution_min"), low), low)
+            changes["resolution_max"] = Greatest(Coalesce(F("resolution_max"), high), high)
+
+        if not cls.objects.filter(pk=1).update(**changes):
+            cls.rebuild()
+
+    @classmethod
+    def compute(cls) -> "IssueStats":
+        """Returns statistics aggregated from the issues table (not saved)."""
+        counts = dict(Issue.objects.order_by().values_list("state").annotate(count=Count("id")))
+        resolutions = Issue.objects.filter(state=Issue.State.CLOSED).aggregate(
+            total=Sum("resolution_duration"),
+            low=Min("resolution_duration"),
+            high=Max("resolution_duration"),
+        )
+        return cls(
+            pk=1,
+            open_count=counts.get(Issue.State.OPEN, 0),
+            closed_count=counts.get(Issue.State.CLOSED, 0),
+            resolution_sum=resolutions["total"] or 0,
+            resolution_min=resolutions["low"],
+            resolution_max=resolutions["high"],
+        )
+
+    @classmethod
+    def rebuild(cls) -> "IssueStats":
+        """Replaces the statistics by statistics aggregated from the issues table."""
+        stats = cls.compute()
+        stats.save()
+        return stats
+
+    @classmethod
+    def current(cls) -> "IssueStats":
+        """Returns the current statistics."""
+        stats = cls.objects.filter(pk=1).first()
+        return stats if stats is not None else cls.rebuild()
+
+    def differences(self, other: "IssueStats") -> dict[str, tuple[typing.Any, typing.Any]]:
+        """Returns values of fields which differ from the other statistics."""
+        names = ["open_count", "closed_count", "resolution_sum", "resolution_min", "resolution_max"]
+        return {
+            name: (getattr(self, name), getattr(other, name))
+            for name in names
+            if getattr(self, name) != getattr(other, name)
+        }
+
+
+class ResolutionBucket(models.Model):
+    """
+    Number of closed issues of a category whose resolution duration falls into a bucket
+    of the log-bucketed histogram (see `histogram`).
+
+    The histograms are maintained along with every change of issues (see
+    `record_stats()`), so percentiles of resolution durations are estimated from
+    a bounded number of buckets instead of sorting the closed issues.
+    """
+
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="resolution_buckets"
+    )
+    bucket = models.SmallIntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["category", "bucket"], name="resolution_bucket_unique"),
+        ]
+
+    @classmethod
+    def record(cls, removed: list[StatsEntry], added: list[StatsEntry]) -> None:
+        """Updates the histograms by deltas, see `record_stats()`."""
+        deltas: dict[tuple[typing.Any, ...], list[int]] = {}
+        for entries, sign in ((removed, -1), (added, 1)):
+            for entry in entries:
+                if entry.state == Issue.State.CLOSED:
+                    key = (entry.category_id, histogram.bucket_of(entry.resolution_duration))
+                    deltas.setdefault(key, [0])[0] += sign
+
+        _add_counts(cls, ("category_id", "bucket"), ("count",), deltas)
+
+    @classmethod
+    def compute(cls) -> dict[tuple[int, int], int]:
+        """Returns counts of buckets by `(category_id, bucket)` from the issues table."""
+        counts: dict[tuple[int, int], int] = {}
+        durations = (
+            Issue.objects.filter(state=Issue.State.CLOSED)
+            .order_by()
+            .values_list("category_id", "resolution_duration")
+            .annotate(count=Count("id"))
+        )
+        for category_id, resolution_duration, count in durations.iterator():
+            key = (category_id, histogram.bucket_of(resolution_duration))
+            counts[key] = counts.get(key, 0) + count
+        return counts
+
+    @classmethod
+    def counts(cls) -> dict[tuple[int, int], int]:
+        """Returns non-zero counts of buckets by `(category_id, bucket)`."""
+        return {
+            (category_id, bucket): count
+            for category_id, bucket, count in cls.objects.filter(count__gt=0).values_list(
+                "category_id", "bucket", "count"
+            )
+        }
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Replaces the histograms by histograms counted from the issues table. Returns
+        the number of counted issues.
+        """
+        counts = cls.compute()
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [
+                    cls(category_id=category_id, bucket=bucket, count=count)
+                    for (category_id, bucket), count in counts.items()
+                ],
+                batch_size=500,
+            )
+        return sum(counts.values())
+
+    @classmethod
+    def percentiles(
+        cls, quantiles: typing.Iterable[float] = histogram.QUANTILES
+    ) -> dict[str, typing.Any]:
+        """
+        Returns estimated percentiles of resolution durations (seconds) of closed
+        issues, overall and by category name, labeled by percent (e.g. `p50`):
+        `{"count": ..., "percentiles": {"p50": ...}, "categories": {name: {...}}}`.
+        """
+        quantiles = list(quantiles)
+        rows = (
+            cls.objects.filter(count__gt=0)
+            .order_by("category__name", "bucket")
+            .values_list("category__name", "bucket", "count")
+        )
+
+        overall: dict[int, int] = {}
+        by_category: dict[str, list[tuple[int, int]]] = {}
+        for name, bucket, count in rows:
+            overall[bucket] = overall.get(bucket, 0) + count
+            by_category.setdefault(name, []).append((bucket, count))
+
+        def summary(buckets: list[tuple[int, int]]) -> dict[str, typing.Any]:
+            estimates = histogram.percentiles(buckets, quantiles)
+            return {
+                "count": sum(count for _, count in buckets),
+                "percentiles": {f"p{q * 100:g}": value for q, value in estimates.items()},
+            }
+
+        return {
+            **summary(sorted(overall.items())),
+            "categories": {name: summary(buckets) for name, buckets in by_category.items()},
+        }
+
+
+class DailyStats(models.Model):
+    """
+    Daily rollup of issues of a category: the number of issues opened on the day, the
+    number of issues closed on the day and their total resolution duration.
+
+    Issues are counted by their current `opened_at` and `closed_at` (local dates), so
+    the rollups always add up to the issues table: a reopened issue moves to the day
+    it was reopened, a deleted issue leaves its days. Resolution durations of issues
+    closed on the day are counted by `DailyResolutionBucket`.
+
+    The rollups are maintained along with every change of issues (see
+    `record_stats()`), and can be rebuilt by the `backfill_daily_stats` command.
+    """
+
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="daily_stats")
+    opened = models.BigIntegerField(default=0)
+    closed = models.BigIntegerField(default=0)
+    resolution_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "daily stats"
+        constraints = [
+            # Also serves range queries by day.
+            models.UniqueConstraint(fields=["day", "category"], name="daily_stats_unique"),
+        ]
+
+    # Counters of the rollup, in the order used by `deltas()`.
+    counters = ("opened", "closed", "resolution_sum")
+
+    @classmethod
+    def deltas(
+        cls, removed: typing.Iterable[StatsEntry], added: typing.Iterable[StatsEntry]
+    ) -> tuple[dict[tuple[typing.Any, ...], list[int]], dict[tuple[typing.Any, ...], list[int]]]:
+        """
+        Returns changes of counters of rollups by `(day, category_id)` and of buckets
+        by `(day, category_id, bucket)` made by the issues.
+        """
+        stats: dict[tuple[typing.Any, ...], list[int]] = {}
+        buckets: dict[tuple[typing.Any, ...], list[int]] = {}
+        zone = timezone.get_current_timezone()
+        for entries, sign in ((removed, -1), (added, 1)):
+            for entry in entries:
+                opened_on = timezone.localdate(entry.opened_at, zone)
+                stats.setdefault((opened_on, entry.category_id), [0, 0, 0])[0] += sign
+
+                if entry.state == Issue.State.CLOSED and entry.closed_at is not None:
+                    closed_on = timezone.localdate(entry.closed_at, zone)
+                    counters = stats.setdefault((closed_on, entry.category_id), [0, 0, 0])
+                    counters[1] += sign
+                    counters[2] += sign * entry.resolution_duration
+
+                    bucket = histogram.bucket_of(entry.resolution_duration)
+                    buckets.setdefault((closed_on, entry.category_id, bucket), [0])[0] += sign
+
+        return stats, buckets
+
+    @classmethod
+    def record(cls, removed: list[StatsEntry], added: list[StatsEntry]) -> None:
+        """Updates the rollups by deltas, see `record_stats()`."""
+        stats, buckets = cls.deltas(removed, added)
+        _add_counts(cls, ("day", "category_id"), cls.counters, stats)
+        _add_counts(DailyResolutionBucket, ("day", "category_id", "bucket"), ("count",), buckets)
+
+    @classmethod
+    def compute(
+        cls, since: date | None = None
+    ) -> tuple[dict[tuple[typing.Any, ...], list[int]], dict[tuple[typing.Any, ...], list[int]]]:
+        """
+        Returns counters of rollups and buckets (see `deltas()`) of days since the
+        date (or all days) from the issues table, read in a single streaming pass.
+        """
+        issues = Issue.objects.order_by()
+        if since is not None:
+            start = timezone.make_aware(datetime.combine(since, time()))
+            issues = issues.filter(models.Q(opened_at__gte=start) | models.Q(closed_at__gte=start))
+
+        entries = (
+            StatsEntry(*row) for row in issues.values_list(*StatsEntry._fields).iterator(2000)
+        )
+        stats, buckets = cls.deltas([], entries)
+        if since is not None:
+            # Issues opened before the date might have been closed after it, and vice versa.
+            stats = {key: value for key, value in stats.items() if key[0] >= since}
+            buckets = {key: value for key, value in buckets.items() if key[0] >= since}
+
+        return stats, buckets
+
+    @classmethod
+    def counts(
+        cls, since: date | None = None
+    ) -> tuple[dict[tuple[typing.Any, ...], list[int]], dict[tuple[typing.Any, ...], list[int]]]:
+        """Returns stored non-zero counters of rollups and buckets, see `compute()`."""
+        stats = cls.objects.exclude(opened=0, closed=0)
+        buckets = DailyResolutionBucket.objects.filter(count__gt=0)
+        if since is not None:
+            stats, buckets = stats.filter(day__gte=since), buckets.filter(day__gte=since)
+
+        return (
+            {
+                (day, category_id): list(counters)
+                for day, category_id, *counters in stats.values_list(
+                    "day", "category_id", *cls.counters
+                )
+            },
+            {
+                (day, category_id, bucket): [count]
+                for day, category_id, bucket, count in buckets.values_list(
+                    "day", "category_id", "bucket", "count"
+                )
+            },
+        )
+
+    @classmethod
+    def rebuild(cls, since: date | None = None) -> int:
+        """
+        Replaces rollups of days since the date (or of all days) by rollups counted
+        from the issues table. Returns the number of rebuilt rollups.
+        """
+        stats, buckets = cls.compute(since)
+        with transaction.atomic():
+            stored_stats, stored_buckets = cls.objects.all(), DailyResolutionBucket.objects.all()
+            if since is not None:
+                stored_stats = stored_stats.filter(day__gte=since)
+                stored_buckets = stored_buckets.filter(day__gte=since)
+            stored_stats.delete()
+            stored_buckets.delete()
+
+            cls.objects.bulk_create(
+                [
+                    cls(day=day, category_id=category_id, **dict(zip(cls.counters, counters)))
+                    for (day, category_id), counters in stats.items()
+                ],
+                batch_size=500,
+            )
+            DailyResolutionBucket.objects.bulk_create(
+                [
+                    DailyResolutionBucket(
+                        day=day, category_id=category_id, bucket=bucket, count=count
+                    )
+                    for (day, category_id, bucket), (count,) in buckets.items()
+                ],
+                batch_size=500,
+            )
+
+        return len(stats)
+
+    @classmethod
+    def series(
+        cls, since: date, until: date, category: str | None = None
+    ) -> list[dict[str, typing.Any]]:
+        """
+        Returns rollups of every day of the range (inclusive) summed over categories
+        (or of a category given by name): issues `opened` and `closed` on the day and
+        estimated `median_resolution` (seconds) of the closed ones.
+        """
+        stats = cls.objects.filter(day__gte=since, day__lte=until)
+        buckets = DailyResolutionBucket.objects.filter(day__gte=since, day__lte=until, count__gt=0)
+        if category is not None:
+            stats = stats.filter(category__name=category)
+            buckets = buckets.filter(category__name=category)
+
+        totals = {
+            day: (opened, closed)
+            for day, opened, closed in stats.order_by()
+            .values_list("day")
+            .annotate(Sum("opened"), Sum("closed"))
+        }
+        by_day: dict[date, list[tuple[int, int]]] = {}
+        for day, bucket, count in (
+            buckets.order_by("day", "bucket").values_list("day", "bucket").annotate(Sum("count"))
+        ):
+            by_day.setdefault(day, []).append((bucket, count))
+
+        days = [
+            date.fromordinal(ordinal) for ordinal in range(since.toordinal(), until.toordinal() + 1)
+        ]
+        return [
+            {
+                "day": day,
+                "opened": totals.get(day, (0, 0))[0],
+                "closed": totals.get(day, (0, 0))[1],
+                "median_resolution": histogram.percentiles(by_day.get(day, []), (0.5,))[0.5],
+            }
+            for day in days
+        ]
+
+
+class DailyResolutionBucket(models.Model):
+    """
+    Number of issues of a category closed on a day whose resolution duration falls into
+    a bucket of the log-bucketed histogram (see `histogram` and `DailyStats`).
+    """
+
+    day = models.DateField()
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name="daily_resolution_buckets"
+    )
+    bucket = models.SmallIntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "category", "bucket"], name="daily_resolution_bucket_unique"
+            ),
+        ]
+
+
+class IssueQuerySet(models.QuerySet["Issue"]):
+    """
+    Queries of issues, with set-based writes of many issues at once.
+
+    The bulk writes have the same effect on every issue as `Issue.save()`, but handle
+    a whole batch in a few SQL statements inside a single transaction. The batch
+    counts as a single change of issues (one `IssueRevision`). Instead of the
+    `post_save` signal, `bulk_created` or `bulk_updated` is sent.
+    """
+
+    # Maximal number of rows written by a single statement.
+    batch_size = 500
+
+    def create_many(self, issues: typing.Sequence["Issue"]) -> list["Issue"]:
+        """Creates issues (unsaved instances) at once, returns them with ids set."""
+        if not issues:
+            return []
+
+        now = timezone.now()
+        with transaction.atomic():
+            revision = IssueRevision.bump(now)
+            for issue in issues:
+                issue.opened_at = now
+                issue.closed_at = now if issue.state == Issue.State.CLOSED else None
+                issue.previous_state = issue.state
+                issue.updated_at = now
+                issue.revision = revision
+
+            created = self.bulk_create(issues, batch_size=self.batch_size)
+            record_stats(added=[issue.stats_entry() for issue in created])
+            IssueChange.record(revision, now)
+            bulk_created.send(sender=self.model, issues=created)
+
+        return created
+
+    def set_state(self, state: str) -> list[int]:
+        """
+        Moves issues of the query into the state, as if every issue got the state
+        assigned and saved. Issues already in the state are left intact.
+
+        Returns ids of the changed issues.
+        """
+        now = timezone.now()
+        changes: dict[str, typing.Any] = {"state": state, "previous_state": state}
+
+        if state == Issue.State.CLOSED:
+            # Seconds the issue was open, truncated the same way as by `Issue.save()`.
+            open_for = Cast(Value(now) - F("opened_at"), models.BigIntegerField()) / 1_000_000
+            changes["resolution_duration"] = F("resolution_duration") + open_for
+            changes["closed_at"] = now
+        else:
+            changes["opened_at"] = now
+            changes["closed_at"] = None
+
+        with transaction.atomic():
+            ids = list(self.exclude(state=state).values_list("id", flat=True))
+            if not ids:
+                return []
+
+            revision = IssueRevision.bump(now)
+            changes.update(updated_at=now, revision=revision)
+            removed: list[StatsEntry] = []
+            added: list[StatsEntry] = []
+            for start in range(0, len(ids), self.batch_size):
+                end = start + self.batch_size
+                batch = ids[start:end]
+                # The state is checked again, in case it was changed meanwhile.
+                issues = Issue.objects.filter(id__in=batch).exclude(state=state)
+                removed.extend(StatsEntry(*row) for row in issues.values_list(*StatsEntry._fields))
+                issues.update(**changes)
+                changed = Issue.objects.filter(id__in=batch, revision=revision)
+                added.extend(StatsEntry(*row) for row in changed.values_list(*StatsEntry._fields))
+
+            record_stats(removed, added)
+            IssueChange.record(revision, now)
+
+            bulk_updated.send(sender=self.model, ids=ids, fields=list(changes))
+
+        return ids
+
+
 class Issue(models.Model):
     """Representation of issue."""
 
+    # Typed as the queryset, as the manager proxies all its methods.
+    objects: typing.ClassVar[IssueQuerySet] = IssueQuerySet.as_manager()  # type: ignore[assignment]
+
     class Meta:
-        ordering = ["opened_at"]
+        ordering = ["opened_at", "id"]
+        indexes = [
+            # Supports the default ordering and keyset pagination of the issues list.
+            models.Index(fields=["opened_at", "id"], name="issue_opened_at_idx"),
+            models.Index(fields=["updated_at", "id"], name="issue_updated_at_idx"),
+            # Support filters of the issues list, keeping the default ordering.
+            models.Index(fields=["state", "opened_at", "id"], name="issue_state_idx"),
+            models.Index(fields=["assignee", "opened_at", "id"], name="issue_assignee_idx"),
+            models.Index(fields=["category", "opened_at", "id"], name="issue_category_idx"),
+            # The same filters ordered by `updated_at`.
+            models.Index(fields=["state", "updated_at", "id"], name="issue_state_updated_idx"),
+            models.Index(
+                fields=["assignee", "updated_at", "id"], name="issue_assignee_updated_idx"
+            ),
+            models.Index(
+                fields=["category", "updated_at", "id"], name="issue_category_updated_idx"
+            ),
+            # Minimum and maximum resolution duration of closed issues (`IssueStats`).
+            models.Index(fields=["state", "resolution_duration"], name="issue_resolution_idx"),
+            # Issues changed since a revision (see `readmodel.OpenIssues.refresh()`).
+            models.Index(fields=["revision"], name="issue_revision_idx"),
+        ]
 
     class State(models.TextChoices):
         """States of an issue"""
@@ -38,7 +702,7 @@ class Issue(models.Model):
         max_length=80,
         help_text="A brief description of the issue.",
     )
-    description = models.TextField(
+    description = CompressedTextField(
         help_text="A detailed description of the issue.",
     )
     submitter = models.ForeignKey(
@@ -47,12 +711,16 @@ class Issue(models.Model):
         related_name="%(class)s_submitted",
         help_text="The reporter of the issue.",
     )
+    submitter_id: int
     assignee = models.ForeignKey(
         get_user_model(),
         on_delete=models.CASCADE,
         related_name="%(class)s_assigned",
+        # Indexed by `issue_assignee_idx`.
+        db_index=False,
         help_text="Assign a user to resolve this issue.",
     )
+    assignee_id: int
     state = models.CharField(
         max_length=3,
         choices=State.choices,
@@ -69,22 +737,110 @@ class Issue(models.Model):
     category = models.ForeignKey(
         Category,
         on_delete=models.CASCADE,
+        # Indexed by `issue_category_idx`.
+        db_index=False,
         help_text="The category best suited for the issue.",
     )
+    category_id: int
     opened_at = models.DateTimeField(
-        auto_now_add=True,
+        editable=False,
         help_text="A datetime of opening issue. Updated when the issue is moved to open state.",
     )
+    closed_at = models.DateTimeField(
+        null=True,
+        editable=False,
+        help_text="A datetime of closing issue. Cleared when the issue is moved to open state.",
+    )
     resolution_duration = models.IntegerField(
         default=0,
         editable=False,
         help_text="The time in seconds the issue was in open state.",
     )
+    updated_at = models.DateTimeField(
+        editable=False,
+        help_text="A datetime of the last change of the issue.",
+    )
+    revision = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Value of the global revision counter at the last change of the issue.",
+    )
 
     def __str__(self) -> str:
         return str(self.title)
 
+    # Values of fields as stored in the database by attname, of the fields loaded from
+    # the database (see `from_db()`) or saved since. None if the issue wasn't loaded.
+    _stored: dict[str, typing.Any] | None = None
+
+    @classmethod
+    def from_db(
+        cls,
+        db: str | None,
+        field_names: typing.Collection[str],
+        values: typing.Collection[typing.Any],
+    ) -> "Issue":
+        issue = super().from_db(db, field_names, values)
+        issue._stored = dict(zip(field_names, values))  # pylint: disable=protected-access
+        return issue
+
+    def refresh_from_db(self, using: str | None = None, fields: list[str] | None = None) -> None:
+        super().refresh_from_db(using, fields)
+        if fields is None:
+            self._remember()
+        else:
+            self._remember([Issue._meta.get_field(name).attname for name in fields])
+
+    def changed_fields(self) -> list[str] | None:
+        """
+        Returns names of fields changed since the issue was loaded from the database or
+        saved, or None if it is not known (the issue was never loaded).
+        """
+        if self._stored is None:
+            return None
+
+        stored, deferred = self._stored, self.get_deferred_fields()
+        return [
+            field.name
+            for field in Issue._meta.concrete_fields
+            if not field.primary_key
+            and field.attname not in deferred
+            and (
+                field.attname not in stored or getattr(self, field.attname) != stored[field.attname]
+            )
+        ]
+
+    def stats_entry(self) -> StatsEntry:
+        """Returns entry of the issue in statistics of issues."""
+        return StatsEntry(*(getattr(self, field) for field in StatsEntry._fields))
+
+    def stored_stats_entry(self) -> StatsEntry:
+        """
+        Returns entry of the issue in statistics as stored in the database, i.e. before
+        any changes made in memory.
+        """
+        stored = self._stored or {}
+        if all(field in stored for field in StatsEntry._fields):
+            return StatsEntry(*(stored[field] for field in StatsEntry._fields))
+
+        # Not loaded from the database, the stored state is the previous one at least.
+        return self.stats_entry()._replace(state=self.previous_state)
+
     def save(self, *args, **kwargs):
+        # Changes of issues loaded from the database are written by updating only the
+        # changed columns, unless the caller chose the columns or forces an insert.
+        changed = None
+        if not (self._state.adding or args or {"update_fields", "force_insert"} & set(kwargs)):
+            changed = self.changed_fields()
+            if changed == []:
+                # Nothing to write, the issue stays unchanged.
+                return
+
+        # All timestamps of the change are taken from a single reading of the clock.
+        now = timezone.now()
+
+        stored = None if self._state.adding else self.stored_stats_entry()
+
         # If the state is being udated we want to ensure that:
         # * update Open -> Closed will update the `resolution_duration` time.
         # * update Close -> Open will mark the opening time of the issue.
@@ -94,12 +850,61 @@ class Issue(models.Model):
                 # We can create issue in closed state. In that case we don't want
                 # to do any action.
                 if self.opened_at is not None:
-                    resolution_delta = timezone.now() - self.opened_at
+                    resolution_delta = now - self.opened_at
                     self.resolution_duration += int(resolution_delta.total_seconds())
+                self.closed_at = now
 
             else:
-                self.opened_at = timezone.now()
+                self.opened_at = now
+                self.closed_at = None
+
+        if self._state.adding:
+            self.opened_at = now
 
         self.previous_state = self.state
+        self.updated_at = now
+
+        with transaction.atomic():
+            self.revision = IssueRevision.bump(now)
+            if changed is not None:
+                # The changed fields, along with the fields derived from them above.
+                kwargs["update_fields"] = self.changed_fields()
+            elif kwargs.get("update_fields") is not None:
+                # The fields chosen by the caller, along with the fields derived above.
+                kwargs["update_fields"] = self._with_derived_fields(kwargs["update_fields"])
+            super().save(*args, **kwargs)
+
+            entry = self.stats_entry()
+            if stored != entry:
+                record_stats(removed=[stored] if stored else [], added=[entry])
+            IssueChange.record(self.revision, now)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self._remember()
+        else:
+            self._remember([Issue._meta.get_field(name).attname for name in update_fields])
+
+    @staticmethod
+    def _with_derived_fields(update_fields: typing.Iterable[str]) -> list[str]:
+        """
+        Returns the given fields to update along with the fields save() derives from
+        them, so that the stored row matches the issue in memory.
+        """
+        fields = list(update_fields)
+        derived = ["revision", "updated_at"]
+        if "state" in fields:
+            derived += ["previous_state", "opened_at", "closed_at", "resolution_duration"]
+        return fields + [name for name in derived if name not in fields]
+
+    def _remember(self, attnames: typing.Iterable[str] | None = None) -> None:
+        """Remembers current values of fields (by attname, all loaded by default) as stored."""
+        if attnames is None:
+            deferred = self.get_deferred_fields()
+            attnames = [
+                field.attname
+                for field in Issue._meta.concrete_fields
+                if field.attname not in deferred
+            ]
 
-        super().save(*args, **kwargs)
+        self._stored = {**(self._stored or {}), **{name: getattr(self, name) for name in attnames}}
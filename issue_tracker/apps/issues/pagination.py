@@ -0,0 +1,259 @@
+"""
+Pagination of the issues API and of the issues admin.
+"""
+
+import binascii
+import json
+import typing
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .models import Issue, IssueStats
+
+if typing.TYPE_CHECKING:
+    from django.db.models.query import ValuesQuerySet
+
+    # Pages may be fetched as model instances as well as `values()` rows.
+    AnyQuerySet = QuerySet[typing.Any] | ValuesQuerySet[typing.Any, typing.Any]
+
+
+class Cursor(typing.NamedTuple):
+    """Decoded pagination cursor."""
+
+    # Values of the ordering fields of the row the page starts after (or before).
+    position: tuple[typing.Any, ...]
+    # True when the page lies before the position (previous page).
+    reverse: bool
+
+
+class KeysetPagination(BasePagination):  # pylint: disable=abstract-method
+    """
+    Keyset (seek) pagination over `(opened_at, id)`, the ordering of `Issue`, or over
+    another ordering ending by a unique field.
+
+    Instead of an offset, the cursor holds the ordering values of the last row
+    of the page. The next page is then fetched by seeking to that position in
+    the index of the ordering, so every page costs the same no matter how deep
+    into the table it is.
+    """
+
+    ordering: tuple[str, ...] = ("opened_at", "id")
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = api_settings.PAGE_SIZE or 100
+    max_page_size = 1000
+
+    invalid_cursor_message = "Invalid cursor."
+
+    def __init__(self, ordering: tuple[str, ...] | None = None) -> None:
+        if ordering is not None:
+            self.ordering = ordering
+        self.base_url = ""
+        self.cursor: Cursor | None = None
+        self.page: list[typing.Any] = []
+        self.has_next = False
+        self.has_previous = False
+
+    def get_page_size(self, request: Request) -> int:
+        """Returns page size requested by client, capped by `max_page_size`."""
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if size <= 0:
+            return self.page_size
+
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, cursor: Cursor) -> str:
+        """Returns URL of the page described by cursor."""
+        payload = {
+            "p": [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in cursor.position
+            ],
+            "r": int(cursor.reverse),
+        }
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode())
+
+    def decode_cursor(self, request: Request) -> Cursor | None:
+        """Returns cursor passed by client or None for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            values = payload["p"]
+            if len(values) != len(self.ordering):
+                raise ValueError()
+
+            position = tuple(
+                Issue._meta.get_field(name).to_python(value)
+                for name, value in zip(self.field_names(), values)
+            )
+            return Cursor(position=position, reverse=bool(payload["r"]))
+
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError) as err:
+            raise NotFound(self.invalid_cursor_message) from err
+
+    def prepare(self, request: Request) -> Cursor | None:
+        """
+        Reads page size and cursor requested by client, returns the cursor. Rows of
+        the page (plus one row to detect further pages) fetched by other means than
+        by `get_page_queryset()` are then passed to `set_page()`.
+        """
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        return self.cursor
+
+    def get_page_queryset(self, queryset: "AnyQuerySet", request: Request) -> "AnyQuerySet":
+        """
+        Returns queryset of one page (plus one row to detect further pages).
+
+        The queryset is not evaluated, so that callers may evaluate it however they
+        need (e.g. asynchronously). Pass the result rows to `set_page()`.
+        """
+        self.prepare(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = [self._flip(field) if reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*ordering)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.seek(self.cursor.position, reverse))
+
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows: list[typing.Any]) -> list[typing.Any]:
+        """Finalizes the page from rows fetched by queryset from `get_page_queryset()`."""
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def paginate_queryset(
+        self, queryset: "AnyQuerySet", request: Request, view: typing.Any = None
+    ) -> list[typing.Any]:
+        """Returns rows of the page requested by client."""
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_next_link(self) -> str | None:
+        """Returns URL of the next page or None on the last page."""
+        if not self.has_next:
+            return None
+
+        if not self.page:
+            # Empty page reached backwards, the next page starts at the cursor.
+            assert self.cursor is not None
+            return self.encode_cursor(Cursor(position=self.cursor.position, reverse=False))
+
+        return self.encode_cursor(Cursor(position=self._position(self.page[-1]), reverse=False))
+
+    def get_previous_link(self) -> str | None:
+        """Returns URL of the previous page or None on the first page."""
+        if not self.has_previous:
+            return None
+
+        if not self.page:
+            # Empty page reached forwards, the previous page ends at the cursor.
+            assert self.cursor is not None
+            return self.encode_cursor(Cursor(position=self.cursor.position, reverse=True))
+
+        return self.encode_cursor(Cursor(position=self._position(self.page[0]), reverse=True))
+
+    def get_paginated_data(self, data: list[typing.Any]) -> dict[str, typing.Any]:
+        """Wraps page data into the paginated envelope."""
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+    def get_paginated_response(self, data: list[typing.Any]) -> Response:
+        return Response(self.get_paginated_data(data))
+
+    def field_names(self) -> list[str]:
+        """Returns names of the ordering fields (without direction)."""
+        return [field.lstrip("-") for field in self.ordering]
+
+    def _position(self, row: typing.Any) -> tuple[typing.Any, ...]:
+        """Returns ordering values of a row (model instance or `values()` dict)."""
+        if isinstance(row, dict):
+            return tuple(row[name] for name in self.field_names())
+
+        return tuple(getattr(row, name) for name in self.field_names())
+
+    def seek(self, position: tuple[typing.Any, ...], reverse: bool = False) -> Q:
+        """
+        Returns condition selecting rows strictly after position in the ordering
+        (or strictly before it when reverse is True).
+
+        For ordering `(a, b)` the condition is `a >= A AND (a > A OR b > B)`. The
+        leading `a >= A` term lets the database start an index range scan at
+        the position instead of evaluating the disjunction over the whole index.
+        """
+        directions = [field.startswith("-") != reverse for field in self.ordering]
+        names = self.field_names()
+
+        after = Q()
+        for i, (name, value, descending) in enumerate(zip(names, position, directions)):
+            # Rows equal in all preceding fields and past the position in this one.
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            step &= Q(**dict(zip(names[:i], position[:i])))
+            after |= step
+
+        leading = Q(**{f"{names[0]}__{'lte' if directions[0] else 'gte'}": position[0]})
+        return leading & after
+
+    @staticmethod
+    def _flip(field: str) -> str:
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator of the issues admin, which never counts all rows of the issues table.
+
+    The number of all issues is read from the counters maintained along with changes
+    of issues (`IssueStats`). Filtered issues (e.g. found by search) are counted up
+    to `max_count` only, larger results report `max_count` and pages past it are
+    reached by keyset navigation (see `IssueChangeList`).
+    """
+
+    max_count = 10_000
+
+    @cached_property
+    def count(self) -> int:  # type: ignore[override]
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and queryset.model is Issue:
+            if not queryset.query.where:
+                stats = IssueStats.current()
+                return int(stats.open_count + stats.closed_count)
+
+            return int(queryset.order_by()[: self.max_count].count())
+
+        return int(super().count)
@@ -0,0 +1,32 @@
+"""
+Permissions of the issues API, following permissions of the issues admin.
+"""
+
+import hmac
+import typing
+
+from django.conf import settings
+from django.http import HttpRequest
+from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
+
+
+class IsSuperuser(BasePermission):  # type: ignore[misc]
+    """Allows access only to superusers (who can change issues)."""
+
+    def has_permission(self, request: Request, view: typing.Any) -> bool:
+        return bool(getattr(request.user, "is_superuser", False))
+
+
+def can_read_metrics(request: HttpRequest) -> bool:
+    """
+    Returns True if the request may read metrics of requests: it is made by a staff
+    user, or it carries the token of the `ISSUES_METRICS_TOKEN` setting (if set) as
+    `Authorization: Bearer <token>`.
+    """
+    if getattr(request.user, "is_staff", False):
+        return True
+
+    token = getattr(settings, "ISSUES_METRICS_TOKEN", None)
+    authorization = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
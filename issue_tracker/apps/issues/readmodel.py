@@ -0,0 +1,423 @@
+"""
+In-memory read model of open issues.
+
+Listing open issues is the most frequent query of the API. When enabled by the
+`ISSUES_READ_MODEL` setting, every worker process holds all open issues in memory
+(`open_issues`), and the issues list serves pages of open issues from it, filtered
+and ordered the same way as by the database (see `OpenIssues.paginate()`).
+
+Issues are held by compact records (`OpenIssue`, with slots instead of a `__dict__`
+and timestamps stored as integer microseconds), only with the fields listed by
+`OpenIssue.fields` (e.g. not descriptions). Every ordering is served by arrays of ids
+of the issues sorted by the ordering: of all issues, and of issues of every assignee
+and category (`Group`), so that a page of a selective filter is read from a short
+array. Ranges of `opened_at` are found by bisection of the arrays ordered by it. The
+arrays are built once they are needed and then updated by every change of issues.
+Names of assignees and categories of filters are resolved once per revision.
+
+The model follows changes of issues by the global revision counter: every change
+writes the new value of the counter into `Issue.revision` of the changed issues, so
+once the counter moves, only issues with a greater revision are fetched (using the
+`issue_revision_idx` index). Deleted issues leave no rows behind, they are detected
+by comparing the number of held issues with the maintained count of open issues
+(`IssueStats.open_count`).
+"""
+
+import bisect
+import itertools
+import sys
+import threading
+import typing
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from rest_framework.request import Request
+
+from .filters import IssueFilter
+from .models import Category, Issue, IssueRevision, IssueStats
+from .pagination import KeysetPagination
+from .replica import reading_from
+from .serializers import USERNAME_FIELD
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Issues of an assignee or a category (name and value of the field), or all issues.
+Group = tuple[str, int]
+ALL: Group = ("", 0)
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+class OpenIssue:
+    """Record of an open issue held by the read model."""
+
+    __slots__ = (
+        "pk",
+        "title",
+        "submitter_id",
+        "assignee_id",
+        "category_id",
+        "opened_at",
+        "updated_at",
+    )
+
+    # Fields of issues held by the records (`id` as `pk`), in the order of their values.
+    fields = (
+        "id",
+        "title",
+        "submitter_id",
+        "assignee_id",
+        "category_id",
+        "opened_at",
+        "updated_at",
+    )
+
+    pk: int
+    title: str
+    submitter_id: int
+    assignee_id: int
+    category_id: int
+    # Microseconds since the epoch.
+    opened_at: int
+    updated_at: int
+
+    def __init__(self, values: typing.Sequence[typing.Any]) -> None:
+        """Creates record from values of `fields` (e.g. a `values_list()` row)."""
+        self.pk, self.title, self.submitter_id, self.assignee_id, self.category_id = values[:5]
+        self.opened_at = _to_micros(values[5])
+        self.updated_at = _to_micros(values[6])
+
+    def key(self, field: str) -> tuple[int, int]:
+        """Returns position of the issue in ordering by (field, id)."""
+        return getattr(self, field), self.pk
+
+    def row(self) -> dict[str, typing.Any]:
+        """Returns the issue as a `values()` row (see `IssueListSerializer.serialize_values()`)."""
+        return {
+            "id": self.pk,
+            "title": self.title,
+            "submitter_id": self.submitter_id,
+            "assignee_id": self.assignee_id,
+            "category_id": self.category_id,
+            "state": Issue.State.OPEN.value,
+            "opened_at": _from_micros(self.opened_at),
+            "updated_at": _from_micros(self.updated_at),
+        }
+
+
+class Selection(typing.NamedTuple):
+    """Issues of a filter, read from an array of ids of a group (see `OpenIssues`)."""
+
+    group: Group
+    # Bounds of the ordering field, inclusive lower and exclusive upper, None if unbounded.
+    low: int | None
+    high: int | None
+    # Other groups the issues belong to.
+    equal: tuple[Group, ...] = ()
+    # Range of `opened_at` the issues are opened in, if not ordered by it.
+    opened: tuple[int | None, int | None] = (None, None)
+
+    def matches(self, issue: OpenIssue) -> bool:
+        """Returns True if the issue of the group matches the rest of the filter."""
+        if any(getattr(issue, name) != value for name, value in self.equal):
+            return False
+
+        after, before = self.opened
+        return (after is None or issue.opened_at >= after) and (
+            before is None or issue.opened_at < before
+        )
+
+
+class OpenIssues:
+    """
+    Open issues held in memory, brought up to date by `refresh()` before every read.
+    """
+
+    def __init__(self) -> None:
+        self._issues: dict[int, OpenIssue] = {}
+        # Ids of related objects (users, categories) shared by the records.
+        self._related: dict[int, int] = {}
+        # Ids of the issues of a group sorted by (field, id), by name of the field and
+        # the group.
+        self._indexes: dict[tuple[str, Group], "array[int]"] = {}
+        # Ids of assignees and categories by their names, see `_group_of()`.
+        self._groups: dict[tuple[str, str], int | None] = {}
+        # Revision of issues the model is current with, None if not loaded yet.
+        self.revision: int | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        """Returns True if open issues are to be served from memory."""
+        return bool(getattr(settings, "ISSUES_READ_MODEL", False))
+
+    def serves(self, issue_filter: IssueFilter, lookups: typing.Iterable[str]) -> bool:
+        """
+        Returns True if issues selected by the filter and serialized from the lookups
+        (see `IssueListSerializer.lookups()`) can be served from memory.
+        """
+        if not self.enabled or issue_filter.validated_data.get("state") != Issue.State.OPEN:
+            return False
+
+        return set(lookups) <= {*OpenIssue.fields, "state"}
+
+    def paginate(
+        self,
+        issue_filter: IssueFilter,
+        paginator: KeysetPagination,
+        request: Request,
+        revision: int | None = None,
+    ) -> list[dict[str, typing.Any]]:
+        """
+        Returns `values()` rows of the page of open issues selected by the filter and
+        requested by client, the same page as `paginator.paginate_queryset()` returns
+        from the database. The model is refreshed first, see `refresh()`.
+        """
+        cursor = paginator.prepare(request)
+        reverse = cursor is not None and cursor.reverse
+        position = None
+        if cursor is not None:
+            position = (_to_micros(cursor.position[0]), cursor.position[1])
+
+        ordering = paginator.ordering[0]
+        field, descending = ordering.lstrip("-"), ordering.startswith("-") != reverse
+        with self._lock:
+            self.refresh(revision)
+            found: list[OpenIssue] = []
+            selection = self._selection(issue_filter.validated_data, field)
+            if selection is not None:
+                issues = self._select(field, descending, position, selection)
+                found = list(
+                    itertools.islice(filter(selection.matches, issues), paginator.page_size + 1)
+                )
+
+        return paginator.set_page([issue.row() for issue in found])
+
+    def refresh(self, revision: int | None = None) -> None:
+        """
+        Brings the model up to date with the database, unless it is known to be
+        current with the given revision of issues.
+        """
+        with self._lock:
+            if revision is not None and revision == self.revision:
+                return
+
+            # Always from the primary, as the replica may be behind the held issues.
+            with reading_from(None), transaction.atomic():
+                current, _ = IssueRevision.current()
+                if self.revision is None or current < self.revision:
+                    self._load(current)
+                elif current > self.revision:
+                    self._apply_changes(self.revision, current)
+
+    def reset(self) -> None:
+        """Drops all held issues, they are loaded again by the next refresh."""
+        with self._lock:
+            self._issues.clear()
+            self._related.clear()
+            self._indexes.clear()
+            self._groups.clear()
+            self.revision = None
+
+    def memory_usage(self) -> dict[str, int]:
+        """
+        Returns number of held issues and bytes of memory they occupy (records, their
+        values and the indexes), in total and per issue.
+        """
+        with self._lock:
+            size = sys.getsizeof(self._issues) + sys.getsizeof(self._related)
+            size += sum(sys.getsizeof(index) for index in self._indexes.values())
+            # Values shared by records (e.g. ids of related objects) are counted once.
+            seen: set[int] = set()
+            for issue in self._issues.values():
+                size += sys.getsizeof(issue)
+                for name in OpenIssue.__slots__:
+                    value = getattr(issue, name)
+                    if id(value) not in seen:
+                        seen.add(id(value))
+                        size += sys.getsizeof(value)
+            count = len(self._issues)
+
+        return {"issues": count, "bytes": size, "bytes_per_issue": size // count if count else 0}
+
+    def __len__(self) -> int:
+        return len(self._issues)
+
+    def __contains__(self, iid: int) -> bool:
+        return iid in self._issues
+
+    def _load(self, revision: int) -> None:
+        """Loads all open issues."""
+        rows = Issue.objects.filter(state=Issue.State.OPEN).values_list(*OpenIssue.fields)
+        self._related.clear()
+        self._issues = {row[0]: self._record(row) for row in rows.iterator(chunk_size=2000)}
+        self._indexes.clear()
+        self._groups.clear()
+        self.revision = revision
+
+    def _apply_changes(self, since: int, revision: int) -> None:
+        """
+        Applies changes of issues made after the `since` revision, updating the
+        arrays of ids in place. Changes of many issues at once (e.g. imports) drop the
+        arrays instead, they are sorted again once needed.
+        """
+        changed = Issue.objects.filter(revision__gt=since, revision__lte=revision)
+        rows = list(changed.values_list(*OpenIssue.fields, "state"))
+        if len(rows) > len(self._issues) // 8:
+            self._indexes.clear()
+
+        for *values, state in rows:
+            self._remove(values[0])
+            if state == Issue.State.OPEN:
+                issue = self._issues[values[0]] = self._record(values)
+                self._insert(issue)
+
+        if len(self._issues) != IssueStats.current().open_count:
+            # Some of the held issues were deleted.
+            open_ids = set(
+                Issue.objects.filter(state=Issue.State.OPEN).values_list("id", flat=True)
+            )
+            for iid in set(self._issues) - open_ids:
+                self._remove(iid)
+
+        # Renamed assignees and categories change the revision of their issues.
+        self._groups.clear()
+        self.revision = revision
+
+    def _insert(self, issue: OpenIssue) -> None:
+        """Inserts a held issue into the arrays of its groups."""
+        for field, group in self._indexes_of(issue):
+            bisect.insort(self._indexes[field, group], issue.pk, key=self._key(field))
+
+    def _remove(self, iid: int) -> None:
+        """Removes an issue from the arrays of its groups and from held issues."""
+        issue = self._issues.get(iid)
+        if issue is None:
+            return
+
+        for field, group in self._indexes_of(issue):
+            index = self._indexes[field, group]
+            del index[bisect.bisect_left(index, issue.key(field), key=self._key(field))]
+        del self._issues[iid]
+
+    def _indexes_of(self, issue: OpenIssue) -> list[tuple[str, Group]]:
+        """Returns keys of the built arrays of ids containing the issue."""
+        groups = (ALL, ("assignee_id", issue.assignee_id), ("category_id", issue.category_id))
+        return [
+            (field, group)
+            for field in ("opened_at", "updated_at")
+            for group in groups
+            if (field, group) in self._indexes
+        ]
+
+    def _record(self, values: typing.Sequence[typing.Any]) -> OpenIssue:
+        """Returns record of an issue from values of `OpenIssue.fields`."""
+        issue = OpenIssue(values)
+        # Ids of related objects repeat across issues, all records share one copy.
+        related = self._related
+        issue.submitter_id = related.setdefault(issue.submitter_id, issue.submitter_id)
+        issue.assignee_id = related.setdefault(issue.assignee_id, issue.assignee_id)
+        issue.category_id = related.setdefault(issue.category_id, issue.category_id)
+        return issue
+
+    def _key(self, field: str) -> typing.Callable[[int], tuple[int, int]]:
+        """Returns key of ids of the issues in the order of (field, id)."""
+        issues = self._issues
+        return lambda iid: issues[iid].key(field)
+
+    def _index(self, field: str, group: Group = ALL) -> "array[int]":
+        """Returns ids of the issues of the group sorted by (field, id)."""
+        index = self._indexes.get((field, group))
+        if index is None:
+            name, value = group
+            issues: typing.Iterable[int] = self._issues
+            if name:
+                issues = [
+                    iid for iid, issue in self._issues.items() if getattr(issue, name) == value
+                ]
+            index = array("q", sorted(issues, key=self._key(field)))
+            self._indexes[field, group] = index
+
+        return index
+
+    def _select(
+        self,
+        field: str,
+        descending: bool,
+        position: tuple[int, int] | None,
+        selection: "Selection",
+    ) -> typing.Iterator[OpenIssue]:
+        """
+        Yields issues of the group of the selection in the order of (field, id),
+        within its bounds, starting after the position (value of the field and id).
+        """
+        index, key = self._index(field, selection.group), self._key(field)
+        start = (
+            0 if selection.low is None else bisect.bisect_left(index, (selection.low, 0), key=key)
+        )
+        stop = len(index)
+        if selection.high is not None:
+            stop = bisect.bisect_left(index, (selection.high, 0), start, key=key)
+
+        if descending:
+            if position is not None:
+                stop = max(start, bisect.bisect_left(index, position, start, stop, key=key))
+            positions: typing.Iterable[int] = range(stop - 1, start - 1, -1)
+        else:
+            if position is not None:
+                start = min(stop, bisect.bisect_right(index, position, start, stop, key=key))
+            positions = range(start, stop)
+
+        for i in positions:
+            yield self._issues[index[i]]
+
+    def _selection(self, params: dict[str, typing.Any], field: str) -> "Selection | None":
+        """
+        Returns selection of issues matching filter parameters (see `IssueFilter`)
+        ordered by the field, reading the shortest group of the filter. Returns None if
+        no issue can match the parameters (e.g. there is no such assignee).
+        """
+        groups: list[Group] = []
+        for name, param in (("assignee_id", "assignee"), ("category_id", "category")):
+            if param in params:
+                value = self._group_of(param, params[param])
+                if value is None:
+                    return None
+                groups.append((name, value))
+
+        group = min(groups, key=lambda group: len(self._index(field, group)), default=ALL)
+        equal = tuple(other for other in groups if other != group)
+        after = _to_micros(params["opened_after"]) if "opened_after" in params else None
+        before = _to_micros(params["opened_before"]) if "opened_before" in params else None
+        if field == "opened_at":
+            return Selection(group, after, before, equal)
+
+        return Selection(group, None, None, equal, (after, before))
+
+    def _group_of(self, param: str, name: str) -> int | None:
+        """
+        Returns id of the assignee or category of the name, None if there is none.
+        Looked up once per revision of the model, as renames change the revision.
+        """
+        if (param, name) not in self._groups:
+            if param == "assignee":
+                users = get_user_model().objects.filter(**{USERNAME_FIELD: name})
+                self._groups[param, name] = users.values_list("pk", flat=True).first()
+            else:
+                categories = Category.objects.filter(name=name)
+                self._groups[param, name] = categories.values_list("pk", flat=True).first()
+
+        return self._groups[param, name]
+
+
+open_issues = OpenIssues()
@@ -0,0 +1,72 @@
+"""
+Renderers and streaming helpers of the issues API.
+"""
+
+import itertools
+import json
+import typing
+
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Renders data as newline delimited JSON (one JSON document per line).
+
+    Lists are rendered item per line, any other data as a single line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(
+        self,
+        data: typing.Any,
+        accepted_media_type: str | None = None,
+        renderer_context: typing.Mapping[str, typing.Any] | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+
+        return self.render_rows(data if isinstance(data, list) else [data])
+
+    def render_rows(self, rows: typing.Iterable[typing.Any]) -> bytes:
+        """Returns rows rendered as NDJSON lines."""
+        return b"".join(self.dumps(row) + b"\n" for row in rows)
+
+    def dumps(self, data: typing.Any) -> bytes:
+        """Returns data rendered as a single compact line of JSON."""
+        ret = json.dumps(
+            data,
+            cls=self.encoder_class,
+            ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict,
+            separators=SHORT_SEPARATORS,
+        )
+        return ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode()
+
+
+def chunked(iterable: typing.Iterable[typing.Any], size: int) -> typing.Iterator[list[typing.Any]]:
+    """Splits iterable into lists of at most `size` items."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def stream_ndjson(chunks: typing.Iterable[list[typing.Any]]) -> typing.Iterator[bytes]:
+    """Yields chunks of rows rendered as NDJSON, one write per chunk."""
+    renderer = NDJSONRenderer()
+    for chunk in chunks:
+        yield renderer.render_rows(chunk)
+
+
+def stream_json(chunks: typing.Iterable[list[typing.Any]]) -> typing.Iterator[bytes]:
+    """Yields chunks of rows rendered as parts of a single JSON array."""
+    renderer = NDJSONRenderer()
+    separator = b"["
+    for chunk in chunks:
+        yield separator + b",".join(renderer.dumps(row) for row in chunk)
+        separator = b","
+
+    yield b"]" if separator == b"," else b"[]"
@@ -0,0 +1,230 @@
+"""
+Reading issues from a read replica of the database.
+
+When enabled by the `ISSUES_READ_REPLICA` setting (alias of the replica), the
+read-only API views (decorated by `replica_reads`) and the statistics of the issues
+admin read issues from the replica, while writes and everything else use the primary
+(`default`) database, see `ReplicaRouter`.
+
+The replica lags behind the primary. A client which has written something is served
+by the primary until the replica catches up with its write ("read your own writes"):
+responses to writes carry the revision of issues the write produced (see
+`IssueRevision`) in a cookie, and the client's reads go to the replica only once the
+replica's revision reaches it, see `replica_for()`.
+
+The replica is checked only for clients whose last write is newer than the latest
+revision the process has seen on the replica (the first request of a process checks
+it is available), so other reads cost no extra query.
+
+A local replica is a copy of the primary SQLite database made by the SQLite backup
+API (`copy_database()`), kept current by `manage.py sync_replica --interval`. Every
+copy rewrites the whole replica, so it is meant for development and testing of
+replicated reads, it is disabled in production.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import typing
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.db.models import Model
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.utils.decorators import sync_and_async_middleware
+
+from .models import IssueRevision
+
+if typing.TYPE_CHECKING:
+    from django.db import DefaultConnectionProxy
+    from django.db.backends.base.base import BaseDatabaseWrapper
+
+# Cookie holding the revision of issues produced by the last write of a client.
+REVISION_COOKIE = "issues_revision"
+
+# Alias of the database models of the issues app are read from, None for the primary.
+_reads: contextvars.ContextVar[str | None] = contextvars.ContextVar("issues_reads", default=None)
+# The latest revision of issues seen on the replica by its alias, see `replica_for()`.
+_replica_revisions: dict[str, int] = {}
+
+
+def replica_alias() -> str | None:
+    """Returns alias of the read replica (`ISSUES_READ_REPLICA`), None if disabled."""
+    alias = getattr(settings, "ISSUES_READ_REPLICA", None)
+    return alias if alias in settings.DATABASES else None
+
+
+@contextlib.contextmanager
+def reading_from(alias: str | None) -> typing.Iterator[None]:
+    """Reads issues from the database of the alias (None for the primary) inside."""
+    token = _reads.set(alias)
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+def replica_for(request: HttpRequest) -> str | None:
+    """
+    Returns alias of the replica if it can serve reads of the client, None if the
+    client is to be served by the primary: the replica is disabled, not available, or
+    it hasn't caught up with the last write of the client yet.
+
+    The revision of the replica only grows, so it is queried only if the client has
+    written something newer than the process has seen on the replica so far.
+    """
+    alias = replica_alias()
+    if alias is None:
+        return None
+
+    try:
+        written = int(request.COOKIES.get(REVISION_COOKIE, 0))
+    except ValueError:
+        written = 0
+
+    seen = _replica_revisions.get(alias)
+    if seen is not None and seen >= written:
+        return alias
+
+    try:
+        with reading_from(alias):
+            revision, _ = IssueRevision.current()
+    except DatabaseError:
+        # E.g. the replica hasn't been copied yet.
+        return None
+
+    _replica_revisions[alias] = max(revision, seen or 0)
+    return alias if revision >= written else None
+
+
+def reset_replica_revisions() -> None:
+    """Forgets revisions seen on replicas, e.g. after a replica is replaced."""
+    _replica_revisions.clear()
+
+
+def replica_reads(
+    view: typing.Callable[..., HttpResponseBase]
+) -> typing.Callable[..., HttpResponseBase]:
+    """
+    Decorator of read-only views reading issues from the replica, if it can serve the
+    client (see `replica_for()`). Should be the outermost decorator, so that revisions
+    of issues (e.g. of conditional requests) are read from the same database as the
+    issues. Streamed responses are read from the primary.
+    """
+
+    @functools.wraps(view)
+    def inner(request: HttpRequest, *args: typing.Any, **kwargs: typing.Any) -> HttpResponseBase:
+        with reading_from(replica_for(request)):
+            return view(request, *args, **kwargs)
+
+    return inner
+
+
+class ReplicaRouter:
+    """
+    Database router reading models of the issues app from the replica inside
+    `reading_from()`, everything else from the primary. All writes go to the primary,
+    replicas (even disabled ones) are not migrated, they are copies of the primary.
+    """
+
+    # pylint: disable=unused-argument
+
+    def db_for_read(self, model: type[Model], **hints: typing.Any) -> str | None:
+        """Returns alias of the database to read the model from."""
+        if model._meta.app_label == "issues":
+            return _reads.get() or DEFAULT_DB_ALIAS
+
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model: type[Model], **hints: typing.Any) -> str | None:
+        """Returns the primary (also for instances read from the replica)."""
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: typing.Any) -> bool | None:
+        """Allows relations of objects of both databases, they hold the same data."""
+        return True
+
+    def allow_migrate(self, alias: str, app_label: str, **hints: typing.Any) -> bool | None:
+        """Refuses to migrate other databases than the primary, they are its copies."""
+        return False if alias != DEFAULT_DB_ALIAS else None
+
+
+def _is_write(request: HttpRequest, response: HttpResponseBase) -> bool:
+    """Returns True if the response answers a successful write of a client."""
+    return (
+        replica_alias() is not None
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    )
+
+
+def _remember_write(response: HttpResponseBase, revision: int) -> None:
+    """Sets cookie with the revision of issues produced by a write to the response."""
+    response.set_cookie(
+        REVISION_COOKIE,
+        str(revision),
+        max_age=getattr(settings, "ISSUES_READ_YOUR_WRITES_WINDOW", 60),
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+@sync_and_async_middleware
+def read_your_writes_middleware(
+    get_response: typing.Callable[[HttpRequest], typing.Any]
+) -> typing.Callable[[HttpRequest], typing.Any]:
+    """
+    Remembers the revision of issues produced by a write of a client in a cookie
+    (`REVISION_COOKIE`), so that the client's reads are served by the primary until
+    the replica catches up. The cookie expires after `ISSUES_READ_YOUR_WRITES_WINDOW`
+    seconds, the longest lag of the replica expected.
+    """
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def amiddleware(request: HttpRequest) -> HttpResponseBase:
+            response: HttpResponseBase = await get_response(request)
+            if _is_write(request, response):
+                with reading_from(None):
+                    revision, _ = await IssueRevision.acurrent()
+                _remember_write(response, revision)
+
+            return response
+
+        return amiddleware
+
+    def middleware(request: HttpRequest) -> HttpResponseBase:
+        response: HttpResponseBase = get_response(request)
+        if _is_write(request, response):
+            with reading_from(None):
+                revision, _ = IssueRevision.current()
+            _remember_write(response, revision)
+
+        return response
+
+    return middleware
+
+
+def data_version(connection: "BaseDatabaseWrapper | DefaultConnectionProxy") -> int:
+    """
+    Returns the data version of an SQLite database, which changes whenever another
+    connection commits a change of the database.
+    """
+    connection.ensure_connection()
+    return int(connection.connection.execute("PRAGMA data_version").fetchone()[0])
+
+
+def copy_database(
+    source: "BaseDatabaseWrapper | DefaultConnectionProxy",
+    target: "BaseDatabaseWrapper | DefaultConnectionProxy",
+) -> None:
+    """
+    Replaces content of the target SQLite database by a copy of the source one, by a
+    single step of the backup API. Readers of the target (in WAL mode) keep reading
+    the previous content until the copy is complete, writers of the source aren't
+    blocked by the copy.
+    """
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
@@ -0,0 +1,126 @@
+"""
+Full-text search of issues.
+
+Title and description of issues are indexed by the SQLite FTS5 virtual table
+`SEARCH_TABLE` (created by migration), whose rowid is the id of the issue. The index
+is updated by signal handlers whenever an issue is saved or deleted, and can be
+rebuilt from scratch by the `rebuild_search_index` management command.
+
+Matches are ranked by bm25, with terms found in the title weighing more than terms
+found in the description.
+"""
+
+import re
+import typing
+
+from django.db import connection, connections, router, transaction
+from django.db.models.expressions import RawSQL
+
+from .fields import UNCOMPRESSED_SQL_FUNCTION
+from .models import Issue
+
+SEARCH_TABLE = "issues_issue_search"
+
+# Weights of the indexed columns (title, description) in bm25 ranking.
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Terms of a query, split the same way as by the `unicode61` tokenizer of the index.
+_TERM_RE = re.compile(r"\w+")
+
+
+def match_expression(text: str) -> str | None:
+    """
+    Returns FTS5 query matching issues containing all terms of the text, or None if
+    there are no terms.
+
+    Terms are quoted, so that the FTS5 query syntax (operators, column filters)
+    can't be used (or broken) by user input.
+    """
+    terms = _TERM_RE.findall(text)
+    if not terms:
+        return None
+
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def search(text: str, limit: int) -> list[int]:
+    """
+    Returns ids of at most `limit` issues matching text, best matches first. Searches
+    the database issues are read from (see `replica`).
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return []
+
+    with connections[router.db_for_read(Issue)].cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+            f"ORDER BY bm25({SEARCH_TABLE}, %s, %s) LIMIT %s",
+            [expression, TITLE_WEIGHT, DESCRIPTION_WEIGHT, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def matching_ids(text: str) -> RawSQL:
+    """
+    Returns subquery of ids of all issues matching text, to be used in lookups
+    such as `Issue.objects.filter(id__in=matching_ids(text))`.
+    """
+    return RawSQL(
+        f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+        [match_expression(text) or '""'],
+    )
+
+
+def index_issues(issues: typing.Iterable[typing.Any]) -> None:
+    """Adds issues to the index, replacing their previous entries."""
+    rows = [(issue.pk, issue.title, issue.description) for issue in issues]
+    if not rows:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [row[:1] for row in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, description) VALUES (%s, %s, %s)", rows
+        )
+
+
+def index_issues_after(last_id: int) -> int:
+    """
+    Adds issues with ids greater than `last_id` (e.g. just imported) to the index, by
+    a single bulk insert. Returns the number of indexed issues.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, description) "
+            f"SELECT id, title, {UNCOMPRESSED_SQL_FUNCTION}(description) FROM issues_issue "
+            f"WHERE id > %s",
+            [last_id],
+        )
+        return int(cursor.rowcount)
+
+
+def remove_issues(ids: typing.Iterable[int]) -> None:
+    """Removes issues from the index."""
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(iid,) for iid in ids])
+
+
+def rebuild_index() -> int:
+    """
+    Rebuilds the whole index from the issues table by a single bulk insert, then
+    merges the index into a single segment. Returns the number of indexed issues.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, description) "
+            f"SELECT id, title, {UNCOMPRESSED_SQL_FUNCTION}(description) FROM issues_issue"
+        )
+        count = cursor.rowcount
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+    return count
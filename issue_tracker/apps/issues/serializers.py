@@ -1,11 +1,81 @@
+import operator
+import typing
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
 from rest_framework import serializers
 
-from .models import Issue
+from .labels import LabelCache, category_labels, user_labels
+from .metrics import serializing
+from .models import Category, Issue
+
+if typing.TYPE_CHECKING:
+    from django.db.models.query import ValuesQuerySet
+
+# Conversion of a fetched value into its representation: a function, a cache of labels
+# of objects referenced by the value, or None keeping the value as is.
+Convert = typing.Callable[[typing.Any], typing.Any] | LabelCache | None
+# Labels of objects referenced by serialized rows (see `IssueListSerializer.get_labels()`).
+Labels = dict[LabelCache, dict[int, str]]
+
+# Users are represented by their `str()`, which is the username of the default user model.
+USERNAME_FIELD: str = getattr(get_user_model(), "USERNAME_FIELD")
+
+# Maximal number of issues written by a single request of the bulk API.
+MAX_BULK_SIZE = 10000
+
+# Maximal number of issues fetched by their ids by a single request (`?ids=`), keeping
+# the request line well within limits of servers and proxies.
+MAX_MULTI_GET_SIZE = 100
+
+
+def _state_label(state: str) -> str:
+    return str(Issue.State(state).label)
+
+
+class StateField(serializers.CharField):
+    """
+    State of an issue given by its label (`Open`, case insensitive) or by its stored
+    value (`OPN`). Internal value is the stored value, representation is the label.
+    """
+
+    default_error_messages = {"invalid_state": "Unknown state, use one of: {labels}."}
+
+    def to_internal_value(self, data: typing.Any) -> str:
+        value = str(super().to_internal_value(data)).lower()
+        for state in Issue.State:
+            if value in (state.value.lower(), str(state.label).lower()):
+                return str(state.value)
+
+        labels = ", ".join(str(state.label) for state in Issue.State)
+        message = self.error_messages["invalid_state"].format(labels=labels)
+        raise serializers.ValidationError(message, code="invalid_state")
+
+    def to_representation(self, value: str) -> str:
+        return _state_label(value)
+
+
+class Fieldset(typing.NamedTuple):
+    """Fields of issues requested by client (see `IssueListSerializer.get_fieldset()`)."""
+
+    fields: tuple[str, ...]
+    # Fields of related objects represented by nested objects instead of by name.
+    expand: frozenset[str] = frozenset()
 
 
 class IssueListSerializer(serializers.ModelSerializer):
     """
     Serializer of Issue model into the list/summary JSON representation.
+
+    Apart from the usual serialization of model instances, the serializer provides a
+    fast path for serializing rows of a `values()` query (see `values_queryset()` and
+    `serialize_values()`). The fast path skips instantiating models and the DRF field
+    machinery, and takes names of related objects from in-process caches (see
+    `labels`) instead of joining them.
+
+    The fast path can also serialize a subset of fields (`?fields=`) or represent
+    related objects by nested objects (`?expand=`), see `get_fieldset()`. Only the
+    columns needed by the requested fields are queried.
     """
 
     category = serializers.SerializerMethodField()
@@ -25,22 +95,197 @@ class IssueListSerializer(serializers.ModelSerializer):
             "opened_at",
         ]
 
+    # Field (lookup) fetched by `values_queryset()` for each serialized field, along with
+    # conversion of its value into the representation.
+    values_fields: dict[str, tuple[str, Convert]] = {
+        "id": ("id", None),
+        "title": ("title", None),
+        "description": ("description", None),
+        "submitter": ("submitter_id", user_labels),
+        "assignee": ("assignee_id", user_labels),
+        "state": ("state", _state_label),
+        "category": ("category_id", category_labels),
+        "opened_at": ("opened_at", serializers.DateTimeField().to_representation),
+    }
+
+    # Fields of related objects returned when the field is expanded, with their lookups
+    # and conversions.
+    expandable_fields: dict[str, dict[str, tuple[str, Convert]]] = {
+        "submitter": {"id": ("submitter_id", None), "username": ("submitter_id", user_labels)},
+        "assignee": {"id": ("assignee_id", None), "username": ("assignee_id", user_labels)},
+        "category": {"id": ("category_id", None), "name": ("category_id", category_labels)},
+    }
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+
     def get_category(self, obj: Issue) -> str:
         """A custom serializer for category field returning its string repr."""
-        return str(obj.category)
+        return category_labels.get(obj.category_id) or str(obj.category)
 
     def get_assignee(self, obj: Issue) -> str:
         """A custom serializer for assignee field returning its streing repr."""
-        return str(obj.assignee)
+        return user_labels.get(obj.assignee_id) or str(obj.assignee)
 
     def get_submitter(self, obj: Issue) -> str:
         """A custom serializer for submitter field returning its streing repr."""
-        return str(obj.submitter)
+        return user_labels.get(obj.submitter_id) or str(obj.submitter)
 
     def get_state(self, obj: Issue) -> str:
         """Returns state as a string instead of abbreviation. Open instead of OPN."""
         return Issue.State(obj.state).label
 
+    @classmethod
+    def get_fieldset(cls, query_params: typing.Mapping[str, typing.Any]) -> Fieldset:
+        """
+        Returns fields requested by comma separated lists of `?fields=` (default is
+        `Meta.fields`) and `?expand=` (expanded fields are included as well). Unknown
+        fields are reported by raising `ValidationError`.
+        """
+        fields = _split(query_params.get(cls.fields_query_param)) or list(cls.Meta.fields)
+        expand = _split(query_params.get(cls.expand_query_param))
+
+        errors = {}
+        if unknown := [field for field in fields if field not in cls.values_fields]:
+            errors[cls.fields_query_param] = [f"Unknown fields: {', '.join(unknown)}."]
+        if unknown := [field for field in expand if field not in cls.expandable_fields]:
+            errors[cls.expand_query_param] = [f"Fields can't be expanded: {', '.join(unknown)}."]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        fields.extend(field for field in expand if field not in fields)
+        return Fieldset(tuple(fields), frozenset(expand))
+
+    @classmethod
+    def fieldset_key(cls, fieldset: Fieldset) -> str:
+        """Returns string identifying the fieldset, empty for the default fieldset."""
+        if fieldset == Fieldset(tuple(cls.Meta.fields)):
+            return ""
+
+        return f"{','.join(fieldset.fields)};{','.join(sorted(fieldset.expand))}"
+
+    @classmethod
+    def values_queryset(
+        cls,
+        queryset: QuerySet[Issue],
+        fieldset: Fieldset | None = None,
+        extra: typing.Iterable[str] = (),
+    ) -> "ValuesQuerySet[Issue, dict[str, typing.Any]]":
+        """
+        Returns `values()` query projecting only the columns needed to serialize the
+        fieldset (by default `Meta.fields`), plus the `extra` fields (e.g. needed for
+        pagination).
+        """
+        return queryset.values(*dict.fromkeys([*cls.lookups(fieldset), *extra]))
+
+    @classmethod
+    def lookups(cls, fieldset: Fieldset | None = None) -> list[str]:
+        """Returns lookups of the columns needed to serialize the fieldset."""
+        fieldset = fieldset or Fieldset(tuple(cls.Meta.fields))
+        return [lookup for lookup, _ in cls._conversions(fieldset)]
+
+    @classmethod
+    def get_labels(
+        cls, rows: list[dict[str, typing.Any]], fieldset: Fieldset | None = None
+    ) -> Labels:
+        """
+        Returns labels of objects referenced by rows fetched by query from
+        `values_queryset()`, loading those missing in the caches by a query per model.
+        """
+        return {cache: cache.get_many(pks) for cache, pks in cls._label_keys(rows, fieldset)}
+
+    @classmethod
+    async def aget_labels(
+        cls, rows: list[dict[str, typing.Any]], fieldset: Fieldset | None = None
+    ) -> Labels:
+        """Asynchronous variant of `get_labels()`."""
+        return {cache: await cache.aget_many(pks) for cache, pks in cls._label_keys(rows, fieldset)}
+
+    @classmethod
+    def serialize_values(
+        cls,
+        rows: typing.Iterable[dict[str, typing.Any]],
+        fieldset: Fieldset | None = None,
+        labels: Labels | None = None,
+    ) -> list[typing.Any]:
+        """
+        Serializes rows fetched by query from `values_queryset()` with the same fieldset.
+        For the default fieldset, the result is equal to serializing the same issues by
+        `cls(issues, many=True).data`.
+
+        Labels of related objects are taken from `labels` (see `get_labels()`), by
+        default they are looked up for the rows. The time spent counts to metrics of
+        the current request, see `metrics.serializing()`.
+        """
+        rows = list(rows)
+        fieldset = fieldset or Fieldset(tuple(cls.Meta.fields))
+        with serializing():
+            if labels is None:
+                labels = cls.get_labels(rows, fieldset)
+
+            plan = [
+                (field, cls._value_getter(field, fieldset, labels)) for field in fieldset.fields
+            ]
+            return [{field: get(row) for field, get in plan} for row in rows]
+
+    @classmethod
+    def _conversions(cls, fieldset: Fieldset) -> list[tuple[str, Convert]]:
+        """Returns lookups fetched to serialize the fieldset, with their conversions."""
+        conversions: list[tuple[str, Convert]] = []
+        for field in fieldset.fields:
+            if field in fieldset.expand:
+                conversions.extend(cls.expandable_fields[field].values())
+            else:
+                conversions.append(cls.values_fields[field])
+
+        return conversions
+
+    @classmethod
+    def _label_keys(
+        cls, rows: list[dict[str, typing.Any]], fieldset: Fieldset | None
+    ) -> list[tuple[LabelCache, set[int]]]:
+        """Returns primary keys of objects referenced by rows, by cache of their labels."""
+        keys: dict[LabelCache, set[int]] = {}
+        for lookup, convert in cls._conversions(fieldset or Fieldset(tuple(cls.Meta.fields))):
+            if isinstance(convert, LabelCache):
+                keys.setdefault(convert, set()).update(row[lookup] for row in rows)
+
+        return list(keys.items())
+
+    @classmethod
+    def _value_getter(
+        cls, field: str, fieldset: Fieldset, labels: Labels
+    ) -> typing.Callable[[dict[str, typing.Any]], typing.Any]:
+        """Returns function getting representation of field from a `values()` row."""
+        if field in fieldset.expand:
+            nested = {
+                key: _getter(lookup, convert, labels)
+                for key, (lookup, convert) in cls.expandable_fields[field].items()
+            }
+            return lambda row: {key: get(row) for key, get in nested.items()}
+
+        return _getter(*cls.values_fields[field], labels)
+
+
+def _getter(
+    lookup: str, convert: Convert, labels: Labels
+) -> typing.Callable[[dict[str, typing.Any]], typing.Any]:
+    """Returns function getting converted value of lookup from a `values()` row."""
+    if convert is None:
+        return operator.itemgetter(lookup)
+
+    if isinstance(convert, LabelCache):
+        found = labels[convert]
+        return lambda row: found.get(row[lookup])
+
+    to_representation = convert
+    return lambda row: to_representation(row[lookup])
+
+
+def _split(value: str | None) -> list[str]:
+    """Returns items of a comma separated list, without duplicates."""
+    return list(dict.fromkeys(item.strip() for item in (value or "").split(",") if item.strip()))
+
 
 class IssueSerializer(IssueListSerializer):
     """
@@ -59,3 +304,90 @@ class IssueSerializer(IssueListSerializer):
             "category",
             "opened_at",
         ]
+
+
+class IssueCreateSerializer(serializers.ModelSerializer):
+    """
+    Validates issues to be created at once by the bulk API.
+
+    Assignee and category are given by their username and name. They are looked up
+    for the whole batch by `build_issues()`, instead of one query per issue.
+    """
+
+    assignee = serializers.CharField()
+    category = serializers.CharField()
+    state = StateField(default=Issue.State.OPEN)
+
+    class Meta:
+        model = Issue
+        fields = ["title", "description", "assignee", "state", "category"]
+
+    @staticmethod
+    def build_issues(items: list[dict[str, typing.Any]], submitter: typing.Any) -> list[Issue]:
+        """
+        Returns unsaved issues of validated items submitted by the user. Unknown
+        assignees and categories are reported by raising `ValidationError`.
+        """
+        users = {
+            getattr(user, USERNAME_FIELD): user
+            for user in get_user_model().objects.filter(
+                **{f"{USERNAME_FIELD}__in": {item["assignee"] for item in items}}
+            )
+        }
+        categories = {
+            category.name: category
+            for category in Category.objects.filter(name__in={item["category"] for item in items})
+        }
+
+        errors: list[dict[str, list[str]]] = []
+        for item in items:
+            error = {}
+            if item["assignee"] not in users:
+                error["assignee"] = [f"Unknown user {item['assignee']!r}."]
+            if item["category"] not in categories:
+                error["category"] = [f"Unknown category {item['category']!r}."]
+            errors.append(error)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return [
+            Issue(
+                **{
+                    **item,
+                    "assignee": users[item["assignee"]],
+                    "category": categories[item["category"]],
+                },
+                submitter=submitter,
+            )
+            for item in items
+        ]
+
+
+class IssueStateChangeSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Validates change of state of many issues by the bulk API."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_BULK_SIZE
+    )
+    state = StateField()
+
+
+class IssueIdsSerializer(serializers.Serializer):  # pylint: disable=abstract-method
+    """Validates ids of issues fetched at once by the list API (`?ids=`)."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_MULTI_GET_SIZE,
+    )
+
+    @classmethod
+    def from_query_params(cls, query_params: typing.Mapping[str, typing.Any]) -> list[int]:
+        """
+        Returns ids given by comma separated list of `?ids=`, without duplicates.
+        Invalid ids are reported by raising `ValidationError`.
+        """
+        serializer = cls(data={"ids": _split(query_params.get("ids"))})
+        serializer.is_valid(raise_exception=True)
+        return list(dict.fromkeys(serializer.validated_data["ids"]))
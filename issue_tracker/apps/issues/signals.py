@@ -0,0 +1,178 @@
+"""
+Signal handlers of the issues app. Connected in `IssuesConfig.ready()`.
+"""
+
+# pylint: disable=unused-argument
+
+import typing
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import metrics, search, sqlite
+from .cache import issue_cache
+from .fields import register_functions
+from .labels import category_labels, user_labels
+from .models import (
+    Category,
+    Issue,
+    IssueChange,
+    IssueRevision,
+    bulk_created,
+    bulk_updated,
+    record_stats,
+)
+
+
+@receiver(post_save, sender=Issue)
+def issue_saved(
+    sender: type[Issue],
+    instance: Issue,
+    update_fields: frozenset[str] | None,
+    **kwargs: typing.Any,
+) -> None:
+    """
+    Drops cached representation of the changed issue and reindexes it for search,
+    unless neither title nor description were written.
+    """
+    issue_cache.invalidate_issues([instance.pk])
+    if update_fields is None or {"title", "description"} & update_fields:
+        search.index_issues([instance])
+
+
+@receiver(post_delete, sender=Issue)
+def issue_deleted(sender: type[Issue], instance: Issue, **kwargs: typing.Any) -> None:
+    """
+    Counts deletion of an issue as a change of issues, logged as such (see
+    `IssueChange`), removes it from statistics and from search.
+    """
+    now = timezone.now()
+    IssueChange.record_deleted([instance.pk], IssueRevision.bump(now), now)
+    record_stats(removed=[instance.stored_stats_entry()])
+    issue_cache.invalidate_issues([instance.pk])
+    search.remove_issues([instance.pk])
+
+
+@receiver(bulk_created, sender=Issue)
+def issues_created(sender: type[Issue], issues: list[Issue], **kwargs: typing.Any) -> None:
+    """Indexes issues created in bulk for search."""
+    search.index_issues(issues)
+
+
+@receiver(bulk_updated, sender=Issue)
+def issues_updated(
+    sender: type[Issue], ids: list[int], fields: list[str], **kwargs: typing.Any
+) -> None:
+    """Drops cached representations of issues changed in bulk and reindexes them if needed."""
+    issue_cache.invalidate_issues(ids)
+    if {"title", "description"} & set(fields):
+        search.index_issues(Issue.objects.filter(id__in=ids).only("title", "description"))
+
+
+@receiver(post_save, sender=Category)
+def category_changed(
+    sender: type[Category], instance: Category, created: bool, **kwargs: typing.Any
+) -> None:
+    """
+    Counts change of a category as a change of all its issues, as category name is
+    part of their representation.
+
+    New categories have no issues yet and deleted categories take their issues with
+    them (each counted by `issue_deleted`), so only updates are handled here.
+    """
+    category_labels.invalidate(instance.pk)
+    if created:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        revision = IssueRevision.bump(now, labels=True)
+        issues = Issue.objects.filter(category=instance)
+        issue_cache.invalidate_issues(issues.values_list("id", flat=True))
+        issues.update(revision=revision, updated_at=now)
+        IssueChange.record(revision, now)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender: type[Category], instance: Category, **kwargs: typing.Any) -> None:
+    """Drops cached label of the deleted category."""
+    category_labels.invalidate(instance.pk)
+
+
+# Attribute of users holding their username as stored before the save (see `user_saving`).
+STORED_USERNAME = "_issues_stored_username"
+
+
+@receiver(pre_save, sender=get_user_model())
+def user_saving(
+    sender: type[typing.Any],
+    instance: typing.Any,
+    update_fields: frozenset[str] | None,
+    **kwargs: typing.Any,
+) -> None:
+    """
+    Remembers the stored username of a user about to be saved with it, for
+    `user_changed` to tell whether it changes.
+    """
+    username_field = getattr(sender, "USERNAME_FIELD")
+    stored = None
+    if instance.pk is not None and (update_fields is None or username_field in update_fields):
+        stored = (
+            sender._default_manager.filter(pk=instance.pk)  # pylint: disable=protected-access
+            .values_list(username_field, flat=True)
+            .first()
+        )
+    setattr(instance, STORED_USERNAME, stored)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_changed(
+    sender: type[typing.Any],
+    instance: typing.Any,
+    created: bool,
+    update_fields: frozenset[str] | None,
+    **kwargs: typing.Any,
+) -> None:
+    """
+    Drops cached label of the changed user. If the username changed, the change counts
+    as a change of all issues submitted or assigned to the user, as their representation
+    contains it. Other changes (e.g. `last_login` by every login, passwords) don't.
+    """
+    user_labels.invalidate(instance.pk)
+    username = getattr(instance, getattr(sender, "USERNAME_FIELD"))
+    if created or getattr(instance, STORED_USERNAME, None) in (None, username):
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        revision = IssueRevision.bump(now, labels=True)
+        issues = Issue.objects.filter(Q(submitter=instance) | Q(assignee=instance))
+        issue_cache.invalidate_issues(issues.values_list("id", flat=True))
+        issues.update(revision=revision, updated_at=now)
+        IssueChange.record(revision, now)
+
+
+@receiver(post_delete, sender=get_user_model())
+def user_deleted(sender: type[typing.Any], instance: typing.Any, **kwargs: typing.Any) -> None:
+    """Drops cached label of the deleted user."""
+    user_labels.invalidate(instance.pk)
+
+
+@receiver(connection_created)
+def connection_opened(
+    sender: type[BaseDatabaseWrapper], connection: BaseDatabaseWrapper, **kwargs: typing.Any
+) -> None:
+    """
+    Sets up a new SQLite connection by the configured pragmas (see `sqlite.configure()`),
+    registers SQL functions reading compressed texts (see `CompressedTextField`) and
+    counts its queries to metrics of requests (see `metrics.instrument()`).
+    """
+    sqlite.configure(connection)
+    register_functions(connection)
+    metrics.instrument(connection)
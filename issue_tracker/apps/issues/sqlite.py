@@ -0,0 +1,104 @@
+"""
+Performance profile of SQLite connections.
+
+Every new SQLite connection is set up by the pragmas of the `ISSUES_SQLITE_PRAGMAS`
+setting (see `configure()`, called on `connection_created`), e.g. WAL journal mode,
+so that readers don't block the writer, and a busy timeout, so that concurrent
+writers wait for each other instead of failing with "database is locked".
+
+Some pragmas may not take effect, e.g. the WAL mode is not available for in-memory
+databases and `mmap_size` is capped by the SQLite build, so the pragmas in effect are
+read back (see `pragmas_in_effect()`) and reported by the `issues.I001` system check.
+"""
+
+import re
+import typing
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+if typing.TYPE_CHECKING:
+    from django.db import DefaultConnectionProxy
+
+PragmaValue = int | str
+
+# Values of pragmas read back as numbers, by their names.
+_ENUMERATIONS = {
+    "synchronous": ["off", "normal", "full", "extra"],
+    "temp_store": ["default", "file", "memory"],
+}
+
+_NAME = re.compile(r"[a-z_]+")
+_VALUE = re.compile(r"-?[A-Za-z0-9_]+")
+
+
+def configured_pragmas() -> dict[str, PragmaValue]:
+    """Returns the pragmas of the `ISSUES_SQLITE_PRAGMAS` setting, by their names."""
+    pragmas = getattr(settings, "ISSUES_SQLITE_PRAGMAS", None) or {}
+    for name, value in pragmas.items():
+        if not _NAME.fullmatch(name) or not _VALUE.fullmatch(str(value)):
+            raise ImproperlyConfigured(f"Invalid SQLite pragma in ISSUES_SQLITE_PRAGMAS: {name}")
+
+    return dict(pragmas)
+
+
+def configure(connection: BaseDatabaseWrapper) -> None:
+    """Sets the configured pragmas on a new SQLite connection."""
+    if connection.vendor != "sqlite":
+        return
+
+    for name, value in configured_pragmas().items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def pragmas_in_effect(
+    connection: "BaseDatabaseWrapper | DefaultConnectionProxy",
+) -> dict[str, PragmaValue]:
+    """
+    Returns values of the configured pragmas in effect on an SQLite connection, in
+    the form they are configured in (e.g. "normal" rather than 1 of `synchronous`).
+    """
+    connection.ensure_connection()
+    values: dict[str, PragmaValue] = {}
+    for name in configured_pragmas():
+        row = connection.connection.execute(f"PRAGMA {name}").fetchone()
+        value: PragmaValue = "" if row is None else row[0]
+        if name in _ENUMERATIONS and isinstance(value, int):
+            value = _ENUMERATIONS[name][value]
+        values[name] = value
+
+    return values
+
+
+def normalized(name: str, value: PragmaValue) -> PragmaValue:
+    """Returns configured value of a pragma comparable with the value in effect."""
+    if name in _ENUMERATIONS and isinstance(value, int):
+        return _ENUMERATIONS[name][value]
+    if isinstance(value, str):
+        return int(value) if value.lstrip("-").isdigit() else value.lower()
+
+    return value
+
+
+def differences(
+    connection: "BaseDatabaseWrapper | DefaultConnectionProxy",
+) -> dict[str, tuple[PragmaValue, PragmaValue]]:
+    """
+    Returns configured pragmas not in effect on a connection, by their names, with
+    their configured values and the values in effect.
+    """
+    effective = pragmas_in_effect(connection)
+    return {
+        name: (value, effective[name])
+        for name, value in configured_pragmas().items()
+        if normalized(name, value) != effective[name]
+    }
+
+
+def describe(connection: "BaseDatabaseWrapper | DefaultConnectionProxy") -> str:
+    """Returns text describing pragmas and persistence of connections to a database."""
+    values = ", ".join(f"{name}={value}" for name, value in pragmas_in_effect(connection).items())
+    max_age = connection.settings_dict.get("CONN_MAX_AGE", 0)
+    persistent = "no" if max_age == 0 else "unlimited" if max_age is None else f"{max_age} s"
+    return f"{values or 'defaults'}; persistent connections: {persistent}"
@@ -3,9 +3,14 @@ from datetime import datetime, timedelta
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.utils import timezone
 
+from ..cache import issue_cache
+from ..labels import category_labels, user_labels
 from ..models import Category, Issue
+from ..readmodel import open_issues
+from ..replica import reset_replica_revisions
 
 
 class TimezonePatcher:
@@ -29,6 +34,25 @@ class TimezonePatcher:
         self._now += timedelta(seconds=1)
         return to_return
 
+    def advance(self, delta: timedelta) -> None:
+        """Moves the patched time forward by delta."""
+        self._now += delta
+
+
+@pytest.fixture(autouse=True)
+def clear_issue_cache() -> typing.Generator[None, None, None]:
+    """
+    Clears cache of serialized issues, of labels, the read model of open issues and
+    revisions seen on the replica, as ids and revisions of issues repeat between tests.
+    """
+    yield
+    caches["issues"].clear()
+    issue_cache.reset_stats()
+    category_labels.invalidate()
+    user_labels.invalidate()
+    open_issues.reset()
+    reset_replica_revisions()
+
 
 @pytest.fixture()
 def timezone_patcher(mocker: typing.Any) -> typing.Generator[TimezonePatcher, None, None]:
@@ -41,13 +65,13 @@ def timezone_patcher(mocker: typing.Any) -> typing.Generator[TimezonePatcher, No
 
 @pytest.mark.django_db
 @pytest.fixture()
-def create_issue() -> typing.Callable[..., Issue]:
+def build_issue() -> typing.Callable[..., Issue]:
     """
-    A factory for initializing issue. Creates users, category and
-    issue itself based on it's title.
+    A factory for initializing unsaved issue. Creates users and category
+    based on issue title.
     """
 
-    def do_create(state: Issue.State, title: str = "Title") -> Issue:
+    def do_build(state: Issue.State, title: str = "Title") -> Issue:
         cls = get_user_model()
         assignee = cls(
             username=f"{title}-assignee",
@@ -69,7 +93,7 @@ def create_issue() -> typing.Callable[..., Issue]:
         category = Category(name=f"{title}-category")
         category.save()
 
-        issue = Issue(
+        return Issue(
             title=title,
             description="Test description",
             submitter=submitter,
@@ -78,8 +102,20 @@ def create_issue() -> typing.Callable[..., Issue]:
             category=category,
         )
 
-        issue.save()
+    return do_build
+
 
+@pytest.mark.django_db
+@pytest.fixture()
+def create_issue(build_issue: typing.Callable[..., Issue]) -> typing.Callable[..., Issue]:
+    """
+    A factory for initializing issue. Creates users, category and
+    issue itself based on it's title.
+    """
+
+    def do_create(state: Issue.State, title: str = "Title") -> Issue:
+        issue = build_issue(state, title)
+        issue.save()
         return issue
 
     return do_create
@@ -1,11 +1,16 @@
+import json
 import typing
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from pytest_drf import APIViewTest, Returns200, UsesGetMethod
 
+from ..cache import issue_cache
 from ..models import Issue
+from ..pagination import KeysetPagination
 
 
 @pytest.fixture()
@@ -24,6 +29,14 @@ def issues(create_issue: typing.Callable[..., Issue]) -> list[Issue]:
     return examples
 
 
+def issues_query(context: CaptureQueriesContext) -> str:
+    """
+    Returns the last captured query of issues (labels are queried after it).
+    """
+    queries = [query["sql"] for query in context.captured_queries]
+    return [sql for sql in queries if 'FROM "issues_issue"' in sql][-1]
+
+
 @pytest.mark.django_db
 class TestListIssues(APIViewTest, UsesGetMethod, Returns200):  # type: ignore
     @pytest.fixture
@@ -36,7 +49,7 @@ class TestListIssues(APIViewTest, UsesGetMethod, Returns200):  # type: ignore
         """
         Tests an empty list of issues is returned.
         """
-        assert json == []
+        assert json == {"next": None, "previous": None, "results": []}
 
     def test_returns_list_of_created_issues(
         self,
@@ -62,7 +75,311 @@ class TestListIssues(APIViewTest, UsesGetMethod, Returns200):  # type: ignore
             for i, issue in enumerate(issues, 1)
         ]
 
-        assert json == expected
+        assert json == {"next": None, "previous": None, "results": expected}
+
+    @pytest.mark.parametrize("count", [1, 10])
+    def test_query_count_does_not_grow_with_issues(
+        self,
+        client: typing.Any,
+        create_issue: typing.Callable[..., Issue],
+        django_assert_num_queries: typing.Any,
+        count: int,
+    ) -> None:
+        """
+        Tests a page of issues is fetched by a single query regardless of its size
+        (apart from the query of the global revision of issues, and the queries of
+        labels of categories and users missing in the label caches).
+        """
+        for i in range(count):
+            create_issue(Issue.State.OPEN, title=f"Issue{i}")
+
+        with django_assert_num_queries(4):
+            response = client.get(reverse("issues"))
+
+        assert len(response.json()["results"]) == count
+
+
+@pytest.mark.django_db
+class TestListIssuesPagination:
+    @pytest.fixture
+    def many_issues(self, issues: list[Issue]) -> list[Issue]:
+        """
+        Creates issues sharing the same `opened_at`, so that pages have to be split
+        by `id` as well.
+        """
+        Issue.objects.update(opened_at=timezone.now())
+        return sorted(issues, key=lambda issue: int(issue.pk))
+
+    def test_pages_follow_next_links(self, client: typing.Any, many_issues: list[Issue]) -> None:
+        """
+        Tests following `next` cursors visits every issue exactly once, in order.
+        """
+        url: str | None = reverse("issues") + "?page_size=3"
+        seen: list[int] = []
+
+        while url is not None:
+            page = client.get(url).json()
+            assert len(page["results"]) <= 3
+            seen.extend(issue["id"] for issue in page["results"])
+            url = page["next"]
+
+        assert seen == [issue.pk for issue in many_issues]
+
+    def test_previous_link_returns_previous_page(
+        self, client: typing.Any, many_issues: list[Issue]
+    ) -> None:
+        """
+        Tests `previous` cursor of the second page leads back to the first page.
+        """
+        first = client.get(reverse("issues"), {"page_size": 2}).json()
+        assert first["previous"] is None
+
+        second = client.get(first["next"]).json()
+        assert [issue["id"] for issue in second["results"]] == [3, 4]
+        assert second["next"] is None
+
+        back = client.get(second["previous"]).json()
+        assert back["results"] == first["results"]
+        assert back["previous"] is None
+        assert back["next"] is not None
+
+    def test_page_size_is_capped(self, client: typing.Any, many_issues: list[Issue]) -> None:
+        """
+        Tests page size is limited by `max_page_size`.
+        """
+        issue = many_issues[0]
+        Issue.objects.create_many(
+            [
+                Issue(
+                    title=f"More{i}",
+                    description=issue.description,
+                    submitter=issue.submitter,
+                    assignee=issue.assignee,
+                    category=issue.category,
+                )
+                for i in range(KeysetPagination.max_page_size)
+            ]
+        )
+
+        response = client.get(reverse("issues"), {"page_size": 1000000})
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == KeysetPagination.max_page_size
+        assert response.json()["next"] is not None
+
+    def test_invalid_cursor(self, client: typing.Any) -> None:
+        """
+        Tests a malformed cursor is reported as not found.
+        """
+        response = client.get(reverse("issues"), {"cursor": "garbage"})
+        assert response.status_code == 404
+
+    def test_page_query_seeks_instead_of_offset(
+        self, client: typing.Any, many_issues: list[Issue]
+    ) -> None:
+        """
+        Tests following pages seeks by position and never uses OFFSET.
+        """
+        first = client.get(reverse("issues"), {"page_size": 2}).json()
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(first["next"])
+
+        page_query = issues_query(context)
+        assert "OFFSET" not in page_query
+        assert "LIMIT 3" in page_query
+
+
+@pytest.mark.django_db
+class TestFilterIssues:
+    @pytest.fixture
+    def mixed_issues(
+        self, timezone_patcher: typing.Any, create_issue: typing.Callable[..., Issue]
+    ) -> list[Issue]:
+        """
+        Creates open and closed issues opened at different times.
+        """
+        return [
+            create_issue(Issue.State.OPEN, title="Issue1"),
+            create_issue(Issue.State.CLOSED, title="Issue2"),
+            create_issue(Issue.State.OPEN, title="Issue3"),
+        ]
+
+    @staticmethod
+    def titles(response: typing.Any) -> list[str]:
+        assert response.status_code == 200, response.content
+        return [issue["title"] for issue in response.json()["results"]]
+
+    @pytest.mark.parametrize("state", ["open", "Open", "OPN"])
+    def test_filter_by_state(
+        self, client: typing.Any, mixed_issues: list[Issue], state: str
+    ) -> None:
+        """
+        Tests issues are filtered by state given by its label or value.
+        """
+        response = client.get(reverse("issues"), {"state": state})
+        assert self.titles(response) == ["Issue1", "Issue3"]
+
+    def test_filter_by_assignee_and_category(
+        self, client: typing.Any, mixed_issues: list[Issue]
+    ) -> None:
+        """
+        Tests issues are filtered by username of assignee and by name of category.
+        """
+        response = client.get(reverse("issues"), {"assignee": "Issue2-assignee"})
+        assert self.titles(response) == ["Issue2"]
+
+        response = client.get(reverse("issues"), {"category": "Issue3-category"})
+        assert self.titles(response) == ["Issue3"]
+
+    def test_filter_by_date_range(self, client: typing.Any, mixed_issues: list[Issue]) -> None:
+        """
+        Tests issues are filtered by range of `opened_at`, including start and excluding end.
+        """
+        params = {
+            "opened_after": mixed_issues[1].opened_at.isoformat(),
+            "opened_before": mixed_issues[2].opened_at.isoformat(),
+        }
+        response = client.get(reverse("issues"), params)
+        assert self.titles(response) == ["Issue2"]
+
+    def test_ordering(self, client: typing.Any, mixed_issues: list[Issue]) -> None:
+        """
+        Tests issues are ordered by whitelisted ordering, also across pages.
+        """
+        response = client.get(reverse("issues"), {"ordering": "-opened_at", "page_size": 2})
+        assert self.titles(response) == ["Issue3", "Issue2"]
+        assert self.titles(client.get(response.json()["next"])) == ["Issue1"]
+
+        mixed_issues[0].description = "Changed"
+        mixed_issues[0].save()
+        response = client.get(reverse("issues"), {"ordering": "-updated_at"})
+        assert self.titles(response) == ["Issue1", "Issue3", "Issue2"]
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"state": "pending"},
+            {"opened_after": "yesterday"},
+            {"ordering": "title"},
+        ],
+    )
+    def test_invalid_parameters(self, client: typing.Any, params: dict[str, str]) -> None:
+        """
+        Tests invalid filters and orderings are rejected.
+        """
+        response = client.get(reverse("issues"), params)
+        assert response.status_code == 400
+        assert list(response.json()) == list(params)
+
+    @pytest.mark.parametrize(
+        "params,index",
+        [
+            ({}, "issue_opened_at_idx"),
+            ({"ordering": "-opened_at"}, "issue_opened_at_idx"),
+            ({"ordering": "updated_at"}, "issue_updated_at_idx"),
+            ({"ordering": "-updated_at"}, "issue_updated_at_idx"),
+            ({"opened_after": "2022-11-18T00:00:00Z"}, "issue_opened_at_idx"),
+            (
+                {"opened_after": "2022-11-18T00:00:00Z", "opened_before": "2022-11-19T00:00:00Z"},
+                "issue_opened_at_idx",
+            ),
+            ({"state": "open"}, "issue_state_idx"),
+            ({"state": "open", "opened_after": "2022-11-18T00:00:00Z"}, "issue_state_idx"),
+            ({"state": "open", "ordering": "-opened_at"}, "issue_state_idx"),
+            ({"assignee": "Issue1-assignee"}, "issue_assignee_idx"),
+            ({"assignee": "Issue1-assignee", "state": "open"}, "issue_assignee_idx"),
+            ({"category": "Issue1-category"}, "issue_category_idx"),
+            ({"category": "Issue1-category", "state": "open"}, "issue_category_idx"),
+            ({"state": "open", "ordering": "updated_at"}, "issue_state_updated_idx"),
+            ({"state": "closed", "ordering": "-updated_at"}, "issue_state_updated_idx"),
+            (
+                {"assignee": "Issue1-assignee", "ordering": "updated_at"},
+                "issue_assignee_updated_idx",
+            ),
+            (
+                {"assignee": "Issue1-assignee", "state": "open", "ordering": "-updated_at"},
+                "issue_assignee_updated_idx",
+            ),
+            (
+                {"category": "Issue1-category", "ordering": "-updated_at"},
+                "issue_category_updated_idx",
+            ),
+            (
+                {"category": "Issue1-category", "state": "open", "ordering": "updated_at"},
+                "issue_category_updated_idx",
+            ),
+        ],
+    )
+    def test_filters_use_index(
+        self,
+        client: typing.Any,
+        settings: typing.Any,
+        mixed_issues: list[Issue],
+        params: dict[str, str],
+        index: str,
+    ) -> None:
+        """
+        Tests every filter shape reads issues by an index, which also provides the
+        ordering (no full scan of issues, no sorting).
+        """
+        settings.ISSUES_CACHE = None
+        # Open issues would be served from memory.
+        settings.ISSUES_READ_MODEL = False
+
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(reverse("issues"), params).status_code == 200
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {issues_query(context)}")
+            plan = [row[-1] for row in cursor.fetchall()]
+
+        issues_steps = [step for step in plan if " issues_issue " in step]
+        assert len(issues_steps) == 1, plan
+        assert f"USING INDEX {index}" in issues_steps[0], plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+@pytest.mark.django_db
+class TestStreamIssues:
+    @pytest.fixture(autouse=True)
+    def small_chunks(self, monkeypatch: typing.Any) -> None:
+        """
+        Makes streaming split 4 example issues into several chunks.
+        """
+        monkeypatch.setattr("issue_tracker.apps.issues.views.STREAM_CHUNK_SIZE", 3)
+
+    def test_streams_empty_json_array(self, client: typing.Any) -> None:
+        """
+        Tests streaming without issues produces valid empty JSON array.
+        """
+        response = client.get(reverse("issues"), {"stream": "1"})
+
+        assert response.streaming
+        assert b"".join(response.streaming_content) == b"[]"
+
+    def test_streams_all_issues_as_json(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests `?stream=1` returns all issues as a single JSON array, without pagination.
+        """
+        expected = client.get(reverse("issues")).json()["results"]
+        response = client.get(reverse("issues"), {"stream": "1", "page_size": 1})
+
+        assert response.streaming
+        assert response["Content-Type"] == "application/json"
+        assert json.loads(b"".join(response.streaming_content)) == expected
+
+    def test_streams_all_issues_as_ndjson(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests `Accept: application/x-ndjson` streams an issue per line.
+        """
+        expected = client.get(reverse("issues")).json()["results"]
+        response = client.get(reverse("issues"), HTTP_ACCEPT="application/x-ndjson")
+
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [json.loads(line) for line in lines] == expected
 
 
 @pytest.mark.django_db
@@ -104,3 +421,388 @@ class TestListIssueDetail(APIViewTest, UsesGetMethod):  # type: ignore
         }
 
         assert json == expected
+
+    def test_found_using_single_query(
+        self,
+        client: typing.Any,
+        issues: list[Issue],
+        django_assert_num_queries: typing.Any,
+        settings: typing.Any,
+    ) -> None:
+        """
+        Tests issue and its related objects are fetched by a single query (apart from
+        the query of the revision of the issue).
+        """
+        settings.ISSUES_CACHE = None
+        with django_assert_num_queries(2):
+            response = client.get(reverse("issue", args=[1]))
+
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    @pytest.mark.parametrize("url", [reverse("issues"), reverse("issue", args=[1])])
+    def test_unchanged_is_not_modified(
+        self,
+        client: typing.Any,
+        issues: list[Issue],
+        django_assert_num_queries: typing.Any,
+        url: str,
+    ) -> None:
+        """
+        Tests a request with the current ETag is answered by 304 using one cheap query.
+        """
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.has_header("Last-Modified")
+
+        with django_assert_num_queries(1):
+            response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize("url", [reverse("issues"), reverse("issue", args=[1])])
+    def test_changed_is_returned(self, client: typing.Any, issues: list[Issue], url: str) -> None:
+        """
+        Tests a request with an outdated ETag is answered by the current content.
+        """
+        etag = client.get(url)["ETag"]
+
+        issues[0].state = Issue.State.CLOSED
+        issues[0].save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_representations_have_own_etags(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests JSON and NDJSON of the same URL don't share ETag, so that a client
+        can't get 304 for the other representation.
+        """
+        response = client.get(reverse("issues"), HTTP_ACCEPT="application/json")
+        etag = response["ETag"]
+        assert "Accept" in response["Vary"]
+
+        ndjson = client.get(
+            reverse("issues"), HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=etag
+        )
+        assert ndjson.status_code == 200
+        assert ndjson["ETag"] != etag
+
+        response = client.get(
+            reverse("issues"), HTTP_ACCEPT="application/x-ndjson", HTTP_IF_NONE_MATCH=ndjson["ETag"]
+        )
+        assert response.status_code == 304
+
+    def test_change_of_another_issue_keeps_detail(
+        self, client: typing.Any, issues: list[Issue]
+    ) -> None:
+        """
+        Tests ETag of an issue doesn't change by changing another issue.
+        """
+        etag = client.get(reverse("issue", args=[1]))["ETag"]
+
+        issues[1].state = Issue.State.CLOSED
+        issues[1].save()
+
+        response = client.get(reverse("issue", args=[1]), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_not_modified_since(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests `If-Modified-Since` is answered by 304 when nothing changed since.
+        """
+        last_modified = client.get(reverse("issues"))["Last-Modified"]
+
+        response = client.get(reverse("issues"), HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+    def test_deletion_changes_list(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests deleting an issue changes ETag of the list.
+        """
+        etag = client.get(reverse("issues"))["ETag"]
+        issues[0].delete()
+
+        response = client.get(reverse("issues"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    @pytest.mark.parametrize("url", [reverse("issues"), reverse("issue", args=[1])])
+    def test_repeated_request_is_cached(
+        self,
+        client: typing.Any,
+        issues: list[Issue],
+        django_assert_num_queries: typing.Any,
+        url: str,
+    ) -> None:
+        """
+        Tests repeated request is served from cache without querying issues.
+        """
+        first = client.get(url)
+        assert first["X-Cache"] == "MISS"
+
+        with django_assert_num_queries(1):
+            second = client.get(url)
+
+        assert second["X-Cache"] == "HIT"
+        assert second.json() == first.json()
+        assert issue_cache.stats() == {"hits": 1, "misses": 1}
+
+    @pytest.mark.parametrize("url", [reverse("issues"), reverse("issue", args=[1])])
+    def test_change_invalidates_cache(
+        self, client: typing.Any, issues: list[Issue], url: str
+    ) -> None:
+        """
+        Tests changing an issue invalidates cached payloads.
+        """
+        client.get(url)
+
+        issues[0].title = "Changed"
+        issues[0].save()
+
+        response = client.get(url)
+        assert response["X-Cache"] == "MISS"
+        assert "Changed" in response.content.decode()
+
+    def test_category_change_invalidates_cache(
+        self, client: typing.Any, issues: list[Issue]
+    ) -> None:
+        """
+        Tests renaming category invalidates cached issues of the category.
+        """
+        client.get(reverse("issue", args=[1]))
+
+        issues[0].category.name = "renamed"
+        issues[0].category.save()
+
+        response = client.get(reverse("issue", args=[1]))
+        assert response["X-Cache"] == "MISS"
+        assert response.json()["category"] == "renamed"
+
+    def test_save_deletes_cached_issue(
+        self,
+        client: typing.Any,
+        issues: list[Issue],
+        django_capture_on_commit_callbacks: typing.Any,
+    ) -> None:
+        """
+        Tests saving an issue deletes its cache entry (write-through invalidation).
+        """
+        client.get(reverse("issue", args=[1]))
+        assert issue_cache.backend is not None
+        assert issue_cache.backend.get(issue_cache.issue_key(1)) is not None
+
+        issues[0].title = "Changed"
+        with django_capture_on_commit_callbacks(execute=True):
+            issues[0].save()
+
+        assert issue_cache.backend.get(issue_cache.issue_key(1)) is None
+
+    def test_cache_can_be_disabled(
+        self, client: typing.Any, issues: list[Issue], settings: typing.Any
+    ) -> None:
+        """
+        Tests no caching happens when `ISSUES_CACHE` is None.
+        """
+        settings.ISSUES_CACHE = None
+        client.get(reverse("issue", args=[1]))
+        response = client.get(reverse("issue", args=[1]))
+
+        assert not response.has_header("X-Cache")
+        assert issue_cache.stats() == {"hits": 0, "misses": 0}
+
+
+@pytest.mark.django_db
+class TestMultiGet:
+    def test_issues_by_ids(
+        self,
+        client: typing.Any,
+        issues: list[Issue],
+        django_assert_max_num_queries: typing.Any,
+        settings: typing.Any,
+    ) -> None:
+        """
+        Tests issues are returned in order of the ids as by their details, missing ids
+        are listed, and the number of queries doesn't depend on the number of issues.
+        """
+        settings.ISSUES_CACHE = None
+        with django_assert_max_num_queries(4):
+            response = client.get(reverse("issues"), {"ids": "3,99,1,3,2,4"})
+
+        assert response.status_code == 200
+        assert response.json()["missing"] == [99]
+        assert response.json()["results"] == [
+            client.get(reverse("issue", args=[iid])).json() for iid in (3, 1, 2, 4)
+        ]
+
+        response = client.get(reverse("issues"), {"ids": "4,1", "fields": "id,state"})
+        assert response.json() == {
+            "results": [{"id": 4, "state": "Open"}, {"id": 1, "state": "Open"}],
+            "missing": [],
+        }
+
+    @pytest.mark.parametrize("ids", ["", "1,x", "0", ",".join(map(str, range(1, 102)))])
+    def test_invalid_ids(self, client: typing.Any, issues: list[Issue], ids: str) -> None:
+        """
+        Tests invalid, missing or too many ids are answered by 400.
+        """
+        response = client.get(reverse("issues"), {"ids": ids})
+        assert response.status_code == 400
+        assert "ids" in response.json()
+
+
+@pytest.mark.django_db
+class TestBulkApi:
+    @pytest.fixture
+    def staff(self, django_user_model: typing.Any) -> typing.Any:
+        return django_user_model.objects.create_user(username="staff", is_staff=True)
+
+    @staticmethod
+    def new_issue(issue: Issue, **changes: str) -> dict[str, str]:
+        """Returns payload of a new issue with the assignee and category of an existing one."""
+        return {
+            "title": "New",
+            "description": "Created in bulk",
+            "assignee": str(issue.assignee),
+            "category": issue.category.name,
+            **changes,
+        }
+
+    def test_create(
+        self,
+        client: typing.Any,
+        staff: typing.Any,
+        issues: list[Issue],
+        django_assert_max_num_queries: typing.Any,
+    ) -> None:
+        """
+        Tests staff creates issues at once, submitted by them.
+        """
+        client.force_login(staff)
+        payload = [self.new_issue(issues[i % 2], title=f"New{i}") for i in range(10)]
+        payload[-1]["state"] = "Closed"
+
+        with django_assert_max_num_queries(16):
+            response = client.post(reverse("issues-bulk"), payload, content_type="application/json")
+
+        assert response.status_code == 201
+        created = Issue.objects.filter(id__in=response.json()["ids"]).order_by("id")
+        assert [issue.title for issue in created] == [item["title"] for item in payload]
+        assert {issue.submitter for issue in created} == {staff}
+        assert created[9].state == Issue.State.CLOSED
+
+        found = client.get(reverse("issues-search"), {"q": "New9"}).json()["results"]
+        assert [issue["title"] for issue in found] == ["New9"]
+
+    def test_create_reports_unknown_names(
+        self, client: typing.Any, staff: typing.Any, issues: list[Issue]
+    ) -> None:
+        """
+        Tests unknown assignees and categories are reported per issue and nothing is created.
+        """
+        client.force_login(staff)
+        payload = [self.new_issue(issues[0]), self.new_issue(issues[0], category="Nope")]
+
+        response = client.post(reverse("issues-bulk"), payload, content_type="application/json")
+
+        assert response.status_code == 400
+        assert response.json() == [{}, {"category": ["Unknown category 'Nope'."]}]
+        assert Issue.objects.count() == len(issues)
+
+    def test_create_requires_staff(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests anonymous users can't create issues.
+        """
+        payload = [self.new_issue(issues[0])]
+        response = client.post(reverse("issues-bulk"), payload, content_type="application/json")
+        assert response.status_code == 403
+
+    def test_change_state(
+        self, client: typing.Any, admin_user: typing.Any, issues: list[Issue]
+    ) -> None:
+        """
+        Tests superuser moves issues into a state at once.
+        """
+        client.force_login(admin_user)
+        etag = client.get(reverse("issue", args=[1]))["ETag"]
+
+        response = client.post(
+            reverse("issues-bulk-state"),
+            {"ids": [1, 2, 99], "state": "closed"},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"ids": [1, 2]}
+        detail = client.get(reverse("issue", args=[1]), HTTP_IF_NONE_MATCH=etag)
+        assert detail.status_code == 200
+        assert detail.json()["state"] == "Closed"
+
+    def test_change_state_requires_superuser(
+        self, client: typing.Any, staff: typing.Any, issues: list[Issue]
+    ) -> None:
+        """
+        Tests staff can't change issues, as in the admin.
+        """
+        client.force_login(staff)
+        response = client.post(
+            reverse("issues-bulk-state"),
+            {"ids": [1], "state": "Closed"},
+            content_type="application/json",
+        )
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestFieldsets:
+    def test_list_fields(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests list returns only the requested fields, including the description.
+        """
+        response = client.get(reverse("issues"), {"fields": "id,description", "page_size": 1})
+
+        assert response.json()["results"] == [{"id": 1, "description": "Test description"}]
+        assert response.json()["next"] is not None
+
+    def test_pages_of_sparse_fieldset(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests pages are linked even when the ordering fields are not requested.
+        """
+        url: str | None = reverse("issues") + "?fields=title&ordering=-updated_at&page_size=3"
+        titles: list[str] = []
+        while url is not None:
+            page = client.get(url).json()
+            titles.extend(issue["title"] for issue in page["results"])
+            url = page["next"]
+
+        assert titles == ["Issue4", "Issue3", "Issue2", "Issue1"]
+
+    def test_detail_expand(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests detail returns related objects expanded.
+        """
+        issue = issues[0]
+        response = client.get(
+            reverse("issue", args=[issue.pk]), {"fields": "title", "expand": "category"}
+        )
+
+        assert response.json() == {
+            "title": issue.title,
+            "category": {"id": issue.category.pk, "name": issue.category.name},
+        }
+        default = client.get(reverse("issue", args=[issue.pk])).json()
+        assert default["category"] == issue.category.name
+
+    @pytest.mark.parametrize("name", ["issues", "issues-search"])
+    def test_unknown_field(self, client: typing.Any, issues: list[Issue], name: str) -> None:
+        """
+        Tests unknown fields are rejected.
+        """
+        response = client.get(reverse(name), {"q": "issue", "fields": "id,nope"})
+        assert response.status_code == 400
+        assert response.json() == {"fields": ["Unknown fields: nope."]}
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import typing
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import RequestFactory
+from django.urls import reverse
+
+from issue_tracker.asgi import application
+
+from .. import async_views
+from ..models import Issue
+
+
+@pytest.fixture()
+def issues(create_issue: typing.Callable[..., Issue]) -> list[Issue]:
+    """
+    Creates example issues for later testing.
+    """
+    return [
+        create_issue(Issue.State.OPEN, title="Issue1"),
+        create_issue(Issue.State.CLOSED, title="Issue2"),
+        create_issue(Issue.State.OPEN, title="Issue3"),
+    ]
+
+
+def get(async_client: typing.Any, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+    """
+    Makes a request by the asynchronous test client from synchronous code.
+    """
+
+    async def request() -> typing.Any:
+        return await async_client.get(*args, **kwargs)
+
+    return async_to_sync(request)()
+
+
+@pytest.fixture(autouse=True)
+def short_poll_interval(monkeypatch: typing.Any) -> None:
+    """
+    Makes long polling check for changes often, so that tests are fast.
+    """
+    monkeypatch.setattr("issue_tracker.apps.issues.conditional.LONG_POLL_INTERVAL", 0.01)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "sync_url,async_url",
+    [
+        (reverse("issues"), reverse("async-issues")),
+        (reverse("issues") + "?page_size=2", reverse("async-issues") + "?page_size=2"),
+        (reverse("issues") + "?state=open", reverse("async-issues") + "?state=open"),
+        (
+            reverse("issues") + "?ordering=-opened_at",
+            reverse("async-issues") + "?ordering=-opened_at",
+        ),
+        (reverse("issues") + "?ids=3,1,9", reverse("async-issues") + "?ids=3,1,9"),
+        (reverse("issues") + "?cursor=garbage", reverse("async-issues") + "?cursor=garbage"),
+        (
+            reverse("issues") + "?fields=id,title&expand=category",
+            reverse("async-issues") + "?fields=id,title&expand=category",
+        ),
+        (
+            reverse("issue", args=[2]) + "?expand=assignee",
+            reverse("async-issue", args=[2]) + "?expand=assignee",
+        ),
+        (reverse("issue", args=[2]), reverse("async-issue", args=[2])),
+        (reverse("issue", args=[9]), reverse("async-issue", args=[9])),
+    ],
+)
+def test_async_views_match_sync_views(
+    client: typing.Any,
+    async_client: typing.Any,
+    issues: list[Issue],
+    sync_url: str,
+    async_url: str,
+) -> None:
+    """
+    Test asynchronous views return the same representation as synchronous ones.
+    """
+    expected = client.get(sync_url)
+    response = get(async_client, async_url)
+
+    assert response.status_code == expected.status_code
+    assert response.headers.get("ETag") == expected.headers.get("ETag")
+    assert json.dumps(response.json()).replace("/async", "") == json.dumps(expected.json())
+
+
+@pytest.mark.django_db
+def test_async_list_is_cached(async_client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test pages of the asynchronous list are cached until any issue changes.
+    """
+    url = reverse("async-issues") + "?ordering=opened_at"
+    assert get(async_client, url)["X-Cache"] == "MISS"
+    assert get(async_client, url)["X-Cache"] == "HIT"
+
+    issues[0].title = "Changed"
+    issues[0].save()
+
+    response = get(async_client, url)
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["results"][0]["title"] == "Changed"
+
+
+@pytest.mark.django_db
+def test_async_list_rejects_streaming(async_client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test streaming, not supported by the asynchronous list, is rejected.
+    """
+    response = get(async_client, reverse("async-issues"), {"stream": "1"})
+    assert response.status_code == 400
+    assert "stream" in response.json()
+
+    # The asynchronous test client of Django 4.1 doesn't send extra headers.
+    request = RequestFactory().get(reverse("async-issues"), HTTP_ACCEPT="application/x-ndjson")
+    assert async_to_sync(async_views.issues_list)(request).status_code == 406
+
+
+@pytest.mark.django_db
+def test_long_poll_times_out_when_unchanged(async_client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test long polling request answers 304 once the wait time passes without a change.
+    """
+    url = reverse("async-issue", args=[1])
+    etag = get(async_client, url)["ETag"]
+
+    response = get(async_client, url, {"wait": 0.05}, **{"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_long_poll_returns_change(async_client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test long polling request answers as soon as the issue changes.
+    """
+    url = reverse("async-issue", args=[1])
+    etag = get(async_client, url)["ETag"]
+
+    async def close_issue() -> None:
+        await asyncio.sleep(0.05)
+        issues[0].state = Issue.State.CLOSED
+        await sync_to_async(issues[0].save)()
+
+    async def poll_and_close() -> typing.Any:
+        response, _ = await asyncio.gather(
+            async_client.get(url, {"wait": 10}, **{"If-None-Match": etag}), close_issue()
+        )
+        return response
+
+    response = async_to_sync(poll_and_close)()
+    assert response.status_code == 200
+    assert response.json()["state"] == "Closed"
+
+
+@pytest.mark.django_db
+def test_asgi_application_serves_async_views(issues: list[Issue], mocker: typing.Any) -> None:
+    """
+    Test the ASGI entry point serves the asynchronous views.
+    """
+    # Keep the test database connection open, as the test client does.
+    mocker.patch("django.db.close_old_connections")
+
+    sent: list[dict[str, typing.Any]] = []
+
+    async def receive() -> dict[str, typing.Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, typing.Any]) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": reverse("async-issues"),
+        "raw_path": reverse("async-issues").encode(),
+        "query_string": b"page_size=2",
+        "root_path": "",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    async_to_sync(application)(scope, receive, send)
+
+    assert sent[0]["status"] == 200
+    body = json.loads(b"".join(message.get("body", b"") for message in sent[1:]))
+    assert [issue["title"] for issue in body["results"]] == ["Issue1", "Issue2"]
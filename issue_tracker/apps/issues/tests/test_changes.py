@@ -0,0 +1,249 @@
+import asyncio
+import io
+import json
+import typing
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from issue_tracker.asgi import application
+
+from .. import changes
+from ..models import Category, Issue, IssueChange, IssueChangeHorizon
+from ..serializers import Fieldset
+
+
+@pytest.fixture()
+def issues(create_issue: typing.Callable[..., Issue]) -> list[Issue]:
+    """
+    Creates example issues for later testing.
+    """
+    return [
+        create_issue(Issue.State.OPEN, title="Issue1"),
+        create_issue(Issue.State.CLOSED, title="Issue2"),
+        create_issue(Issue.State.OPEN, title="Issue3"),
+    ]
+
+
+@pytest.fixture(autouse=True)
+def short_poll_interval(monkeypatch: typing.Any) -> None:
+    """
+    Makes long polling and streaming check for changes often, so that tests are fast.
+    """
+    monkeypatch.setattr("issue_tracker.apps.issues.conditional.LONG_POLL_INTERVAL", 0.01)
+
+
+def changed(response: typing.Any) -> list[tuple[int, bool]]:
+    """Returns ids of issues of a batch of changes and whether they were deleted."""
+    return [(change["id"], change["deleted"]) for change in response.json()["changes"]]
+
+
+@pytest.mark.django_db
+def test_changes_after_sequence(client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test changes are listed in order, each issue once by its latest change, deleted
+    issues by tombstones, and the next batch starts after the listed changes.
+    """
+    url = reverse("issues-changes")
+    start = client.get(url).json()
+    assert [change["issue"]["title"] for change in start["changes"]] == [
+        "Issue1",
+        "Issue2",
+        "Issue3",
+    ]
+    assert start["changes"][1]["issue"]["state"] == "Closed"
+
+    deleted = issues[1].pk
+    issues[0].title = "Renamed"
+    issues[0].save()
+    issues[1].delete()
+    issues[0].state = Issue.State.CLOSED
+    issues[0].save()
+
+    response = client.get(url, {"since": start["next"], "fields": "id,state"})
+    assert changed(response) == [(deleted, True), (issues[0].pk, False)]
+    assert response.json()["changes"][1]["issue"] == {"id": issues[0].pk, "state": "Closed"}
+    assert response.json()["more"] is False
+
+    first = client.get(url, {"since": start["next"], "page_size": 1}).json()
+    assert (len(first["changes"]), first["more"]) == (1, True)
+    assert client.get(url, {"since": first["next"]}).json()["next"] == response.json()["next"]
+    assert client.get(url, {"since": response.json()["next"]}).json() == {
+        "changes": [],
+        "next": response.json()["next"],
+        "more": False,
+    }
+    assert client.get(url, {"since": "-1"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_changes_are_logged(client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test changes of many issues at once (and of their labels) are logged by an entry
+    per issue under the revision of the change.
+    """
+    since = IssueChange.latest()
+
+    Issue.objects.filter(id__in=[issues[0].pk, issues[2].pk]).set_state(Issue.State.CLOSED)
+    category = Category.objects.get(name="Issue2-category")
+    category.name = "Renamed"
+    category.save()
+
+    entries = list(
+        IssueChange.objects.filter(sequence__gt=since).values_list("issue_id", "revision")
+    )
+    assert [iid for iid, _ in entries] == [issues[0].pk, issues[2].pk, issues[1].pk]
+    assert entries[0][1] == entries[1][1] < entries[2][1]
+    response = client.get(reverse("issues-changes"), {"since": since})
+    assert response.json()["changes"][-1]["issue"]["category"] == "Renamed"
+
+
+@pytest.mark.django_db
+def test_compaction_and_expiration(client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test compaction keeps the latest entry of every issue, and clients behind the
+    expired entries are told to read all issues again.
+    """
+    for state in (Issue.State.CLOSED, Issue.State.OPEN):
+        issues[0].state = state
+        issues[0].save()
+    deleted = issues[2].pk
+    issues[2].delete()
+    url = reverse("issues-changes")
+    before = changed(client.get(url))
+
+    out = io.StringIO()
+    call_command("compact_changes", stdout=out)
+
+    assert "Dropped 0 expired and 3 superseded entries" in out.getvalue()
+    assert (
+        changed(client.get(url))
+        == before
+        == [
+            (issues[1].pk, False),
+            (issues[0].pk, False),
+            (deleted, True),
+        ]
+    )
+
+    latest = IssueChange.latest()
+    IssueChange.objects.update(changed_at=timezone.now() - timedelta(days=31))
+    call_command("compact_changes", stdout=out)
+
+    assert not IssueChange.objects.exists()
+    assert IssueChangeHorizon.current() == IssueChange.latest() == latest
+    response = client.get(url, {"since": latest - 1})
+    assert response.status_code == 410
+    assert response.json()["latest"] == latest
+    assert client.get(url, {"since": latest}).json()["changes"] == []
+
+
+@pytest.mark.django_db
+def test_long_poll_returns_changes(async_client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test long polling request answers as soon as issues change, or without changes
+    once the time runs out.
+    """
+    url = reverse("async-issues-changes")
+    since = IssueChange.latest()
+
+    async def close_issue() -> None:
+        await asyncio.sleep(0.05)
+        issues[0].state = Issue.State.CLOSED
+        await sync_to_async(issues[0].save)()
+
+    async def poll_and_close() -> typing.Any:
+        unchanged = await async_client.get(url, {"since": since, "wait": 0.05})
+        assert unchanged.json()["changes"] == []
+        response, _ = await asyncio.gather(
+            async_client.get(url, {"since": since, "wait": 10}), close_issue()
+        )
+        return response
+
+    response = async_to_sync(poll_and_close)()
+    assert response.status_code == 200
+    assert response.json()["changes"][0]["issue"]["state"] == "Closed"
+
+
+@pytest.mark.django_db
+def test_waiting_clients_share_polling(issues: list[Issue], mocker: typing.Any) -> None:
+    """
+    Test clients waiting for changes don't query the change log themselves: the latest
+    sequence is polled once for all of them, and each reads its batch once it has
+    changes.
+    """
+    since = IssueChange.latest()
+    latest = mocker.spy(IssueChange, "latest")
+    read = mocker.spy(changes, "aread_changes")
+
+    async def wait_and_close() -> list[dict[str, typing.Any]]:
+        async def close_issue() -> None:
+            await asyncio.sleep(0.1)
+            issues[0].state = Issue.State.CLOSED
+            await sync_to_async(issues[0].save)()
+
+        waiting = [changes.wait_for_changes(since, 10, Fieldset(("id",)), 10) for _ in range(20)]
+        *batches, _ = await asyncio.gather(*waiting, close_issue())
+        return batches
+
+    batches = async_to_sync(wait_and_close)()
+
+    assert all(batch["changes"][0]["id"] == issues[0].pk for batch in batches)
+    assert read.call_count == 2 * len(batches)
+    # Polled about every 0.01 s for all clients, not by each of them.
+    assert latest.call_count < 2 * len(batches)
+
+
+@pytest.mark.django_db
+def test_changes_are_streamed_as_events(issues: list[Issue]) -> None:
+    """
+    Test the ASGI entry point streams changes as server-sent events, continuing after
+    the last event received by the client, until the client disconnects.
+    """
+    sent: list[dict[str, typing.Any]] = []
+    since = IssueChange.latest() - 1
+
+    async def stream() -> None:
+        disconnected = asyncio.Event()
+
+        async def receive() -> dict[str, typing.Any]:
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, typing.Any]) -> None:
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": reverse("async-issues-changes"),
+            "query_string": b"fields=id,title",
+            "headers": [
+                (b"accept", b"text/event-stream"),
+                (b"last-event-id", str(since).encode()),
+            ],
+        }
+        task = asyncio.ensure_future(application(scope, receive, send))
+        await asyncio.sleep(0.05)
+        issues[0].title = "Renamed"
+        await sync_to_async(issues[0].save)()
+        await asyncio.sleep(0.05)
+        disconnected.set()
+        await asyncio.wait_for(task, 1)
+
+    async_to_sync(stream)()
+
+    assert sent[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+    events = b"".join(message.get("body", b"") for message in sent[1:]).decode().split("\n\n")
+    assert events[0].startswith(f"id: {since + 1}\n")
+    data = [json.loads(event.split("data: ")[1]) for event in events if event]
+    assert [(change["id"], change["issue"]["title"]) for change in data] == [
+        (issues[2].pk, "Issue3"),
+        (issues[0].pk, "Renamed"),
+    ]
+    assert data[1]["sequence"] == IssueChange.latest()
@@ -0,0 +1,206 @@
+import typing
+from datetime import date, datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import DailyStats, Issue
+
+
+def day(number: int) -> date:
+    """Returns date of a day of November 2022, when the patched time starts."""
+    return date(2022, 11, number)
+
+
+def counts(since: date, until: date, category: str | None = None) -> list[tuple[int, int]]:
+    """Returns issues opened and closed on every day of the range."""
+    return [(row["opened"], row["closed"]) for row in DailyStats.series(since, until, category)]
+
+
+@pytest.fixture()
+def issues(create_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any) -> list[Issue]:
+    """
+    Creates an issue on 18th November closed the next day, when another closed issue
+    is created.
+    """
+    first = create_issue(Issue.State.OPEN, title="First")
+    timezone_patcher.advance(timedelta(days=1))
+    first.state = Issue.State.CLOSED
+    first.save()
+    second = create_issue(Issue.State.CLOSED, title="Second")
+    return [first, second]
+
+
+@pytest.mark.django_db
+def test_daily_stats_follow_changes_of_issues(
+    issues: list[Issue], build_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Test rollups maintained by changes of issues match rollups of the table.
+    """
+    first, second = issues
+    assert DailyStats.counts() == DailyStats.compute()
+    assert counts(day(18), day(20)) == [(1, 0), (1, 2), (0, 0)]
+    assert first.closed_at is not None and first.closed_at.day == 19
+    assert DailyStats.series(day(19), day(19), "First-category")[0]["median_resolution"] == (
+        pytest.approx(first.resolution_duration, rel=0.01)
+    )
+
+    # Reopened issues move to the day they were reopened.
+    timezone_patcher.advance(timedelta(days=1))
+    first.state = Issue.State.OPEN
+    first.save()
+    Issue.objects.create_many([build_issue(Issue.State.CLOSED, "Bulk")])
+    Issue.objects.filter(pk=second.pk).set_state(Issue.State.OPEN)
+    assert DailyStats.counts() == DailyStats.compute()
+    assert counts(day(18), day(20)) == [(0, 0), (0, 0), (3, 1)]
+    assert counts(day(20), day(20), "Bulk-category") == [(1, 1)]
+
+    first.category.delete()
+    second.refresh_from_db()
+    second.delete()
+    assert DailyStats.counts() == DailyStats.compute()
+    assert counts(day(18), day(20)) == [(0, 0), (0, 0), (1, 1)]
+
+
+@pytest.mark.django_db
+def test_backfill_command(issues: list[Issue]) -> None:
+    """
+    Test rollups of the last days or of all days are rebuilt from the table.
+    """
+    DailyStats.objects.update(opened=5)
+
+    call_command("backfill_daily_stats", "--days", "1")
+    assert counts(day(18), day(19)) == [(5, 0), (1, 2)]
+    assert DailyStats.counts(since=day(19)) == DailyStats.compute(since=day(19))
+
+    call_command("backfill_daily_stats", "--since", "2022-11-18")
+    assert counts(day(18), day(19)) == [(1, 0), (1, 2)]
+
+    DailyStats.objects.all().delete()
+    call_command("backfill_daily_stats")
+    assert DailyStats.counts() == DailyStats.compute()
+
+
+@pytest.mark.django_db
+class TestStatsEndpoint:
+    def test_range(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests every day of the range is reported, days without issues as zeros.
+        """
+        response = client.get(
+            reverse("issues-stats"), {"since": "2022-11-17", "until": "2022-11-19"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["since"], data["until"], data["category"]) == (
+            "2022-11-17",
+            "2022-11-19",
+            None,
+        )
+        assert data["days"] == [
+            {"day": "2022-11-17", "opened": 0, "closed": 0, "median_resolution": None},
+            {"day": "2022-11-18", "opened": 1, "closed": 0, "median_resolution": None},
+            {"day": "2022-11-19", "opened": 1, "closed": 2, "median_resolution": 0.0},
+        ]
+
+    def test_category(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests statistics are limited to a category.
+        """
+        response = client.get(
+            reverse("issues-stats"), {"since": "2022-11-18", "category": "Second-category"}
+        )
+
+        days = response.json()["days"]
+        assert [(row["opened"], row["closed"]) for row in days] == [(0, 0), (1, 1)]
+
+    def test_default_range(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests the last 30 days are reported by default.
+        """
+        days = client.get(reverse("issues-stats")).json()["days"]
+
+        assert len(days) == 30
+        assert days[-1]["day"] == "2022-11-19"
+
+    def test_default_range_moves_at_midnight(
+        self, client: typing.Any, issues: list[Issue], timezone_patcher: typing.Any
+    ) -> None:
+        """
+        Tests conditional requests of the default range are answered by the new range
+        the next day, even though no issue has changed.
+        """
+        response = client.get(reverse("issues-stats"))
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        assert client.get(reverse("issues-stats"), HTTP_IF_NONE_MATCH=etag).status_code == 304
+        category = client.get(reverse("issues-stats"), {"category": "Second-category"})
+        assert category["ETag"] != etag
+
+        timezone_patcher.advance(timedelta(days=1))
+
+        response = client.get(reverse("issues-stats"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["days"][-1]["day"] == "2022-11-20"
+        response = client.get(reverse("issues-stats"), HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"since": "2022-11-20", "until": "2022-11-19"},
+            {"since": "2021-01-01", "until": "2022-11-19"},
+            {"since": "yesterday"},
+        ],
+    )
+    def test_invalid_range(
+        self, client: typing.Any, issues: list[Issue], params: dict[str, str]
+    ) -> None:
+        """
+        Tests invalid ranges are rejected.
+        """
+        response = client.get(reverse("issues-stats"), params)
+
+        assert response.status_code == 400
+        assert "since" in response.json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_closes_legacy_issues(django_user_model: typing.Any) -> None:
+    """
+    Test the migration adding daily rollups closes existing closed issues when their time
+    spent open ends, not on the day they were opened.
+    """
+    executor = MigrationExecutor(connection)
+    executor.migrate([("issues", "0008_resolution_buckets")])
+    apps = executor.loader.project_state([("issues", "0008_resolution_buckets")]).apps
+
+    user = django_user_model.objects.create(username="legacy")
+    opened_at = timezone.make_aware(datetime(2022, 11, 18, 12))
+    legacy = apps.get_model("issues", "Issue").objects.create(
+        title="Legacy",
+        description="Closed before closing times were recorded.",
+        state="CLS",
+        previous_state="CLS",
+        opened_at=opened_at,
+        # Initialized to the opening time by the migration adding revisions.
+        updated_at=opened_at,
+        resolution_duration=int(timedelta(days=2).total_seconds()),
+        category=apps.get_model("issues", "Category").objects.create(name="Legacy"),
+        assignee_id=user.pk,
+        submitter_id=user.pk,
+    )
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+    issue = Issue.objects.get(pk=legacy.pk)
+    assert issue.closed_at == opened_at + timedelta(days=2)
+    assert DailyStats.counts() == DailyStats.compute()
+    rows = DailyStats.objects.order_by("day").values_list("day", "opened", "closed")
+    assert list(rows) == [(day(18), 1, 0), (day(20), 0, 1)]
@@ -0,0 +1,167 @@
+import io
+import typing
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from .. import exports
+from ..imports import open_input, read_records
+from ..models import Issue, IssueChange
+
+
+def exported(
+    directory: Path, files: typing.Iterable[str], fmt: str = "ndjson"
+) -> list[dict[str, typing.Any]]:
+    """Returns records of exported files, read the same way as by the import."""
+    records: list[dict[str, typing.Any]] = []
+    for name in files:
+        with open_input(str(directory / name)) as stream:
+            records.extend(record for _, record in read_records(stream, fmt))
+    return records
+
+
+@pytest.fixture()
+def issues(create_issue: typing.Callable[..., Issue]) -> list[Issue]:
+    """Creates a few issues, some of them closed."""
+    return [
+        create_issue(Issue.State.CLOSED if i % 3 == 0 else Issue.State.OPEN, title=f"Issue{i}")
+        for i in range(10)
+    ]
+
+
+@pytest.mark.django_db
+def test_export_to_files(tmp_path: Path, issues: list[Issue]) -> None:
+    """
+    Test all issues are exported in primary key order, split into files, with the
+    fields read by the import.
+    """
+    exporter = exports.IssueExporter(tmp_path, max_file_size=1, chunk_size=3)
+
+    checkpoint = exporter.run(exporter.start("ndjson"))
+
+    assert checkpoint.complete and checkpoint.exported == 10
+    assert checkpoint.files == tuple(
+        f"issues-0-{checkpoint.until}-{number:05d}.ndjson.gz" for number in range(1, 5)
+    )
+    assert exports.load_checkpoint(tmp_path) == checkpoint
+    records = exported(tmp_path, checkpoint.files)
+    assert [record["id"] for record in records] == [issue.pk for issue in issues]
+    assert records[0] == {
+        "id": issues[0].pk,
+        "title": "Issue0",
+        "description": "Test description",
+        "submitter": "Issue0-submitter",
+        "assignee": "Issue0-assignee",
+        "category": "Issue0-category",
+        "state": "Closed",
+        "opened_at": issues[0].opened_at.isoformat(),
+        "closed_at": typing.cast(typing.Any, issues[0].closed_at).isoformat(),
+        "updated_at": issues[0].updated_at.isoformat(),
+        "revision": issues[0].revision,
+    }
+    assert records[1]["closed_at"] is None
+
+
+@pytest.mark.django_db
+def test_interrupted_export_is_resumed(tmp_path: Path, issues: list[Issue]) -> None:
+    """
+    Test an interrupted export is resumed after its last written file, as CSV it
+    was started with.
+    """
+    exporter = exports.IssueExporter(tmp_path, max_file_size=1, chunk_size=4)
+
+    def interrupt(_: exports.Checkpoint) -> None:
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        exporter.run(exporter.start("csv"), interrupt)
+    interrupted = exports.load_checkpoint(tmp_path)
+    assert interrupted is not None and not interrupted.complete
+    assert (interrupted.exported, interrupted.last_id) == (4, issues[3].pk)
+
+    with pytest.raises(CommandError, match="can't be resumed as ndjson"):
+        call_command("export_issues", str(tmp_path), "--format", "ndjson")
+    out = io.StringIO()
+    call_command("export_issues", str(tmp_path), stdout=out)
+
+    assert f"Resuming the export after issue {issues[3].pk}" in out.getvalue()
+    checkpoint = exports.load_checkpoint(tmp_path)
+    assert checkpoint is not None and checkpoint.complete and len(checkpoint.files) == 2
+    records = exported(tmp_path, checkpoint.files, "csv")
+    assert [int(record["id"]) for record in records] == [issue.pk for issue in issues]
+    assert records[1]["closed_at"] == ""
+
+
+@pytest.mark.django_db
+def test_incremental_export(
+    tmp_path: Path, issues: list[Issue], create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test an incremental export writes only issues changed since the previous export
+    followed by tombstones of deleted issues, and nothing when nothing has changed.
+    """
+    call_command("export_issues", str(tmp_path), stdout=io.StringIO())
+    issues[5].state = Issue.State.CLOSED
+    issues[5].save()
+    created = create_issue(Issue.State.OPEN, title="Issue10")
+    deleted = issues[7].pk
+    issues[7].delete()
+    out = io.StringIO()
+
+    call_command("export_issues", str(tmp_path), "--incremental", stdout=out)
+
+    checkpoint = exports.load_checkpoint(tmp_path)
+    assert checkpoint is not None and checkpoint.since > 0
+    assert f"Exported 2 issues changed since revision {checkpoint.since}" in out.getvalue()
+    assert "(1 deleted)" in out.getvalue()
+    assert checkpoint.files[-1] == f"deleted-{checkpoint.since}-{checkpoint.until}.ndjson.gz"
+    records = exported(tmp_path, checkpoint.files[:-1])
+    assert [(record["id"], record["state"]) for record in records] == [
+        (issues[5].pk, "Closed"),
+        (created.pk, "Open"),
+    ]
+    assert exported(tmp_path, checkpoint.files[-1:]) == [
+        {"id": deleted, "revision": checkpoint.until, "deleted": True}
+    ]
+
+    call_command("export_issues", str(tmp_path), "--incremental", stdout=io.StringIO())
+    unchanged = exports.load_checkpoint(tmp_path)
+    assert unchanged is not None and (unchanged.exported, unchanged.files) == (0, ())
+    assert unchanged.since == checkpoint.until
+
+
+@pytest.mark.django_db
+def test_export_is_complete_up_to_its_snapshot(tmp_path: Path, issues: list[Issue]) -> None:
+    """
+    Test issues changed after the export is started are exported, and the revision
+    the export is complete up to is read along with them.
+    """
+    exporter = exports.IssueExporter(tmp_path)
+    checkpoint = exporter.start("ndjson")
+    issues[4].title = "Changed"
+    issues[4].save()
+
+    checkpoint = exporter.run(checkpoint)
+
+    issues[4].refresh_from_db()
+    assert checkpoint.exported == 10 and checkpoint.until == issues[4].revision
+    assert exported(tmp_path, checkpoint.files)[4]["title"] == "Changed"
+
+
+@pytest.mark.django_db
+def test_expired_changes_export_all_issues(tmp_path: Path, issues: list[Issue]) -> None:
+    """
+    Test an incremental export exports all issues again once the change log has
+    expired since the previous export, as deletions could be missed.
+    """
+    call_command("export_issues", str(tmp_path), stdout=io.StringIO())
+    issues[0].delete()
+    IssueChange.expire(timezone.now() + timedelta(days=1))
+
+    call_command("export_issues", str(tmp_path), "--incremental", stdout=io.StringIO())
+
+    checkpoint = exports.load_checkpoint(tmp_path)
+    assert checkpoint is not None and (checkpoint.since, checkpoint.exported) == (0, 9)
@@ -0,0 +1,106 @@
+import typing
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from .. import search
+from ..fields import compress, decompress
+from ..models import Issue
+
+# A description resembling a pasted log.
+LOG = "".join(
+    f"2022-11-18 10:{i % 60:02}:00 ERROR worker-{i % 7} crashed: timeout\n" for i in range(500)
+)
+
+
+def stored_type(issue: Issue) -> str:
+    """Returns SQLite type of the stored description of an issue."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT typeof(description) FROM issues_issue WHERE id = %s", [issue.pk])
+        row = cursor.fetchone()
+        assert row is not None
+        return str(row[0])
+
+
+@pytest.mark.parametrize(
+    "text,min_size,compressed",
+    [
+        ("short", 100, False),
+        (LOG, 100, True),
+        (LOG, None, False),
+        (LOG, len(LOG) + 1, False),
+        # Texts not made smaller by compression are kept as they are.
+        ("short", 1, False),
+    ],
+)
+def test_compress(text: str, min_size: int | None, compressed: bool) -> None:
+    """
+    Test texts of at least `min_size` bytes are compressed if it makes them smaller.
+    """
+    value = compress(text, min_size)
+    assert isinstance(value, bytes) == compressed
+    assert decompress(value) == text
+
+
+@pytest.mark.django_db
+def test_large_description_is_stored_compressed(
+    client: typing.Any, settings: typing.Any, create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test large descriptions are stored compressed and read as text.
+    """
+    settings.ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE = 1000
+    small, large = create_issue(Issue.State.OPEN, "Small"), create_issue(Issue.State.OPEN, "Large")
+    large.description = LOG
+    large.save()
+    Issue.objects.create_many(
+        [
+            Issue(
+                title="Bulk",
+                description=LOG,
+                submitter=small.submitter,
+                assignee=small.assignee,
+                category=small.category,
+            )
+        ]
+    )
+
+    assert stored_type(small) == "text"
+    assert stored_type(large) == "blob"
+    assert Issue.objects.get(pk=large.pk).description == LOG
+    assert list(
+        Issue.objects.filter(title__in=["Large", "Bulk"]).values_list("description", flat=True)
+    ) == [LOG, LOG]
+    response = client.get(reverse("issue", args=[large.pk]))
+    assert response.json()["description"] == LOG
+
+    search.rebuild_index()
+    assert search.search("worker timeout", limit=10) == [large.pk, large.pk + 1]
+
+
+@pytest.mark.django_db
+def test_compress_descriptions_command(
+    settings: typing.Any, create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test stored descriptions are rewritten according to changed settings, keeping issues
+    unchanged.
+    """
+    settings.ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE = None
+    issue = create_issue(Issue.State.OPEN)
+    issue.description = LOG
+    issue.save()
+    assert stored_type(issue) == "text"
+
+    settings.ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE = 1000
+    call_command("compress_descriptions")
+    assert stored_type(issue) == "blob"
+
+    settings.ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE = None
+    call_command("compress_descriptions")
+    assert stored_type(issue) == "text"
+
+    stored = Issue.objects.get(pk=issue.pk)
+    assert (stored.description, stored.revision) == (LOG, issue.revision)
@@ -0,0 +1,101 @@
+import math
+import random
+import typing
+
+import pytest
+from django.urls import reverse
+
+from .. import histogram
+from ..models import Category, Issue, ResolutionBucket
+
+
+def exact_percentile(values: list[int], quantile: float) -> int:
+    """Returns the percentile of values of the same rank as `histogram.percentiles()`."""
+    return sorted(values)[math.floor(quantile * (len(values) - 1))]
+
+
+def sample(seed: int) -> list[int]:
+    """Returns durations spread over many orders of magnitude."""
+    rng = random.Random(seed)
+    return [int(rng.lognormvariate(10, 3)) for _ in range(1000)]
+
+
+@pytest.mark.parametrize("values", [[0, 0, 1, 2, 3], list(range(1000)), sample(1), sample(2)])
+def test_percentiles_are_within_relative_accuracy(values: list[int]) -> None:
+    """
+    Tests percentiles estimated from buckets are within the relative accuracy.
+    """
+    counts: dict[int, int] = {}
+    for value in values:
+        bucket = histogram.bucket_of(value)
+        counts[bucket] = counts.get(bucket, 0) + 1
+
+    quantiles = (0.0, 0.25, 0.5, 0.9, 0.99, 1.0)
+    estimates = histogram.percentiles(sorted(counts.items()), quantiles)
+
+    for quantile in quantiles:
+        exact = exact_percentile(values, quantile)
+        estimate = estimates[quantile]
+        assert estimate is not None
+        assert abs(estimate - exact) <= histogram.RELATIVE_ACCURACY * exact
+
+
+def test_percentiles_of_no_values_are_none() -> None:
+    """
+    Tests percentiles of an empty histogram are unknown.
+    """
+    assert histogram.percentiles([], (0.5,)) == {0.5: None}
+
+
+@pytest.mark.django_db
+def test_histograms_follow_closed_issues(
+    create_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Tests histograms are counted by category as issues are closed and reopened.
+    """
+    issue = create_issue(state=Issue.State.OPEN, title="First")
+    create_issue(state=Issue.State.CLOSED, title="Second")
+    assert sum(ResolutionBucket.counts().values()) == 1
+
+    issue.state = Issue.State.CLOSED
+    issue.save()
+    counts = ResolutionBucket.counts()
+    assert counts[(issue.category_id, histogram.bucket_of(issue.resolution_duration))] == 1
+    assert sum(counts.values()) == 2
+
+    issue.state = Issue.State.OPEN
+    issue.save()
+    assert ResolutionBucket.counts() == ResolutionBucket.compute()
+    assert sum(ResolutionBucket.counts().values()) == 1
+
+
+@pytest.mark.django_db
+def test_resolution_endpoint(
+    client: typing.Any, create_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Tests the endpoint reports percentiles overall and by category.
+    """
+    response = client.get(reverse("issues-resolution"))
+    assert response.json() == {
+        "count": 0,
+        "percentiles": {"p50": None, "p90": None, "p99": None},
+        "categories": {},
+    }
+
+    issue = create_issue(state=Issue.State.OPEN, title="First")
+    issue.state = Issue.State.CLOSED
+    issue.save()
+    create_issue(state=Issue.State.CLOSED, title="Second")
+    Category.objects.create(name="Empty")
+
+    data = client.get(reverse("issues-resolution")).json()
+
+    assert data["count"] == 2
+    assert data["percentiles"] == {"p50": 0, "p90": 0, "p99": 0}
+    first = data["categories"][issue.category.name]
+    assert first["count"] == 1
+    for value in first["percentiles"].values():
+        assert abs(value - issue.resolution_duration) <= 0.01 * issue.resolution_duration
+    assert "Empty" not in data["categories"]
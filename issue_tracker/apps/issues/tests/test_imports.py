@@ -0,0 +1,151 @@
+import csv
+import gzip
+import io
+import json
+import typing
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from .. import search
+from ..models import DailyStats, Issue, IssueRevision, IssueStats, ResolutionBucket
+
+RECORDS = [
+    {
+        "title": "Crash on start",
+        "description": "The app crashes.",
+        "submitter": "alice",
+        "assignee": "bob",
+        "category": "Bugs",
+        "state": "Closed",
+        "opened_at": "2022-11-18T10:00:00+00:00",
+        "closed_at": "2022-11-18T11:30:00.500000+00:00",
+    },
+    {
+        "title": "Slow search",
+        "description": "",
+        "submitter": "bob",
+        "assignee": "alice",
+        "category": "Performance",
+        "state": "OPN",
+        "opened_at": "2022-11-19T08:00:00Z",
+    },
+    {
+        "title": "Broken layout",
+        "submitter": "alice",
+        "assignee": "alice",
+        "category": "Bugs",
+        "state": "closed",
+        "opened_at": "2022-11-20T08:00:00",
+    },
+]
+
+
+def write_ndjson(path: Path, records: list[dict[str, str]]) -> Path:
+    """Writes records as NDJSON lines."""
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return path
+
+
+def index_names() -> set[str]:
+    """Returns names of indexes of the issues table."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'issues_issue'"
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+@pytest.mark.django_db
+def test_import_ndjson(tmp_path: Path) -> None:
+    """
+    Test issues are imported with users and categories created, derived columns
+    computed and statistics and the search index kept up to date.
+    """
+    revision, _ = IssueRevision.current()
+    out = io.StringIO()
+
+    call_command(
+        "import_issues", str(write_ndjson(tmp_path / "issues.ndjson", RECORDS)),
+        "--create-missing", stdout=out,
+    )  # fmt: skip
+
+    assert "Imported 3 issues" in out.getvalue()
+    issues = list(Issue.objects.order_by("id"))
+    assert [(issue.title, issue.state, issue.previous_state) for issue in issues] == [
+        ("Crash on start", Issue.State.CLOSED, Issue.State.CLOSED),
+        ("Slow search", Issue.State.OPEN, Issue.State.OPEN),
+        ("Broken layout", Issue.State.CLOSED, Issue.State.CLOSED),
+    ]
+    assert (str(issues[0].submitter), str(issues[0].assignee)) == ("alice", "bob")
+    assert issues[0].category.name == "Bugs"
+    assert issues[0].closed_at == datetime(2022, 11, 18, 11, 30, 0, 500000, tzinfo=timezone.utc)
+    assert issues[1].opened_at == datetime(2022, 11, 19, 8, tzinfo=timezone.utc)
+    assert [issue.resolution_duration for issue in issues] == [5400, 0, 0]
+    assert issues[2].closed_at == issues[2].opened_at
+    assert {issue.revision for issue in issues} == {revision + 1}
+
+    assert not IssueStats.current().differences(IssueStats.compute())
+    assert ResolutionBucket.counts() == ResolutionBucket.compute()
+    assert DailyStats.counts() == DailyStats.compute()
+    assert search.search("crashes", 10) == [issues[0].pk]
+
+
+@pytest.mark.django_db
+def test_import_gzipped_csv_by_transactions(tmp_path: Path, django_user_model: typing.Any) -> None:
+    """
+    Test gzipped CSV is imported by many transactions, with the submitter given by
+    the command for records without one, and indexes built once all issues are
+    written.
+    """
+    django_user_model.objects.create_user(username="alice")
+    path = tmp_path / "issues.csv.gz"
+    with gzip.open(path, "wt", newline="") as stream:
+        writer = csv.DictWriter(stream, ["title", "assignee", "category", "state"])
+        writer.writeheader()
+        writer.writerows(
+            {"title": f"Issue {i}", "assignee": "alice", "category": "Bugs", "state": "Open"}
+            for i in range(7)
+        )
+    indexes = index_names()
+    out = io.StringIO()
+
+    call_command(
+        "import_issues", str(path), "--batch-size", "2", "--transaction-size", "3",
+        "--submitter", "alice", "--create-missing", "--defer-indexes", stdout=out,
+    )  # fmt: skip
+
+    assert out.getvalue().count("issues/s") == 3  # 2 transactions and the summary
+    assert Issue.objects.filter(submitter__username="alice").count() == 7
+    assert len(set(Issue.objects.values_list("revision", flat=True))) == 2
+    assert index_names() == indexes
+    assert len(search.search("issue", 10)) == 7
+
+
+@pytest.mark.django_db
+def test_invalid_record_is_reported(tmp_path: Path, django_user_model: typing.Any) -> None:
+    """
+    Test unknown names (without `--create-missing`) and invalid values are reported
+    with the number of the record, leaving its transaction not imported.
+    """
+    for name in ("alice", "bob"):
+        django_user_model.objects.create_user(username=name)
+    path = write_ndjson(tmp_path / "issues.ndjson", RECORDS)
+
+    with pytest.raises(CommandError, match="Record 1: Unknown user or category 'Bugs'"):
+        call_command("import_issues", str(path))
+
+    invalid = [{**RECORDS[0], "opened_at": "yesterday"}]
+    path = write_ndjson(tmp_path / "invalid.ndjson", invalid)
+    with pytest.raises(CommandError, match="Record 1: Invalid datetime 'yesterday'"):
+        call_command("import_issues", str(path), "--create-missing")
+
+    invalid = [{**RECORDS[0], "closed_at": "2022-11-18T09:00:00+00:00"}]
+    path = write_ndjson(tmp_path / "invalid.ndjson", invalid)
+    with pytest.raises(CommandError, match="Record 1: Issue cannot be closed before it was"):
+        call_command("import_issues", str(path), "--create-missing")
+
+    assert not Issue.objects.exists()
@@ -0,0 +1,147 @@
+import typing
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from ..labels import LabelCache, category_labels, user_labels
+from ..models import Issue, IssueChange
+
+
+class CountingLoader:
+    """
+    Loads labels of objects whose primary keys are given, remembering the loads.
+    """
+
+    def __init__(self) -> None:
+        self.loads: list[set[int]] = []
+
+    def __call__(self, pks: set[int]) -> dict[int, str]:
+        self.loads.append(pks)
+        return {pk: f"label{pk}" for pk in pks}
+
+
+def test_labels_are_loaded_once() -> None:
+    """
+    Test only labels missing in the cache are loaded, by a single load.
+    """
+    loader = CountingLoader()
+    cache = LabelCache(loader)
+
+    assert cache.get_many([1, 2]) == {1: "label1", 2: "label2"}
+    assert cache.get_many([1, 2, 3]) == {1: "label1", 2: "label2", 3: "label3"}
+    assert cache.get(3) == "label3"
+    assert async_to_sync(cache.aget_many)([3, 4]) == {3: "label3", 4: "label4"}
+    assert loader.loads == [{1, 2}, {3}, {4}]
+
+
+def test_least_recently_used_labels_are_evicted(settings: typing.Any) -> None:
+    """
+    Test the cache holds at most `ISSUES_LABELS_MAX_SIZE` labels.
+    """
+    settings.ISSUES_LABELS_MAX_SIZE = 2
+    loader = CountingLoader()
+    cache = LabelCache(loader)
+
+    cache.get_many([1, 2])
+    cache.get(1)
+    cache.get(3)
+
+    assert len(cache) == 2
+    assert cache.get_many([1, 3]) == {1: "label1", 3: "label3"}
+    assert loader.loads == [{1, 2}, {3}]
+
+
+def test_expired_labels_are_reloaded(settings: typing.Any, mocker: typing.Any) -> None:
+    """
+    Test labels older than `ISSUES_LABELS_TIMEOUT` are loaded again.
+    """
+    settings.ISSUES_LABELS_TIMEOUT = 60
+    monotonic = mocker.patch("time.monotonic", return_value=1000.0)
+    loader = CountingLoader()
+    cache = LabelCache(loader)
+
+    cache.get(1)
+    monotonic.return_value = 1060.0
+    cache.get(1)
+    monotonic.return_value = 1061.0
+    cache.get(1)
+
+    assert loader.loads == [{1}, {1}]
+
+
+@pytest.mark.django_db
+def test_renamed_objects_are_relabeled(
+    client: typing.Any, create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test renamed categories and users are represented by their new names.
+    """
+    issue = create_issue(Issue.State.OPEN, title="Issue1")
+    assert client.get(reverse("issue", args=[issue.pk])).json()["assignee"] == "Issue1-assignee"
+    revision = Issue.objects.get(pk=issue.pk).revision
+
+    issue.category.name = "Renamed"
+    issue.category.save()
+    assignee: typing.Any = issue.assignee
+    assignee.username = "renamed"
+    assignee.save()
+
+    data = client.get(reverse("issue", args=[issue.pk])).json()
+    assert (data["category"], data["assignee"]) == ("Renamed", "renamed")
+    assert Issue.objects.get(pk=issue.pk).revision > revision
+    assert category_labels.get(issue.category.pk) == "Renamed"
+    assert user_labels.get(issue.assignee.pk) == "renamed"
+
+
+@pytest.mark.django_db
+def test_labels_changed_by_other_processes_are_dropped(
+    client: typing.Any, create_issue: typing.Callable[..., Issue], mocker: typing.Any
+) -> None:
+    """
+    Test labels cached before a change of labels by another process are not served
+    (nor cached) with the new revision of issues, as the change is observed by the
+    validators.
+    """
+    issue = create_issue(Issue.State.OPEN, title="Issue1")
+    etag = client.get(reverse("issues"))["ETag"]
+    client.get(reverse("issue", args=[issue.pk]))
+
+    # The other process doesn't drop labels cached by this one.
+    mocker.patch.object(category_labels, "invalidate")
+    mocker.patch.object(user_labels, "invalidate")
+    issue.category.name = "Renamed"
+    issue.category.save()
+    assert category_labels.get(issue.category.pk) != "Renamed"
+
+    response = client.get(reverse("issues"))
+    assert response["ETag"] != etag
+    assert response.json()["results"][0]["category"] == "Renamed"
+    assert client.get(reverse("issue", args=[issue.pk])).json()["category"] == "Renamed"
+
+    assignee: typing.Any = issue.assignee
+    assignee.username = "renamed"
+    assignee.save()
+
+    assert client.get(reverse("issue", args=[issue.pk])).json()["assignee"] == "renamed"
+    assert client.get(reverse("issues")).json()["results"][0]["assignee"] == "renamed"
+
+
+@pytest.mark.django_db
+def test_user_login_doesnt_change_issues(create_issue: typing.Callable[..., Issue]) -> None:
+    """
+    Test saving fields of users not shown by issues keeps the issues unchanged, whether
+    the fields are chosen or the whole user is saved with the username unchanged.
+    """
+    issue = create_issue(Issue.State.OPEN, title="Issue1")
+    revision = Issue.objects.get(pk=issue.pk).revision
+    changes = IssueChange.objects.count()
+
+    issue.assignee.save(update_fields=["last_login"])
+    assignee: typing.Any = issue.assignee
+    assignee.set_password("changed")
+    assignee.is_active = False
+    assignee.save()
+
+    assert Issue.objects.get(pk=issue.pk).revision == revision
+    assert IssueChange.objects.count() == changes
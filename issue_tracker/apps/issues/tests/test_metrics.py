@@ -0,0 +1,142 @@
+import typing
+from pathlib import Path
+
+import pytest
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..metrics import MappedValues, request_metrics
+from ..models import Issue
+
+
+@pytest.fixture()
+def issues(create_issue: typing.Callable[..., Issue]) -> list[Issue]:
+    """
+    Creates example issues for later testing.
+    """
+    return [create_issue(Issue.State.OPEN, title=f"Issue{i}") for i in range(3)]
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings: typing.Any, tmp_path: Path) -> Path:
+    """
+    Keeps metrics of the test in files of its own directory.
+    """
+    settings.ISSUES_METRICS_DIR = tmp_path
+    settings.ISSUES_METRICS_TOKEN = "secret"
+    settings.ISSUES_CACHE = None
+    return tmp_path
+
+
+def scrape(client: typing.Any) -> dict[str, float]:
+    """Returns samples of `/metrics` by their names with labels, read by the token."""
+    response = client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    lines = response.content.decode().splitlines()
+    return {
+        sample: float(value)
+        for sample, value in (line.rsplit(" ", 1) for line in lines if not line.startswith("#"))
+    }
+
+
+@pytest.mark.django_db
+def test_requests_are_measured(admin_client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test duration, queries, serialization time and response size of requests are
+    recorded by histograms of their views, including the admin.
+    """
+    queries = 0
+    for _ in range(2):
+        # The log of queries is reset by every request.
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            response = admin_client.get(reverse("issues"))
+        queries += len(captured)
+    admin_client.get(reverse("admin:issues_issue_changelist"))
+
+    samples = scrape(admin_client)
+
+    labels = 'view="issues",method="GET"'
+    assert samples[f'issue_tracker_request_duration_seconds_count{{{labels},status="200"}}'] == 2
+    assert samples[f"issue_tracker_request_queries_sum{{{labels}}}"] == queries
+    assert samples[f'issue_tracker_request_queries_bucket{{{labels},le="+Inf"}}'] == 2
+    assert samples[f"issue_tracker_request_sql_duration_seconds_sum{{{labels}}}"] > 0
+    assert samples[f"issue_tracker_request_serialization_duration_seconds_sum{{{labels}}}"] > 0
+    assert samples[f"issue_tracker_response_size_bytes_sum{{{labels}}}"] == 2 * len(
+        response.content
+    )
+
+    admin = 'view="admin:issues_issue_changelist",method="GET"'
+    assert samples[f'issue_tracker_request_duration_seconds_count{{{admin},status="200"}}'] == 1
+    assert samples[f"issue_tracker_request_queries_sum{{{admin}}}"] > 0
+    assert samples[f"issue_tracker_request_serialization_duration_seconds_sum{{{admin}}}"] == 0
+
+
+@pytest.mark.django_db
+def test_streamed_size_is_measured(client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test size of a streamed response is recorded once the response is sent.
+    """
+    response = client.get(reverse("issues"), {"stream": "1"})
+    size = len(b"".join(response.streaming_content))
+
+    samples = scrape(client)
+    assert samples['issue_tracker_response_size_bytes_sum{view="issues",method="GET"}'] == size
+
+
+@pytest.mark.django_db
+def test_processes_are_summed(client: typing.Any, issues: list[Issue], metrics_dir: Path) -> None:
+    """
+    Test metrics are summed over files of all processes, and a file reopened (e.g.
+    by a process reusing the id of an exited one) keeps its values.
+    """
+    client.get(reverse("issue", args=[issues[0].pk]))
+    request_metrics.values()
+
+    key = 'issue_tracker_request_duration_seconds\tview="issue",method="GET",status="200"\t'
+    other = MappedValues(metrics_dir / "1.db", size=64)
+    other.add([(key + "+Inf", 2.0), (key + "sum", 1.5)])
+    other.add(
+        [(f'issue_tracker_request_queries\tview="{i}",method="GET"\tsum', i) for i in range(100)]
+    )
+    MappedValues(metrics_dir / "1.db").add([(key + "+Inf", 1.0)])
+
+    samples = scrape(client)
+
+    labels = 'view="issue",method="GET",status="200"'
+    assert samples[f"issue_tracker_request_duration_seconds_count{{{labels}}}"] == 4
+    assert samples[f'issue_tracker_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 4
+    assert samples[f"issue_tracker_request_duration_seconds_sum{{{labels}}}"] > 1.5
+    assert samples['issue_tracker_request_queries_sum{view="99",method="GET"}'] == 99
+
+
+@pytest.mark.django_db
+def test_metrics_are_restricted(
+    client: typing.Any, admin_client: typing.Any, settings: typing.Any
+) -> None:
+    """
+    Test metrics are served only to staff users and to scrapers with the token.
+    """
+    url = reverse("metrics")
+    assert client.get(url).status_code == 403
+    assert client.get(url, HTTP_AUTHORIZATION="Bearer wrong").status_code == 403
+    assert client.get(url, HTTP_AUTHORIZATION="Bearer secret").status_code == 200
+    assert admin_client.get(url).status_code == 200
+
+    settings.ISSUES_METRICS_TOKEN = None
+    assert client.get(url, HTTP_AUTHORIZATION="Bearer None").status_code == 403
+
+
+@pytest.mark.django_db
+def test_unknown_methods_are_counted_as_other(client: typing.Any, issues: list[Issue]) -> None:
+    """
+    Test methods of requests other than the standard ones share a single series.
+    """
+    for method in ("PROPFIND", "X-ANYTHING"):
+        client.generic(method, reverse("issue", args=[issues[0].pk]))
+
+    samples = scrape(client)
+    labels = 'view="issue",method="other",status="405"'
+    assert samples[f"issue_tracker_request_duration_seconds_count{{{labels}}}"] == 2
+    assert not [sample for sample in samples if "PROPFIND" in sample]
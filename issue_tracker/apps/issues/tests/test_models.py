@@ -1,8 +1,21 @@
 import typing
+from datetime import timedelta
 
 import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
-from ..models import Issue
+from ..models import (
+    DailyStats,
+    Issue,
+    IssueChange,
+    IssueRevision,
+    IssueStats,
+    ResolutionBucket,
+)
 
 
 @pytest.mark.django_db
@@ -80,3 +93,394 @@ def test_close_opened_issue(
 
     assert opened_at_before == issue.opened_at
     assert issue.resolution_duration == 1
+
+
+@pytest.mark.django_db
+def test_save_bumps_revision(
+    create_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Test every save of an issue increases the global revision and marks the issue by it.
+    """
+    issue = create_issue(state=Issue.State.OPEN)
+    revision, _ = IssueRevision.current()
+    assert issue.revision == revision
+    assert issue.updated_at == issue.opened_at
+
+    issue.state = Issue.State.CLOSED
+    issue.save()
+
+    assert issue.revision == revision + 1
+    assert IssueRevision.current() == (revision + 1, issue.updated_at)
+    assert issue.updated_at > issue.opened_at
+
+
+def update_query(context: CaptureQueriesContext) -> str:
+    """
+    Returns the captured UPDATE of issues.
+    """
+    updates = [
+        str(query["sql"]) for query in context if query["sql"].startswith('UPDATE "issues_issue"')
+    ]
+    assert len(updates) == 1, updates
+    return updates[0]
+
+
+@pytest.mark.django_db
+def test_unchanged_issue_is_not_written(
+    create_issue: typing.Callable[..., Issue], django_assert_num_queries: typing.Any
+) -> None:
+    """
+    Test saving an issue without changes writes nothing, whether created or loaded.
+    """
+    issue = create_issue(state=Issue.State.OPEN)
+    loaded = Issue.objects.get(pk=issue.pk)
+
+    with django_assert_num_queries(0):
+        issue.save()
+        loaded.save()
+
+    assert Issue.objects.get(pk=issue.pk).revision == issue.revision
+
+
+@pytest.mark.django_db
+def test_save_updates_only_changed_columns(
+    create_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Test a change of an issue updates only the changed columns and columns derived from
+    them, e.g. not the description.
+    """
+    issue = Issue.objects.get(pk=create_issue(state=Issue.State.OPEN).pk)
+    issue.title = "Changed"
+
+    with CaptureQueriesContext(connection) as context:
+        issue.save()
+
+    sql = update_query(context)
+    assert '"title"' in sql and '"updated_at"' in sql and '"revision"' in sql
+    assert '"description"' not in sql and '"state"' not in sql
+
+    issue.state = Issue.State.CLOSED
+    with CaptureQueriesContext(connection) as context:
+        issue.save()
+
+    sql = update_query(context)
+    for column in ("state", "previous_state", "resolution_duration", "closed_at"):
+        assert f'"{column}"' in sql
+    assert '"title"' not in sql and '"opened_at"' not in sql
+    # Neither title nor description changed, the search index is kept as is.
+    assert not [query for query in context if "issues_issue_search" in query["sql"]]
+
+    stored = Issue.objects.get(pk=issue.pk)
+    assert stored.stats_entry() == issue.stats_entry()
+    assert (stored.title, stored.revision) == ("Changed", issue.revision)
+
+
+@pytest.mark.django_db
+def test_deferred_issue_updates_loaded_columns(create_issue: typing.Callable[..., Issue]) -> None:
+    """
+    Test an issue loaded partially is updated by its changed columns.
+    """
+    issue = create_issue(state=Issue.State.OPEN)
+    partial = Issue.objects.only("id", "title").get(pk=issue.pk)
+    partial.title = "Changed"
+    partial.save()
+
+    stored = Issue.objects.get(pk=issue.pk)
+    assert (stored.title, stored.description) == ("Changed", issue.description)
+    assert stored.revision > issue.revision
+
+
+@pytest.mark.django_db
+def test_explicit_update_fields_write_derived_columns(
+    create_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Test fields chosen by the caller are updated along with the fields derived from
+    them, so the change is logged and statistics match the table.
+    """
+    issue = create_issue(state=Issue.State.OPEN)
+    issue.title = "Changed"
+    issue.save(update_fields=["title"])
+
+    stored = Issue.objects.get(pk=issue.pk)
+    assert (stored.title, stored.revision) == ("Changed", issue.revision)
+    assert stored.updated_at == issue.updated_at
+    assert IssueChange.objects.filter(revision=issue.revision, issue_id=issue.pk).exists()
+
+    issue.state = Issue.State.CLOSED
+    issue.save(update_fields=["state"])
+
+    stored = Issue.objects.get(pk=issue.pk)
+    assert stored.stats_entry() == issue.stats_entry()
+    assert stored.closed_at is not None and stored.previous_state == Issue.State.CLOSED
+    assert stored.revision == issue.revision
+    assert IssueStats.current().differences(IssueStats.compute()) == {}
+    assert DailyStats.counts() == DailyStats.compute()
+
+
+@pytest.mark.django_db
+def test_delete_bumps_revision(create_issue: typing.Callable[..., Issue]) -> None:
+    """
+    Test deleting an issue increases the global revision.
+    """
+    issue = create_issue(state=Issue.State.OPEN)
+    revision, _ = IssueRevision.current()
+
+    issue.delete()
+
+    assert IssueRevision.current()[0] == revision + 1
+
+
+@pytest.mark.django_db
+def test_category_rename_bumps_revision_of_its_issues(
+    create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test renaming a category marks its issues as changed.
+    """
+    issue = create_issue(state=Issue.State.OPEN)
+    other = create_issue(state=Issue.State.OPEN, title="Other")
+
+    issue.category.name = "renamed"
+    issue.category.save()
+
+    revision, _ = IssueRevision.current()
+    issue.refresh_from_db()
+    other.refresh_from_db()
+    assert issue.revision == revision
+    assert other.revision < revision
+
+
+@pytest.mark.django_db
+def test_create_many_opens_issues_like_save(
+    build_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Test issues created at once get the same fields as if created one by one, and
+    count as a single change of issues.
+    """
+    expected = timezone_patcher._now
+    issues = Issue.objects.create_many(
+        [build_issue(Issue.State.OPEN, "Open"), build_issue(Issue.State.CLOSED, "Closed")]
+    )
+
+    revision, _ = IssueRevision.current()
+    for issue in issues:
+        issue.refresh_from_db()
+        assert issue.opened_at == expected
+        assert issue.updated_at == expected
+        assert issue.previous_state == issue.state
+        assert issue.resolution_duration == 0
+        assert issue.revision == revision
+
+
+@pytest.mark.django_db
+def test_create_many_uses_constant_number_of_queries(
+    build_issue: typing.Callable[..., Issue], django_assert_num_queries: typing.Any
+) -> None:
+    """
+    Test creating a batch of issues doesn't cost a query per issue.
+    """
+    issues = [build_issue(Issue.State.OPEN, f"Issue{i}") for i in range(20)]
+
+    # Savepoint, revision update and read, insert, stats update, daily stats upsert,
+    # change log insert, search index delete and insert, release.
+    with django_assert_num_queries(10):
+        Issue.objects.create_many(issues)
+
+    assert Issue.objects.count() == 20
+
+
+@pytest.mark.django_db
+def test_set_state_opens_closed_issues(
+    build_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Test opening closed issues at once changes `opened_at` and doesn't change
+    resolution_duration.
+    """
+    (issue,) = Issue.objects.create_many([build_issue(Issue.State.CLOSED)])
+    opened_at_before = issue.opened_at
+
+    assert Issue.objects.all().set_state(Issue.State.OPEN) == [issue.pk]
+
+    issue.refresh_from_db()
+    assert opened_at_before != issue.opened_at
+    assert issue.resolution_duration == 0
+    assert issue.previous_state == Issue.State.OPEN
+
+
+@pytest.mark.django_db
+def test_set_state_closes_opened_issues(
+    build_issue: typing.Callable[..., Issue], timezone_patcher: typing.Any
+) -> None:
+    """
+    Test closing opened issues at once doesn't change `opened_at` and changes
+    resolution_duration.
+    """
+    (issue,) = Issue.objects.create_many([build_issue(Issue.State.OPEN)])
+    opened_at_before = issue.opened_at
+    revision, _ = IssueRevision.current()
+
+    assert Issue.objects.all().set_state(Issue.State.CLOSED) == [issue.pk]
+
+    issue.refresh_from_db()
+    assert opened_at_before == issue.opened_at
+    assert issue.resolution_duration == 1
+    assert issue.previous_state == Issue.State.CLOSED
+    assert issue.revision == revision + 1
+    assert IssueRevision.current() == (revision + 1, issue.updated_at)
+
+
+@pytest.mark.django_db
+def test_set_state_skips_issues_in_state(create_issue: typing.Callable[..., Issue]) -> None:
+    """
+    Test issues already in the state are left intact.
+    """
+    closed = create_issue(state=Issue.State.CLOSED, title="Closed")
+    opened = create_issue(state=Issue.State.OPEN, title="Opened")
+    revision, _ = IssueRevision.current()
+
+    assert Issue.objects.all().set_state(Issue.State.CLOSED) == [opened.pk]
+    assert Issue.objects.all().set_state(Issue.State.CLOSED) == []
+
+    closed.refresh_from_db()
+    assert closed.revision < revision
+    assert IssueRevision.current()[0] == revision + 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("open_for", [timedelta(seconds=1.7), timedelta(days=3, microseconds=5)])
+@pytest.mark.parametrize("resolution_duration", [0, 42])
+def test_set_state_counts_resolution_like_save(
+    create_issue: typing.Callable[..., Issue],
+    mocker: typing.Any,
+    open_for: timedelta,
+    resolution_duration: int,
+) -> None:
+    """
+    Test resolution duration counted by closing issues at once is the same as when
+    closing them one by one.
+    """
+    saved = create_issue(state=Issue.State.OPEN, title="Saved")
+    bulk = create_issue(state=Issue.State.OPEN, title="Bulk")
+
+    now = timezone.now()
+    Issue.objects.update(opened_at=now - open_for, resolution_duration=resolution_duration)
+    mocker.patch("django.utils.timezone.now", return_value=now)
+
+    saved.refresh_from_db()
+    saved.state = Issue.State.CLOSED
+    saved.save()
+    Issue.objects.filter(pk=bulk.pk).set_state(Issue.State.CLOSED)
+
+    bulk.refresh_from_db()
+    assert bulk.resolution_duration == saved.resolution_duration
+    assert bulk.resolution_duration == resolution_duration + int(open_for.total_seconds())
+
+
+@pytest.mark.django_db
+def test_stats_follow_changes_of_issues(
+    create_issue: typing.Callable[..., Issue],
+    build_issue: typing.Callable[..., Issue],
+    timezone_patcher: typing.Any,
+) -> None:
+    """
+    Test statistics maintained by changes of issues match statistics of the table.
+    """
+
+    def assert_stats(open_count: int, closed_count: int, resolutions: list[int]) -> None:
+        stats = IssueStats.current()
+        assert stats.differences(IssueStats.compute()) == {}
+        assert (stats.open_count, stats.closed_count) == (open_count, closed_count)
+        assert stats.resolution_sum == sum(resolutions)
+        assert stats.resolution_min == min(resolutions, default=None)
+        assert stats.resolution_max == max(resolutions, default=None)
+        assert ResolutionBucket.counts() == ResolutionBucket.compute()
+        assert sum(ResolutionBucket.counts().values()) == closed_count
+        assert DailyStats.counts() == DailyStats.compute()
+
+    first = create_issue(state=Issue.State.OPEN, title="First")
+    second = create_issue(state=Issue.State.OPEN, title="Second")
+    create_issue(state=Issue.State.CLOSED, title="Third")
+    assert_stats(2, 1, [0])
+
+    first.state = Issue.State.CLOSED
+    first.save()
+    second.title = "Renamed"
+    second.save()
+    assert_stats(1, 2, [0, first.resolution_duration])
+
+    first.state = Issue.State.OPEN
+    first.save()
+    assert_stats(2, 1, [0])
+
+    first.state = Issue.State.CLOSED
+    first.save()
+    Issue.objects.filter(title="Third").delete()
+    assert_stats(1, 1, [first.resolution_duration])
+
+    Issue.objects.create_many([build_issue(Issue.State.CLOSED, "Bulk")])
+    Issue.objects.filter(pk=second.pk).set_state(Issue.State.CLOSED)
+    second.refresh_from_db()
+    assert_stats(0, 3, [0, first.resolution_duration, second.resolution_duration])
+
+    Issue.objects.all().set_state(Issue.State.OPEN)
+    assert_stats(3, 0, [])
+
+    first.category.delete()
+    assert_stats(2, 0, [])
+
+
+@pytest.mark.django_db
+def test_stats_command(create_issue: typing.Callable[..., Issue]) -> None:
+    """
+    Test statistics are verified against the table and rebuilt by the command.
+    """
+    create_issue(state=Issue.State.CLOSED)
+    call_command("issue_stats", "verify")
+
+    IssueStats.objects.update(closed_count=5)
+    with pytest.raises(CommandError):
+        call_command("issue_stats", "verify")
+
+    call_command("issue_stats", "rebuild")
+    call_command("issue_stats", "verify")
+    assert IssueStats.current().closed_count == 1
+
+    ResolutionBucket.objects.update(count=3)
+    with pytest.raises(CommandError):
+        call_command("issue_stats", "verify")
+
+    call_command("issue_stats", "rebuild")
+    call_command("issue_stats", "verify")
+
+
+@pytest.mark.django_db
+def test_admin_reads_stats(
+    admin_client: typing.Any, create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test admin changelist shows the maintained statistics.
+    """
+    create_issue(state=Issue.State.OPEN, title="Open")
+    create_issue(state=Issue.State.CLOSED, title="Closed")
+
+    response = admin_client.get(reverse("admin:issues_issue_changelist"))
+
+    assert response.context["stats"] == {
+        "open_issues": 1,
+        "resolved_issues": 1,
+        "fastest_resolution": "0s",
+        "longest_resolution": "0s",
+        "average_resolution": "0s",
+        "resolution_percentiles": {"p50": "0s", "p90": "0s", "p99": "0s"},
+        "category_resolution": {
+            "Closed-category": {
+                "count": 1,
+                "percentiles": {"p50": "0s", "p90": "0s", "p99": "0s"},
+            }
+        },
+    }
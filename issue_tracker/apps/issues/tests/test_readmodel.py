@@ -0,0 +1,198 @@
+import typing
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Category, Issue
+from ..readmodel import open_issues
+
+# Filters and orderings of open issues compared between memory and the database.
+QUERIES: list[dict[str, str]] = [
+    {},
+    {"ordering": "-opened_at"},
+    {"ordering": "updated_at"},
+    {"ordering": "-updated_at"},
+    {"assignee": "Issue1-assignee"},
+    {"category": "Issue2-category"},
+    {"category": "unknown"},
+    {"opened_after": "2022-11-18T00:00:20+00:00", "opened_before": "2022-11-18T00:02:00+00:00"},
+    {"opened_after": "2022-11-18T00:00:20+00:00", "ordering": "-opened_at"},
+    {"opened_before": "2022-11-18T00:02:00+00:00", "ordering": "-updated_at"},
+    {"assignee": "Issue0-assignee", "category": "Issue0-category"},
+    {"assignee": "Issue2-assignee", "category": "Issue1-category", "ordering": "-updated_at"},
+    {"category": "Issue0-category", "opened_after": "2022-11-18T00:00:10+00:00"},
+    {"assignee": "unknown"},
+    {"fields": "id,title", "expand": "category,assignee"},
+]
+
+
+@pytest.fixture()
+def many_issues(
+    timezone_patcher: typing.Any, create_issue: typing.Callable[..., Issue]
+) -> list[Issue]:
+    """
+    Creates open and closed issues of a few assignees and categories.
+    """
+    issues = [create_issue(Issue.State.OPEN, title=f"Issue{i}") for i in range(3)]
+    issues[1].state = Issue.State.CLOSED
+    issues[1].save()
+    issues.extend(
+        Issue.objects.create_many(
+            [
+                Issue(
+                    title=f"Bulk{i}",
+                    description="Test description",
+                    submitter=issues[i % 3].submitter,
+                    assignee=issues[i % 3].assignee,
+                    category=issues[i % 2].category,
+                    state=Issue.State.CLOSED if i % 4 == 0 else Issue.State.OPEN,
+                )
+                for i in range(12)
+            ]
+        )
+    )
+    return issues
+
+
+def read_pages(client: typing.Any, params: dict[str, str]) -> list[list[typing.Any]]:
+    """
+    Returns all pages of open issues, following `next` links, and the last page again
+    by its `previous` link.
+    """
+    url: str | None = reverse("issues")
+    response = client.get(url, {**params, "state": "open", "page_size": 4}).json()
+    pages = [response["results"]]
+    while response["next"] is not None:
+        response = client.get(response["next"]).json()
+        pages.append(response["results"])
+
+    if response["previous"] is not None:
+        pages.append(client.get(response["previous"]).json()["results"])
+
+    return pages
+
+
+def assert_consistent(client: typing.Any, settings: typing.Any) -> None:
+    """
+    Asserts open issues served from memory are the same as read from the database.
+    """
+    settings.ISSUES_CACHE = None
+    open_ids = set(Issue.objects.filter(state=Issue.State.OPEN).values_list("id", flat=True))
+
+    for params in QUERIES:
+        settings.ISSUES_READ_MODEL = True
+        from_memory = read_pages(client, params)
+        settings.ISSUES_READ_MODEL = False
+        assert from_memory == read_pages(client, params), params
+
+    assert len(open_issues) == len(open_ids)
+    assert all(iid in open_issues for iid in open_ids)
+
+
+@pytest.mark.django_db
+def test_read_model_follows_changes(
+    client: typing.Any, settings: typing.Any, timezone_patcher: typing.Any, many_issues: list[Issue]
+) -> None:
+    """
+    Test open issues served from memory match the database after every kind of change.
+    """
+    assert_consistent(client, settings)
+
+    many_issues[0].title = "Renamed"
+    many_issues[0].save()
+    assert_consistent(client, settings)
+
+    many_issues[2].state = Issue.State.CLOSED
+    many_issues[2].save()
+    assert_consistent(client, settings)
+
+    timezone_patcher.advance(timedelta(minutes=1))
+    many_issues[1].state = Issue.State.OPEN
+    many_issues[1].save()
+    assert_consistent(client, settings)
+
+    Issue.objects.filter(title__in=["Bulk1", "Bulk4"]).set_state(Issue.State.OPEN)
+    Issue.objects.filter(title__in=["Bulk2", "Bulk3"]).set_state(Issue.State.CLOSED)
+    assert_consistent(client, settings)
+
+    Issue.objects.get(title="Bulk5").delete()
+    Issue.objects.get(title="Bulk8").delete()
+    assert_consistent(client, settings)
+
+    Category.objects.filter(name="Issue2-category").delete()
+    assert_consistent(client, settings)
+
+
+@pytest.mark.django_db
+def test_refresh_fetches_only_changed_issues(
+    client: typing.Any, settings: typing.Any, many_issues: list[Issue]
+) -> None:
+    """
+    Test the read model is loaded once and then only changed issues are fetched, by
+    the index of revisions.
+    """
+    settings.ISSUES_CACHE = None
+    client.get(reverse("issues"), {"state": "open"})
+    revision = open_issues.revision
+
+    with CaptureQueriesContext(connection) as context:
+        client.get(reverse("issues"), {"state": "open"})
+
+    # Only the revision of issues is read.
+    assert len(context) == 1
+
+    many_issues[0].title = "Changed"
+    many_issues[0].save()
+    with CaptureQueriesContext(connection) as context:
+        client.get(reverse("issues"), {"state": "open"})
+
+    issue_queries = [query["sql"] for query in context if '"issues_issue"' in query["sql"]]
+    assert len(issue_queries) == 1
+    assert f'"revision" > {revision}' in issue_queries[0]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {issue_queries[0]}")
+        assert "issue_revision_idx" in str(cursor.fetchall())
+
+
+@pytest.mark.django_db
+def test_memory_usage(client: typing.Any, many_issues: list[Issue]) -> None:
+    """
+    Test the memory of held issues is reported.
+    """
+    client.get(reverse("issues"), {"state": "open"})
+
+    usage = open_issues.memory_usage()
+    assert usage["issues"] == Issue.objects.filter(state=Issue.State.OPEN).count()
+    assert 0 < usage["bytes_per_issue"] < 1000
+
+
+@pytest.mark.django_db
+def test_filtered_pages_need_no_queries(
+    client: typing.Any, settings: typing.Any, many_issues: list[Issue]
+) -> None:
+    """
+    Test names of assignees and categories of filters are looked up once per revision,
+    and changed issues are fetched once for all filters.
+    """
+    settings.ISSUES_CACHE = None
+    settings.ISSUES_READ_MODEL = True
+    params = {"state": "open", "assignee": "Issue0-assignee", "category": "Issue0-category"}
+    client.get(reverse("issues"), params)
+
+    with CaptureQueriesContext(connection) as context:
+        client.get(reverse("issues"), {**params, "ordering": "-updated_at"})
+
+    # Only the revision of issues is read.
+    assert len(context) == 1
+
+    many_issues[0].title = "Changed"
+    many_issues[0].save()
+    client.get(reverse("issues"), params)
+    with CaptureQueriesContext(connection) as context:
+        results = client.get(reverse("issues"), params).json()["results"]
+
+    assert len(context) == 1
+    assert "Changed" in [issue["title"] for issue in results]
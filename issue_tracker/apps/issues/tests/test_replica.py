@@ -0,0 +1,170 @@
+import sqlite3
+import typing
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import replica
+from ..models import Issue, IssueRevision
+
+
+@pytest.fixture()
+def file_connections(tmp_path: Path) -> typing.Generator[list[DatabaseWrapper], None, None]:
+    """
+    Opens connections to two SQLite databases in files.
+    """
+    opened = []
+    for name in ("primary", "replica"):
+        settings_dict: typing.Any = {**connections["default"].settings_dict}
+        settings_dict["NAME"] = tmp_path / f"{name}.sqlite3"
+        opened.append(DatabaseWrapper(settings_dict, alias=name))
+    yield opened
+    for connection in opened:
+        connection.close()
+
+
+def test_router_reads_issues_from_replica(mocker: typing.Any) -> None:
+    """
+    Test only models of the issues app are read from the replica, and only inside
+    `reading_from()`, writes always go to the primary.
+    """
+    mocker.patch.object(replica, "replica_alias", return_value="replica")
+    router = replica.ReplicaRouter()
+
+    assert router.db_for_read(Issue) == "default"
+    with replica.reading_from("replica"):
+        assert router.db_for_read(Issue) == "replica"
+        assert router.db_for_read(get_user_model()) == "default"
+        assert router.db_for_write(Issue, instance=Issue()) == "default"
+
+    assert router.allow_migrate("replica", "issues") is False
+    assert router.allow_migrate("default", "issues") is None
+
+
+@pytest.mark.django_db
+def test_client_reads_own_writes(
+    client: typing.Any,
+    settings: typing.Any,
+    mocker: typing.Any,
+    django_user_model: typing.Any,
+    create_issue: typing.Callable[..., Issue],
+) -> None:
+    """
+    Test a client is served by the primary after a write until the replica catches up
+    with the write (the default database stands for the replica here).
+    """
+    settings.ISSUES_READ_REPLICA = "default"
+    issue = create_issue(Issue.State.OPEN, title="Issue1")
+    client.force_login(django_user_model.objects.create_superuser(username="admin"))
+
+    response = client.post(
+        reverse("issues-bulk-state"),
+        {"ids": [issue.pk], "state": "Closed"},
+        content_type="application/json",
+    )
+    written = int(response.cookies[replica.REVISION_COOKIE].value)
+    assert written == IssueRevision.current()[0]
+
+    factory = RequestFactory()
+    factory.cookies[replica.REVISION_COOKIE] = str(written)
+    assert replica.replica_for(factory.get("/")) == "default"
+    factory.cookies[replica.REVISION_COOKIE] = str(written + 1)
+    assert replica.replica_for(factory.get("/")) is None
+
+    replica_for = mocker.spy(replica, "replica_for")
+    assert client.get(reverse("issue", args=[issue.pk])).json()["state"] == "Closed"
+    assert replica_for.spy_return == "default"
+    assert replica.REVISION_COOKIE not in client.get(reverse("issues")).cookies
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+def test_lagging_replica(
+    client: typing.Any,
+    settings: typing.Any,
+    django_user_model: typing.Any,
+    create_issue: typing.Callable[..., Issue],
+) -> None:
+    """
+    Test other clients read issues from a replica lagging behind the primary, while
+    the writer reads its write from the primary until the replica is copied again.
+    Clients which haven't written anything newer than the replica cost no query of it.
+    """
+    settings.ISSUES_READ_REPLICA = "replica"
+    issue = create_issue(Issue.State.OPEN, title="Issue1")
+    replica.copy_database(connections["default"], connections["replica"])
+    client.force_login(django_user_model.objects.create_superuser(username="admin"))
+    other = Client()
+    url = reverse("issue", args=[issue.pk])
+    assert other.get(url).json()["state"] == "Open"
+
+    client.post(
+        reverse("issues-bulk-state"),
+        {"ids": [issue.pk], "state": "Closed"},
+        content_type="application/json",
+    )
+
+    with CaptureQueriesContext(connections["replica"]) as replica_queries:
+        assert other.get(url).json()["state"] == "Open"
+    assert not [sql for sql in replica_queries if '"issues_issuerevision"."value"' in sql["sql"]]
+    assert client.get(url).json()["state"] == "Closed"
+
+    replica.copy_database(connections["default"], connections["replica"])
+    assert other.get(url).json()["state"] == "Closed"
+    with CaptureQueriesContext(connections["default"]) as primary_queries:
+        assert client.get(url).json()["state"] == "Closed"
+    assert not [query for query in primary_queries if "issues_issue" in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_replica_is_disabled(
+    client: typing.Any, django_user_model: typing.Any, create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test everything is read from the primary unless `ISSUES_READ_REPLICA` is set.
+    """
+    issue = create_issue(Issue.State.OPEN, title="Issue1")
+    client.force_login(django_user_model.objects.create_superuser(username="admin"))
+
+    response = client.post(
+        reverse("issues-bulk-state"),
+        {"ids": [issue.pk], "state": "Closed"},
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert replica.replica_for(RequestFactory().get("/")) is None
+    assert replica.REVISION_COOKIE not in response.cookies
+
+
+@pytest.mark.django_db
+def test_copy_database(file_connections: list[DatabaseWrapper]) -> None:
+    """
+    Test the replica is a copy of the primary and writes of other connections to the
+    primary are told by its data version.
+    """
+    primary, copy = file_connections
+    with primary.cursor() as cursor:
+        cursor.execute("CREATE TABLE items (name TEXT)")
+        cursor.execute("INSERT INTO items VALUES ('first')")
+
+    replica.copy_database(primary, copy)
+    version = replica.data_version(primary)
+    with copy.cursor() as cursor:
+        cursor.execute("SELECT name FROM items")
+        assert cursor.fetchall() == [("first",)]
+
+    with sqlite3.connect(primary.settings_dict["NAME"]) as writer:
+        writer.execute("INSERT INTO items VALUES ('second')")
+    writer.close()
+    assert replica.data_version(primary) != version
+
+    replica.copy_database(primary, copy)
+    with copy.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM items")
+        assert cursor.fetchone() == (2,)
@@ -0,0 +1,107 @@
+import typing
+
+import pytest
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from .. import search
+from ..models import Issue
+
+
+@pytest.fixture()
+def issues(create_issue: typing.Callable[..., Issue]) -> list[Issue]:
+    """
+    Creates issues mentioning crashes in title or in description.
+    """
+    examples = [
+        create_issue(Issue.State.OPEN, title="Slow start"),
+        create_issue(Issue.State.OPEN, title="Crash on login"),
+        create_issue(Issue.State.OPEN, title="Broken layout"),
+    ]
+    examples[0].description = "The app crashes sometimes while starting."
+    examples[0].save()
+    return examples
+
+
+def search_titles(client: typing.Any, text: str) -> list[str]:
+    """Returns titles of issues found by the search endpoint."""
+    response = client.get(reverse("issues-search"), {"q": text})
+    assert response.status_code == 200, response.content
+    return [issue["title"] for issue in response.json()["results"]]
+
+
+@pytest.mark.django_db
+class TestSearchEndpoint:
+    def test_ranks_title_matches_first(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests matching issues are found by word stems and ranked with title first.
+        """
+        assert search_titles(client, "crashing") == ["Crash on login", "Slow start"]
+
+    def test_requires_all_words(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests only issues containing all words are found.
+        """
+        assert search_titles(client, "crash login") == ["Crash on login"]
+        assert search_titles(client, "crash layout") == []
+
+    def test_query_syntax_is_not_interpreted(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests FTS5 operators in the query are searched as plain words.
+        """
+        assert search_titles(client, 'crash" OR "layout') == []
+        assert search_titles(client, "layout NOT crash") == []
+
+    @pytest.mark.parametrize("text", ["", "  ", "?!"])
+    def test_empty_query(self, client: typing.Any, text: str) -> None:
+        """
+        Tests query without words is rejected.
+        """
+        response = client.get(reverse("issues-search"), {"q": text})
+        assert response.status_code == 400
+
+    def test_limit(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests number of results is limited by the page size.
+        """
+        response = client.get(reverse("issues-search"), {"q": "crash", "page_size": 1})
+        assert [issue["title"] for issue in response.json()["results"]] == ["Crash on login"]
+
+
+@pytest.mark.django_db
+class TestSearchIndex:
+    def test_follows_changes(self, client: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests index is updated when issues are changed and deleted.
+        """
+        issues[2].title = "Crash in layout"
+        issues[2].save()
+        issues[1].delete()
+
+        assert search_titles(client, "crash") == ["Crash in layout", "Slow start"]
+
+    def test_rebuild_command(self, issues: list[Issue]) -> None:
+        """
+        Tests the index is rebuilt from issues by the management command.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.SEARCH_TABLE}")
+
+        assert search.search("crash", limit=10) == []
+        call_command("rebuild_search_index", stdout=None)
+        assert search.search("crash", limit=10) == [issues[1].pk, issues[0].pk]
+
+    def test_admin_search(self, rf: typing.Any, issues: list[Issue]) -> None:
+        """
+        Tests admin searches issues by the full-text index.
+        """
+        model_admin = admin.site._registry[Issue]
+        queryset, may_have_duplicates = model_admin.get_search_results(
+            rf.get("/"), Issue.objects.all(), "crashes"
+        )
+
+        assert not may_have_duplicates
+        assert sorted(issue.title for issue in queryset) == ["Crash on login", "Slow start"]
+        assert "LIKE" not in str(queryset.query)
@@ -0,0 +1,136 @@
+import typing
+
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from ..labels import category_labels, user_labels
+from ..models import Issue
+from ..serializers import Fieldset, IssueListSerializer, IssueSerializer
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("serializer_class", [IssueListSerializer, IssueSerializer])
+def test_values_fast_path_matches_serializer(
+    create_issue: typing.Callable[..., Issue],
+    serializer_class: type[IssueListSerializer],
+) -> None:
+    """
+    Test serializing `values()` rows gives the same result as serializing model instances.
+    """
+    create_issue(Issue.State.OPEN, title="Issue1")
+    create_issue(Issue.State.CLOSED, title="Issue2")
+
+    expected = serializer_class(Issue.objects.all(), many=True).data
+    rows = serializer_class.values_queryset(Issue.objects.all())
+
+    assert serializer_class.serialize_values(rows) == expected
+
+
+@pytest.mark.django_db
+def test_values_fast_path_fetches_related_objects_in_one_query(
+    create_issue: typing.Callable[..., Issue], django_assert_num_queries: typing.Any
+) -> None:
+    """
+    Test the fast path serializes any number of issues using one query, plus one
+    query per model of labels missing in the label caches.
+    """
+    for i in range(5):
+        create_issue(Issue.State.OPEN, title=f"Issue{i}")
+
+    with django_assert_num_queries(3):
+        IssueListSerializer.serialize_values(
+            IssueListSerializer.values_queryset(Issue.objects.all())
+        )
+
+    with django_assert_num_queries(1) as context:
+        IssueListSerializer.serialize_values(
+            IssueListSerializer.values_queryset(Issue.objects.all())
+        )
+
+    assert "JOIN" not in context.captured_queries[0]["sql"]
+
+
+@pytest.mark.parametrize(
+    "params,expected",
+    [
+        ({}, Fieldset(tuple(IssueListSerializer.Meta.fields))),
+        ({"fields": "id, title,state,id"}, Fieldset(("id", "title", "state"))),
+        (
+            {"fields": "id,category", "expand": "category,assignee"},
+            Fieldset(("id", "category", "assignee"), frozenset({"category", "assignee"})),
+        ),
+    ],
+)
+def test_get_fieldset(params: dict[str, str], expected: Fieldset) -> None:
+    """
+    Test requested fields are parsed from query parameters.
+    """
+    assert IssueListSerializer.get_fieldset(params) == expected
+
+
+@pytest.mark.parametrize(
+    "params,errors",
+    [
+        ({"fields": "id,secret"}, {"fields": ["Unknown fields: secret."]}),
+        ({"expand": "title"}, {"expand": ["Fields can't be expanded: title."]}),
+    ],
+)
+def test_get_fieldset_rejects_unknown_fields(
+    params: dict[str, str], errors: dict[str, list[str]]
+) -> None:
+    """
+    Test unknown fields are reported.
+    """
+    with pytest.raises(ValidationError) as error:
+        IssueListSerializer.get_fieldset(params)
+
+    assert error.value.detail == errors
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset_queries_only_needed_columns(
+    create_issue: typing.Callable[..., Issue]
+) -> None:
+    """
+    Test only the requested columns are queried, without joins of related objects.
+    """
+    issue = create_issue(Issue.State.OPEN, title="Issue1")
+    fieldset = IssueListSerializer.get_fieldset({"fields": "id,title,state"})
+    queryset = IssueListSerializer.values_queryset(Issue.objects.all(), fieldset)
+
+    assert "JOIN" not in str(queryset.query)
+    assert "description" not in str(queryset.query)
+    assert IssueListSerializer.serialize_values(queryset, fieldset) == [
+        {"id": issue.pk, "title": "Issue1", "state": "Open"}
+    ]
+
+
+@pytest.mark.django_db
+def test_expanded_fields_are_fetched_in_one_query(
+    create_issue: typing.Callable[..., Issue], django_assert_num_queries: typing.Any
+) -> None:
+    """
+    Test related objects are expanded into nested objects using one query (once their
+    labels are cached).
+    """
+    issues = [create_issue(Issue.State.OPEN, title=f"Issue{i}") for i in range(3)]
+    fieldset = IssueListSerializer.get_fieldset(
+        {"fields": "id", "expand": "category,assignee,submitter"}
+    )
+    category_labels.get_many(issue.category.pk for issue in issues)
+    user_labels.get_many(user.pk for issue in issues for user in (issue.assignee, issue.submitter))
+
+    with django_assert_num_queries(1):
+        data = IssueListSerializer.serialize_values(
+            IssueListSerializer.values_queryset(Issue.objects.all(), fieldset), fieldset
+        )
+
+    assert data == [
+        {
+            "id": issue.pk,
+            "category": {"id": issue.category.pk, "name": issue.category.name},
+            "assignee": {"id": issue.assignee.pk, "username": str(issue.assignee)},
+            "submitter": {"id": issue.submitter.pk, "username": str(issue.submitter)},
+        }
+        for issue in issues
+    ]
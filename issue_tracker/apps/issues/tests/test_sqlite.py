@@ -0,0 +1,82 @@
+import typing
+from pathlib import Path
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from .. import sqlite
+from ..checks import sqlite_pragmas
+
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "normal",
+    "busy_timeout": 2500,
+    "mmap_size": 2**20,
+    "cache_size": -2048,
+    "temp_store": 2,
+}
+
+
+@pytest.fixture()
+def file_connection(tmp_path: Path) -> typing.Generator[DatabaseWrapper, None, None]:
+    """
+    Opens a connection to an SQLite database in a file.
+    """
+    settings_dict: typing.Any = {**connections["default"].settings_dict}
+    settings_dict["NAME"] = tmp_path / "db.sqlite3"
+    connection = DatabaseWrapper(settings_dict, alias="file")
+    yield connection
+    connection.close()
+
+
+@pytest.mark.django_db
+def test_pragmas_are_set_on_new_connections(
+    settings: typing.Any, file_connection: DatabaseWrapper
+) -> None:
+    """
+    Test new connections are set up by the configured pragmas, read back in the form
+    they are configured in.
+    """
+    settings.ISSUES_SQLITE_PRAGMAS = PRAGMAS
+
+    assert sqlite.pragmas_in_effect(file_connection) == {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "busy_timeout": 2500,
+        "mmap_size": 2**20,
+        "cache_size": -2048,
+        "temp_store": "memory",
+    }
+    assert not sqlite.differences(file_connection)
+    assert sqlite.describe(file_connection).endswith("persistent connections: no")
+
+
+@pytest.mark.django_db
+def test_invalid_pragmas_are_refused(
+    settings: typing.Any, file_connection: DatabaseWrapper
+) -> None:
+    """
+    Test pragmas are checked not to inject SQL.
+    """
+    settings.ISSUES_SQLITE_PRAGMAS = {"journal_mode": "wal; DROP TABLE issues_issue"}
+
+    with pytest.raises(ImproperlyConfigured):
+        file_connection.ensure_connection()
+
+
+@pytest.mark.django_db
+def test_check_reports_pragmas_in_effect(settings: typing.Any) -> None:
+    """
+    Test the system check reports the pragmas in effect and warns about the ones not
+    in effect (the test database is in memory, without WAL).
+    """
+    settings.ISSUES_SQLITE_PRAGMAS = {"journal_mode": "wal", "temp_store": "memory"}
+    connections["default"].close()
+
+    messages = sqlite_pragmas(None, databases=["default"])
+
+    assert [message.id for message in messages] == ["issues.I001", "issues.W001"]
+    assert "journal_mode=memory, temp_store=memory" in messages[0].msg
+    assert "journal_mode" in messages[1].msg
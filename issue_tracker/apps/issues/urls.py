@@ -1,8 +1,20 @@
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path("issues/", views.issues_list, name="issues"),
+    path("issues/bulk/", views.issues_bulk_create, name="issues-bulk"),
+    path("issues/bulk/state/", views.issues_bulk_state, name="issues-bulk-state"),
+    path("issues/stats/", views.issues_stats, name="issues-stats"),
+    path("issues/resolution/", views.issues_resolution, name="issues-resolution"),
+    path("issues/search/", views.issues_search, name="issues-search"),
+    path("issues/changes/", views.issues_changes, name="issues-changes"),
     path("issues/<int:iid>/", views.issue_detail, name="issue"),
+    path("metrics", views.metrics, name="metrics"),
+    # Asynchronous variants of the views above, to be served by an ASGI server.
+    path("async/issues/", async_views.issues_list, name="async-issues"),
+    path("async/issues/<int:iid>/", async_views.issue_detail, name="async-issue"),
+    # Also streamed as server-sent events by `changes.ChangeStream` (see `asgi`).
+    path("async/issues/changes/", async_views.issues_changes, name="async-issues-changes"),
 ]
@@ -1,31 +1,360 @@
-from django.http import HttpRequest, HttpResponse, JsonResponse
-from rest_framework.decorators import api_view
+import typing
+
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.http.response import HttpResponseBase
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .models import Issue
-from .serializers import IssueListSerializer, IssueSerializer
+from . import changes, search
+from .cache import issue_cache
+from .conditional import (
+    Validators,
+    conditional,
+    issue_validators,
+    issues_validators,
+    stats_validators,
+)
+from .filters import DailyStatsFilter, IssueFilter
+from .metrics import CONTENT_TYPE, request_metrics
+from .models import DailyStats, Issue, ResolutionBucket
+from .pagination import KeysetPagination
+from .permissions import IsSuperuser, can_read_metrics
+from .readmodel import open_issues
+from .renderers import NDJSONRenderer, chunked, stream_json, stream_ndjson
+from .replica import replica_reads
+from .serializers import (
+    MAX_BULK_SIZE,
+    Fieldset,
+    IssueCreateSerializer,
+    IssueIdsSerializer,
+    IssueListSerializer,
+    IssueSerializer,
+    IssueStateChangeSerializer,
+)
+
+# Number of issues fetched from database and written to client at once when streaming.
+STREAM_CHUNK_SIZE = 2000
+
+
+def cached_response(
+    request: HttpRequest, key: str, compute: typing.Callable[[], typing.Any]
+) -> Response:
+    """
+    Returns response with payload cached under key, computing it on cache miss.
+
+    Cached payload is valid for the revision of issues found by `conditional()`.
+    Whether the payload was cached is reported by the `X-Cache` header.
+    """
+    validators: Validators | None = getattr(request, "validators", None)
+    if validators is None or issue_cache.backend is None:
+        return Response(compute())
+
+    payload, hit = issue_cache.get_or_set(key, validators.revision, compute)
+    return Response(payload, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+def accepts_ndjson(request: Request) -> bool:
+    """Returns True when content negotiation chose NDJSON for the response."""
+    return isinstance(getattr(request, "accepted_renderer", None), NDJSONRenderer)
+
+
+def stream_issues(
+    request: Request, issue_filter: IssueFilter, fieldset: Fieldset
+) -> StreamingHttpResponse:
+    """
+    Streams all (filtered) issues as JSON array or as NDJSON (when accepted by client).
+
+    Issues are fetched by chunks using a database cursor and every chunk is written
+    to client once serialized. Memory used doesn't depend on number of issues.
+    """
+    queryset = issue_filter.filter_queryset(Issue.objects.all())
+    rows = IssueListSerializer.values_queryset(queryset, fieldset).iterator(
+        chunk_size=STREAM_CHUNK_SIZE
+    )
+    chunks = (
+        IssueListSerializer.serialize_values(chunk, fieldset)
+        for chunk in chunked(rows, STREAM_CHUNK_SIZE)
+    )
+
+    if accepts_ndjson(request):
+        return StreamingHttpResponse(stream_ndjson(chunks), content_type=NDJSONRenderer.media_type)
+
+    return StreamingHttpResponse(stream_json(chunks), content_type=JSONRenderer.media_type)
+
+
+def get_issues(ids: list[int], fieldset: Fieldset) -> dict[str, typing.Any]:
+    """
+    Returns issues of the ids in the detailed representation (in order of the ids)
+    and the ids of issues which don't exist (`missing`).
+
+    Issues are fetched by a single query, their related objects are looked up in the
+    labels of categories and users, see `IssueSerializer.values_queryset()`.
+    """
+    rows = IssueSerializer.values_queryset(Issue.objects.filter(id__in=ids), fieldset, extra=["id"])
+    by_id = {row["id"]: row for row in rows}
+    return {
+        "results": IssueSerializer.serialize_values(
+            [by_id[iid] for iid in ids if iid in by_id], fieldset
+        ),
+        "missing": [iid for iid in ids if iid not in by_id],
+    }
+
+
+@replica_reads
+@conditional(issues_validators)
+@api_view(["GET"])
+@renderer_classes([JSONRenderer, BrowsableAPIRenderer, NDJSONRenderer])
+def issues_list(request: Request) -> HttpResponseBase:
+    """
+    List issues one page at a time.
+
+    Pages are ordered by `(opened_at, id)` and linked by opaque `next`/`previous`
+    cursors. The page size can be set using `?page_size=`. Issues can be filtered
+    and ordered by query parameters, see `IssueFilter`.
+
+    The page is fetched by a single query projecting only the serialized columns,
+    see `IssueListSerializer.values_queryset()`. Pages of open issues are served
+    from memory when enabled by `ISSUES_READ_MODEL`, see `readmodel.OpenIssues`.
+    Issues are read from the read replica when enabled, see `replica`.
+    Fields can be selected by `?fields=` and related objects expanded by `?expand=`,
+    see `IssueListSerializer.get_fieldset()`.
+
+    All issues are streamed at once (without pagination) when requested by
+    `?stream=1` or by `Accept: application/x-ndjson`.
+
+    Many issues are fetched at once by their ids by `?ids=` (comma separated, at most
+    `MAX_MULTI_GET_SIZE`), in the same representation as their details, see
+    `get_issues()`.
+
+    Conditional requests (`If-None-Match`, `If-Modified-Since`) are answered by
+    `304 Not Modified` when no issue has changed, without querying issues.
+    Serialized pages are cached until any issue changes.
+    """
+    if "ids" in request.query_params:
+        ids = IssueIdsSerializer.from_query_params(request.query_params)
+        fieldset = IssueSerializer.get_fieldset(request.query_params)
+        return cached_response(
+            request,
+            issue_cache.issues_key(request.build_absolute_uri()),
+            lambda: get_issues(ids, fieldset),
+        )
+
+    issue_filter = IssueFilter.from_query_params(request.query_params)
+    fieldset = IssueListSerializer.get_fieldset(request.query_params)
+
+    if request.query_params.get("stream") in ("1", "true") or accepts_ndjson(request):
+        return stream_issues(request, issue_filter, fieldset)
+
+    def get_page() -> dict[str, typing.Any]:
+        paginator = KeysetPagination(issue_filter.ordering_fields)
+        if open_issues.serves(issue_filter, IssueListSerializer.lookups(fieldset)):
+            validators: Validators | None = getattr(request, "validators", None)
+            revision = validators.revision if validators else None
+            rows = open_issues.paginate(issue_filter, paginator, request, revision)
+            return paginator.get_paginated_data(
+                IssueListSerializer.serialize_values(rows, fieldset)
+            )
+
+        queryset = IssueListSerializer.values_queryset(
+            issue_filter.filter_queryset(Issue.objects.all()),
+            fieldset,
+            extra=paginator.field_names(),
+        )
+        rows = paginator.paginate_queryset(queryset, request)
+        return paginator.get_paginated_data(IssueListSerializer.serialize_values(rows, fieldset))
+
+    return cached_response(request, issue_cache.issues_key(request.build_absolute_uri()), get_page)
+
+
+@replica_reads
+@conditional(issues_validators)
+@api_view(["GET"])
+def issues_search(request: Request) -> HttpResponseBase:
+    """
+    Search issues by words of their title and description (`?q=`).
+
+    Returns issues containing all the words (or words of the same stem), best
+    matches first, ranked by bm25. The number of results can be set using
+    `?page_size=` (there are no further pages). Results are cached until any issue
+    changes.
+    """
+    text = request.query_params.get("q", "")
+    if search.match_expression(text) is None:
+        raise ValidationError({"q": ["Enter words to search for."]})
+
+    fieldset = IssueListSerializer.get_fieldset(request.query_params)
+
+    def get_results() -> dict[str, typing.Any]:
+        ids = search.search(text, limit=KeysetPagination().get_page_size(request))
+        rows = IssueListSerializer.values_queryset(
+            Issue.objects.filter(id__in=ids), fieldset, extra=["id"]
+        )
+        by_id = {row["id"]: row for row in rows}
+        found = [by_id[iid] for iid in ids if iid in by_id]
+        return {"results": IssueListSerializer.serialize_values(found, fieldset)}
+
+    return cached_response(
+        request, issue_cache.issues_key(request.build_absolute_uri()), get_results
+    )
+
+
+@replica_reads
+@api_view(["GET"])
+def issues_changes(request: Request) -> Response:
+    """
+    Changes of issues after a sequence of the change log (`?since=`, 0 for all).
+
+    Returns at most `?page_size=` changes in the order they were made: changed issues
+    by their current representation (fields selected by `?fields=`) and deleted
+    issues by tombstones, along with the sequence to ask for the next changes from
+    (`next`) and whether there are more changes already (`more`). See `changes`.
+
+    Answers `410 Gone` when the changes after the sequence have expired, with the
+    current sequence (`latest`) to continue from once all issues are read again.
+    """
+    since = changes.since_param(request.query_params)
+    fieldset = IssueListSerializer.get_fieldset(request.query_params)
+    try:
+        batch = changes.read_changes(since, KeysetPagination().get_page_size(request), fieldset)
+    except changes.ChangesExpired as err:
+        return Response(err.data, status=err.status_code)
+
+    return Response(batch)
 
 
+@replica_reads
+@conditional(issues_validators)
 @api_view(["GET"])
-def issues_list(request: HttpRequest) -> HttpResponse:
+def issues_resolution(request: Request) -> HttpResponseBase:
     """
-    List all issues.
+    Estimated percentiles (p50/p90/p99) of resolution durations of closed issues in
+    seconds, overall and by category.
+
+    Estimates come from log-bucketed histograms maintained along with changes of
+    issues (see `ResolutionBucket`) and are within 1% of the exact percentiles.
     """
-    issues = Issue.objects.all()
-    serializer = IssueListSerializer(issues, many=True)
-    return Response(serializer.data)
+    return cached_response(request, "issues:resolution", ResolutionBucket.percentiles)
 
 
+@replica_reads
+@conditional(stats_validators)
+@api_view(["GET"])
+def issues_stats(request: Request) -> HttpResponseBase:
+    """
+    Daily statistics of issues: issues opened and closed on every day of a range and
+    estimated median resolution duration (seconds) of the issues closed on the day.
+
+    The range is selected by `?since=`/`?until=` (the last 30 days by default) and
+    statistics can be limited to a category by `?category=`, see `DailyStatsFilter`.
+    Statistics are read from daily rollups maintained along with changes of issues
+    (see `DailyStats`). The ETag covers the resolved range and category, see
+    `conditional.stats_validators()`.
+    """
+    params = DailyStatsFilter.from_query_params(request.query_params).validated_data
+    since, until, category = params["since"], params["until"], params.get("category")
+
+    def get_stats() -> dict[str, typing.Any]:
+        return {
+            "since": since,
+            "until": until,
+            "category": category,
+            "days": DailyStats.series(since, until, category),
+        }
+
+    # Keyed by the resolved range, as the default range moves every day.
+    key = issue_cache.issues_key(f"stats:{since}:{until}:{category or ''}")
+    return cached_response(request, key, get_stats)
+
+
+@replica_reads
+@conditional(issue_validators)
 @api_view(["GET"])
 def issue_detail(request: HttpRequest, iid: int) -> HttpResponse:
     """
-    List all issues.
+    Show details of an issue.
+
+    The issue is fetched by a single query, see `IssueSerializer.values_queryset()`.
+    Fields can be selected by `?fields=` and related objects expanded by `?expand=`.
+
+    Conditional requests are answered by `304 Not Modified` when the issue hasn't
+    changed, without querying the issue and its related objects. Serialized issue
+    is cached until it changes.
     """
+    fieldset = IssueSerializer.get_fieldset(request.GET)
+
+    def get_issue() -> dict[str, typing.Any]:
+        row = IssueSerializer.values_queryset(Issue.objects.filter(id=iid), fieldset).first()
+        if row is None:
+            raise Issue.DoesNotExist()
+
+        return dict(IssueSerializer.serialize_values([row], fieldset)[0])
+
+    key = issue_cache.issue_key(iid, IssueSerializer.fieldset_key(fieldset))
     try:
-        issue = Issue.objects.get(id=iid)
+        return cached_response(request, key, get_issue)
 
     except Issue.DoesNotExist:
         return JsonResponse(data={"error": "Not found."}, status=404)
 
-    serializer = IssueSerializer(issue)
-    return Response(serializer.data)
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def issues_bulk_create(request: Request) -> Response:
+    """
+    Create many issues at once (staff only, as in the admin).
+
+    Expects a list of issues with `title`, `description`, `assignee` (username),
+    `category` (name) and optionally `state`. The submitter is the current user.
+    All the issues are created in a single transaction by a few queries, see
+    `IssueQuerySet.create_many()`. Returns ids of the created issues in order.
+    """
+    if isinstance(request.data, list) and len(request.data) > MAX_BULK_SIZE:
+        raise ValidationError([f"Ensure there are no more than {MAX_BULK_SIZE} issues."])
+
+    serializer = IssueCreateSerializer(data=request.data, many=True, allow_empty=False)
+    serializer.is_valid(raise_exception=True)
+
+    issues = IssueCreateSerializer.build_issues(serializer.validated_data, request.user)
+    created = Issue.objects.create_many(issues)
+    return Response({"ids": [issue.pk for issue in created]}, status=status.HTTP_201_CREATED)
+
+
+@api_view(["POST"])
+@permission_classes([IsSuperuser])
+def issues_bulk_state(request: Request) -> Response:
+    """
+    Move many issues into a state at once (superusers only, as in the admin).
+
+    Expects `ids` of the issues and the `state`. The issues are changed in a single
+    transaction by a few queries, see `IssueQuerySet.set_state()`. Returns ids of
+    the changed issues (issues already in the state and unknown ids are skipped).
+    """
+    serializer = IssueStateChangeSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    ids = serializer.validated_data["ids"]
+    changed = Issue.objects.filter(id__in=ids).set_state(serializer.validated_data["state"])
+    return Response({"ids": changed})
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Metrics of requests of all worker processes in the Prometheus text format, see
+    `metrics`. Served only to staff users and scrapers with the token of the
+    `ISSUES_METRICS_TOKEN` setting, see `permissions.can_read_metrics()`.
+    """
+    if not can_read_metrics(request):
+        return HttpResponseForbidden()
+
+    return HttpResponse(request_metrics.render(), content_type=CONTENT_TYPE)
@@ -13,4 +13,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "issue_tracker.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up. pylint: disable-next=wrong-import-position
+from issue_tracker.apps.issues.changes import ChangeStream  # noqa: E402
+
+# Changes of issues are streamed as server-sent events outside of the Django request
+# handling, see `ChangeStream`.
+application = ChangeStream(django_application, "/async/issues/changes/")
@@ -3,7 +3,7 @@ Common utils.
 """
 
 
-def duration(total_seconds: int | None) -> str:
+def duration(total_seconds: float | None) -> str:
     """
     Returns string representation of duration in seconds.
     """
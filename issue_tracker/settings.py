@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that requests are measured including the other middleware.
+    "issue_tracker.apps.issues.metrics.metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -50,6 +52,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "issue_tracker.apps.issues.replica.read_your_writes_middleware",
 ]
 
 ROOT_URLCONF = "issue_tracker.urls"
@@ -80,10 +83,91 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    # Local read replica for development and testing, a copy of the default database
+    # made by `manage.py sync_replica`, used once enabled by `ISSUES_READ_REPLICA`.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "replica.sqlite3",
+    },
+}
+
+DATABASE_ROUTERS = ["issue_tracker.apps.issues.replica.ReplicaRouter"]
+
+# Alias of the database read-only API views and the admin statistics read issues
+# from (see `issue_tracker.apps.issues.replica`), None reads everything from the
+# default database. Set to "replica" (and run `manage.py sync_replica --interval 1`)
+# to try replicated reads.
+ISSUES_READ_REPLICA = None
+# Seconds clients are served by the default database after a write, unless the
+# replica catches up with the write sooner.
+ISSUES_READ_YOUR_WRITES_WINDOW = 60
+
+
+# Pragmas set on every new SQLite connection (see `issue_tracker.apps.issues.sqlite`).
+# The pragmas in effect are reported by `manage.py check --database default`.
+ISSUES_SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+    "temp_store": "memory",
+}
+
+
+# Django REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "issue_tracker.apps.issues.pagination.KeysetPagination",
+    # Default number of issues per page of `/issues/`. Clients may ask for a different
+    # size using `?page_size=`.
+    "PAGE_SIZE": 100,
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Cache of serialized issues (see `issue_tracker.apps.issues.cache`). The in-process
+    # LRU cache is private to every worker process, use `FileBasedCache` to share it.
+    "issues": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "issues",
+        # Entries are replaced once issues change, they don't need to expire.
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# Alias of the cache used for serialized issues, None disables caching.
+ISSUES_CACHE = "issues"
+
+# In-process cache of category names and usernames shown by issues (see
+# `issue_tracker.apps.issues.labels`): seconds after which labels changed by other
+# processes are picked up (None never), and the number of labels kept (None unbounded).
+ISSUES_LABELS_TIMEOUT = 60
+ISSUES_LABELS_MAX_SIZE = 100000
+
+# Serve pages of open issues from memory of every worker process (see
+# `issue_tracker.apps.issues.readmodel`).
+ISSUES_READ_MODEL = True
+
+# Descriptions of at least this many bytes are stored compressed (see
+# `issue_tracker.apps.issues.fields.CompressedTextField`), None disables compression.
+# Disabled by default, so that existing descriptions stay plain text. To opt in, set
+# e.g. 4096 and rewrite the stored descriptions by `manage.py compress_descriptions`
+# (or before running migration 0011, which then compresses them).
+ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE = None
+
+# Days entries of the change log of issues are kept for by `compact_changes` (see
+# `issue_tracker.apps.issues.changelog.IssueChange`).
+ISSUES_CHANGES_RETENTION_DAYS = 30
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -32,6 +32,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that requests are measured including the other middleware.
+    "issue_tracker.apps.issues.metrics.metrics_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -39,6 +41,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "issue_tracker.apps.issues.replica.read_your_writes_middleware",
 ]
 
 ROOT_URLCONF = "issue_tracker.urls"
@@ -69,10 +72,107 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "database" / "db.sqlite3",
-    }
+        # Workers keep their connections (and the page caches of the connections)
+        # between requests.
+        "CONN_MAX_AGE": None,
+        "CONN_HEALTH_CHECKS": True,
+    },
+}
+
+DATABASE_ROUTERS = ["issue_tracker.apps.issues.replica.ReplicaRouter"]
+
+# Alias of the database read-only API views and the admin statistics read issues
+# from, None reads everything from the default database. The local replica copied by
+# `manage.py sync_replica` rewrites the whole database on every copy, it is meant for
+# development and testing only (see `issue_tracker.apps.issues.replica`).
+ISSUES_READ_REPLICA = None
+# Seconds clients are served by the default database after a write, unless the
+# replica catches up with the write sooner.
+ISSUES_READ_YOUR_WRITES_WINDOW = 60
+
+
+# Performance profile of SQLite connections (see `issue_tracker.apps.issues.sqlite`),
+# set on every new connection. The pragmas in effect are reported by the `migrate`
+# run on start of the container, and by `manage.py check --database default`.
+ISSUES_SQLITE_PRAGMAS = {
+    # Readers don't block the writer and the writer doesn't block readers.
+    "journal_mode": "wal",
+    # Durable on application crashes, commits don't wait for fsync (safe with WAL,
+    # only the latest commits may be lost on power failure).
+    "synchronous": "normal",
+    # Milliseconds a connection waits for the write lock of another one before
+    # failing with "database is locked".
+    "busy_timeout": 5000,
+    # Read the database through memory map of up to 256 MiB, shared by processes.
+    "mmap_size": 256 * 2**20,
+    # Page cache of every connection, in KiB when negative (64 MiB).
+    "cache_size": -64 * 2**10,
+    # Temporary tables and indexes (e.g. of sorting) are kept in memory.
+    "temp_store": "memory",
+}
+
+
+# Django REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "issue_tracker.apps.issues.pagination.KeysetPagination",
+    # Default number of issues per page of `/issues/`. Clients may ask for a different
+    # size using `?page_size=`.
+    "PAGE_SIZE": 100,
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Cache of serialized issues shared by all workers (see `issue_tracker.apps.issues.cache`).
+    "issues": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "database" / "cache",
+        # Entries are replaced once issues change, they don't need to expire.
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 100000},
+    },
+}
+
+# Alias of the cache used for serialized issues, None disables caching.
+ISSUES_CACHE = "issues"
+
+# In-process cache of category names and usernames shown by issues (see
+# `issue_tracker.apps.issues.labels`): seconds after which labels changed by other
+# processes are picked up (None never), and the number of labels kept (None unbounded).
+ISSUES_LABELS_TIMEOUT = 60
+ISSUES_LABELS_MAX_SIZE = 100000
+
+# Serve pages of open issues from memory of every worker process (see
+# `issue_tracker.apps.issues.readmodel`). Opt-in by the `READ_MODEL=1` environment
+# variable, as every worker then holds all open issues.
+ISSUES_READ_MODEL = os.environ.get("READ_MODEL") == "1"
+
+# Descriptions of at least this many bytes are stored compressed (see
+# `issue_tracker.apps.issues.fields.CompressedTextField`), None disables compression.
+# Disabled by default, so that existing descriptions stay plain text. To opt in, set
+# e.g. 4096 and rewrite the stored descriptions by `manage.py compress_descriptions`
+# (or before running migration 0011, which then compresses them).
+ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE = None
+
+# Days entries of the change log of issues are kept for by `compact_changes` (see
+# `issue_tracker.apps.issues.changelog.IssueChange`).
+ISSUES_CHANGES_RETENTION_DAYS = 30
+
+# Directory of files holding metrics of requests of every worker process, summed by
+# `/metrics` (see `issue_tracker.apps.issues.metrics`). Emptied on start of the container.
+ISSUES_METRICS_DIR = Path("/tmp/issue_tracker/metrics")
+# Token of scrapers of `/metrics` (`Authorization: Bearer <token>`), staff users can
+# read metrics without it.
+ISSUES_METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
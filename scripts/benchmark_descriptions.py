@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Benchmark of storing descriptions of issues compressed, on synthetic log-heavy data.
+
+Creates a fresh SQLite database in a temporary directory, loads issues whose
+descriptions are mostly short with some large pasted logs, and reports the size of
+the database file and times of reading issues with and without descriptions:
+
+    $ ./scripts/benchmark_descriptions.py --min-size none
+    $ ./scripts/benchmark_descriptions.py --min-size 4096
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import typing
+from pathlib import Path
+
+
+def synthetic_log(rng: random.Random, lines: int) -> str:
+    """Returns text resembling a pasted application log."""
+    levels = ["DEBUG", "INFO", "WARNING", "ERROR"]
+    return "".join(
+        f"2022-11-18 10:{i // 60 % 60:02}:{i % 60:02}.{rng.randrange(1000):03} "
+        f"{rng.choice(levels)} [worker-{rng.randrange(16)}] request {rng.randrange(10**6)} "
+        f"took {rng.random() * 1000:.1f} ms at /issues/{rng.randrange(10**5)}/\n"
+        for i in range(lines)
+    )
+
+
+def timed(function: typing.Callable[[], typing.Any], repeat: int = 5) -> float:
+    """Returns the best time (ms) of calling function."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def load_issues(args: argparse.Namespace) -> float:
+    """Creates issues of the benchmark, returns time (s) it took."""
+    # pylint: disable=import-outside-toplevel
+    from django.contrib.auth import get_user_model
+
+    from issue_tracker.apps.issues.models import Category, Issue
+
+    rng = random.Random(0)
+    user = get_user_model().objects.create(username="benchmark")
+    category = Category.objects.create(name="benchmark")
+
+    start = time.perf_counter()
+    for offset in range(0, args.issues, 500):
+        Issue.objects.create_many(
+            [
+                Issue(
+                    title=f"Issue {i}",
+                    description=(
+                        synthetic_log(rng, args.log_lines)
+                        if rng.random() < args.log_share
+                        else f"Something is wrong with {i}."
+                    ),
+                    submitter=user,
+                    assignee=user,
+                    category=category,
+                )
+                for i in range(offset, min(offset + 500, args.issues))
+            ]
+        )
+    return time.perf_counter() - start
+
+
+def storage_sizes() -> tuple[int, int]:
+    """Returns sizes (bytes) of the database file and of the issues table."""
+    # pylint: disable=import-outside-toplevel
+    from django.conf import settings
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM")
+        # The search index keeps its own copy of descriptions, not compressed.
+        cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'issues_issue'")
+        (table_size,) = cursor.fetchone() or (0,)
+    return os.path.getsize(settings.DATABASES["default"]["NAME"]), table_size
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--min-size", default="4096", help="Bytes, or 'none' to disable.")
+    parser.add_argument("--issues", type=int, default=2000)
+    parser.add_argument("--log-share", type=float, default=0.1, help="Share of issues with logs.")
+    parser.add_argument("--log-lines", type=int, default=5000)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "issue_tracker.settings")
+
+    # pylint: disable=import-outside-toplevel
+    import django
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = Path(tempfile.mkdtemp()) / "benchmark.sqlite3"
+    settings.ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE = (
+        None if args.min_size == "none" else int(args.min_size)
+    )
+    django.setup()
+
+    from django.core.management import call_command
+
+    from issue_tracker.apps.issues.models import Issue
+    from issue_tracker.apps.issues.serializers import IssueListSerializer
+
+    call_command("migrate", verbosity=0)
+    load = load_issues(args)
+    size, table_size = storage_sizes()
+
+    def list_page() -> None:
+        list(IssueListSerializer.values_queryset(Issue.objects.all()[:100]))
+
+    def instances_page() -> None:
+        list(Issue.objects.all()[:100])
+
+    def all_descriptions() -> None:
+        for _ in Issue.objects.values_list("description", flat=True).iterator(2000):
+            pass
+
+    print(f"min size:               {settings.ISSUES_DESCRIPTION_COMPRESS_MIN_SIZE}")
+    print(f"issues:                 {args.issues} ({args.log_share:.0%} with logs)")
+    print(f"load:                   {load:.2f} s")
+    print(f"database file:          {size / 2**20:.1f} MiB")
+    print(f"issues table:           {table_size / 2**20:.1f} MiB")
+    print(f"list page (100 issues): {timed(list_page):.2f} ms")
+    print(f"page of instances:      {timed(instances_page):.2f} ms")
+    print(f"all descriptions:       {timed(all_descriptions, repeat=3):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
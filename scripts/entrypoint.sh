@@ -6,6 +6,9 @@ set -x
 mkdir -p /app/database
 /app/scripts/manage.py migrate
 
+# Compact the change log of issues every hour.
+/app/scripts/manage.py compact_changes --interval 3600 > /dev/null &
+
 # Collect static files.
 /app/scripts/manage.py collectstatic --noinput
 
@@ -13,5 +16,8 @@ if [ ! -z "$ADMIN_PASSWORD" ]; then
 	echo "from django.contrib.auth import get_user_model; User = get_user_model(); User.objects.create_superuser('admin', 'admin@myproject.com', '$ADMIN_PASSWORD')" | python /app/scripts/manage.py shell
 fi
 
+# Drop metrics of requests of the previous run.
+rm -rf /tmp/issue_tracker/metrics
+
 # Run gunicorn server.
 exec gunicorn -b 0.0.0.0:80 issue_tracker.wsgi